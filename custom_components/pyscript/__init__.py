@@ -20,6 +20,8 @@ from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
 from homeassistant.const import (
     EVENT_HOMEASSISTANT_STARTED,
     EVENT_HOMEASSISTANT_STOP,
+    EVENT_SERVICE_REGISTERED,
+    EVENT_SERVICE_REMOVED,
     EVENT_STATE_CHANGED,
     SERVICE_RELOAD,
 )
@@ -31,28 +33,56 @@ from homeassistant.helpers.typing import ConfigType
 from homeassistant.loader import bind_hass
 
 from .const import (
+    CONF_ACTION_CONCURRENCY,
     CONF_ALLOW_ALL_IMPORTS,
+    CONF_EXECUTOR_PROCESSES,
+    CONF_EXECUTOR_WORKERS,
     CONF_HASS_IS_GLOBAL,
+    CONF_LAZY_IMPORTS,
     CONF_LEGACY_DECORATORS,
+    CONF_LOAD_REPORT_LOG,
+    CONF_LOOP_YIELD_MS,
+    CONF_STALL_THRESHOLD_MS,
+    CONF_STARTUP_CONCURRENCY,
+    CONF_STARTUP_STAGGER_MS,
+    CONF_TASK_DRAIN_TIMEOUT,
+    CONF_WATCHDOG_DEBOUNCE_MS,
+    CONF_WATCHDOG_MAX_DELAY_MS,
     CONFIG_ENTRY,
     CONFIG_ENTRY_OLD,
     DOMAIN,
     FOLDER,
     LOGGER_PATH,
     REQUIREMENTS_FILE,
+    SCRIPT_MANIFEST,
+    SERVICE_ACTION_STATS,
+    SERVICE_EXECUTOR_STATS,
     SERVICE_GENERATE_STUBS,
+    SERVICE_IMPORT_REPORT,
     SERVICE_JUPYTER_KERNEL_START,
+    SERVICE_LOAD_REPORT,
+    SERVICE_PROFILE_START,
+    SERVICE_PROFILE_STOP,
+    SERVICE_STALL_REPORT,
+    SERVICE_TASK_REPORT,
     UNSUB_LISTENERS,
+    WATCHDOG_DEBOUNCE_MS,
+    WATCHDOG_MAX_DELAY_MS,
     WATCHDOG_TASK,
 )
-from .decorator import DecoratorRegistry
+from .decorator import ActionScheduler, DecoratorRegistry
 from .eval import AstEval
 from .event import Event
+from .executor import Executor
 from .function import Function
 from .global_ctx import GlobalContext, GlobalContextMgr
 from .jupyter_kernel import Kernel
+from .load_report import LoadReport
 from .mqtt import Mqtt
+from .profiler import DEFAULT_PROFILE_INTERVAL_MS, DEFAULT_PROFILE_TOP, Profiler
 from .requirements import install_requirements
+from .stall_monitor import StallMonitor
+from .startup_ramp import StartupRamp
 from .state import State, StateVal
 from .stubs.generator import StubsGenerator
 from .trigger import TrigTime
@@ -64,7 +94,21 @@ PYSCRIPT_SCHEMA = vol.Schema(
     {
         vol.Optional(CONF_ALLOW_ALL_IMPORTS, default=False): cv.boolean,
         vol.Optional(CONF_HASS_IS_GLOBAL, default=False): cv.boolean,
+        vol.Optional(CONF_LAZY_IMPORTS): cv.boolean,
         vol.Optional(CONF_LEGACY_DECORATORS, default=False): cv.boolean,
+        vol.Optional(CONF_LOAD_REPORT_LOG): cv.boolean,
+        vol.Optional(CONF_ACTION_CONCURRENCY): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_EXECUTOR_WORKERS): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_EXECUTOR_PROCESSES): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_LOOP_YIELD_MS): vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False)),
+        vol.Optional(CONF_STALL_THRESHOLD_MS): vol.All(
+            vol.Coerce(float), vol.Range(min=0, min_included=False)
+        ),
+        vol.Optional(CONF_STARTUP_CONCURRENCY): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_STARTUP_STAGGER_MS): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_TASK_DRAIN_TIMEOUT): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_WATCHDOG_DEBOUNCE_MS): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_WATCHDOG_MAX_DELAY_MS): vol.All(vol.Coerce(float), vol.Range(min=0)),
     },
     extra=vol.ALLOW_EXTRA,
 )
@@ -135,6 +179,7 @@ async def update_yaml_config(hass: HomeAssistant, config_entry: ConfigEntry) ->
 def start_global_contexts(global_ctx_only: str | None = None) -> None:
     """Start all the file and apps global contexts."""
     start_list = []
+    start_tasks = []
     for global_ctx_name, global_ctx in GlobalContextMgr.items():
         idx = global_ctx_name.find(".")
         if idx < 0 or global_ctx_name[0:idx] not in {"file", "apps", "modules", "scripts"}:
@@ -144,14 +189,16 @@ def start_global_contexts(global_ctx_only: str | None = None) -> None:
                 continue
         global_ctx.set_auto_start(True)
         start_list.append(global_ctx)
+    StartupRamp.begin()
     for global_ctx in start_list:
-        global_ctx.start()
+        start_tasks += global_ctx.start()
+    LoadReport.end_after(start_tasks)
 
 
 async def watchdog_start(
     hass: HomeAssistant,
     pyscript_folder: str,
-    reload_scripts_handler: Callable[[ServiceCall], Awaitable[None]],
+    reload_scripts_handler: Callable[..., Awaitable[None]],
 ) -> None:
     """Start watchdog thread to look for changed files in pyscript_folder."""
     if WATCHDOG_TASK in hass.data[DOMAIN]:
@@ -207,18 +254,22 @@ async def watchdog_start(
             self.process(event)
 
     async def task_watchdog(watchdog_q: asyncio.Queue) -> None:
-        def check_event(event: FileSystemEvent, do_reload: bool) -> bool:
-            """Check if event should trigger a reload."""
+        def check_event(event: FileSystemEvent, changed_paths: set[str]) -> bool:
+            """Add the scripts changed by event to changed_paths; return True if everything should reload."""
             if event.is_directory:
-                # don't reload if it's just a directory modified
-                if isinstance(event, DirModifiedEvent):
-                    return do_reload
-                return True
-            # only reload if it's a script, yaml, or requirements.txt file
-            for valid_suffix in [".py", ".yaml", "/" + REQUIREMENTS_FILE]:
-                if event.src_path.endswith(valid_suffix):
+                # don't reload if it's just a directory modified; a directory created, moved
+                # or deleted can change many scripts
+                return not isinstance(event, DirModifiedEvent)
+            # yaml and requirements.txt changes need a full reload
+            for full_suffix in [".yaml", "/" + REQUIREMENTS_FILE]:
+                if event.src_path.endswith(full_suffix):
                     return True
-            return do_reload
+            # only reload the scripts changed; a move (eg, an editor saving via a temporary
+            # file) changes both paths
+            for path in [event.src_path, event.dest_path]:
+                if path.endswith(".py"):
+                    changed_paths.add(path)
+            return False
 
         while True:
             try:
@@ -226,20 +277,27 @@ async def watchdog_start(
                 # since some file/dir changes create multiple events, we consume all
                 # events in a small window; first wait indefinitely for next event
                 #
-                do_reload = check_event(await watchdog_q.get(), False)
+                changed_paths = set()
+                full_reload = check_event(await watchdog_q.get(), changed_paths)
                 #
-                # now consume all additional events with 50ms timeout or 500ms elapsed
+                # now consume all additional events until none arrives within the debounce
+                # time, or the maximum delay has elapsed
                 #
+                config_data = hass.data[DOMAIN][CONFIG_ENTRY].data
+                debounce = config_data.get(CONF_WATCHDOG_DEBOUNCE_MS, WATCHDOG_DEBOUNCE_MS) / 1000
+                max_delay = config_data.get(CONF_WATCHDOG_MAX_DELAY_MS, WATCHDOG_MAX_DELAY_MS) / 1000
                 t_start = time.monotonic()
-                while time.monotonic() - t_start < 0.5:
+                while time.monotonic() - t_start < max_delay:
                     try:
-                        do_reload = check_event(
-                            await asyncio.wait_for(watchdog_q.get(), timeout=0.05), do_reload
-                        )
+                        event = await asyncio.wait_for(watchdog_q.get(), timeout=debounce)
                     except TimeoutError:
                         break
-                if do_reload:
+                    if check_event(event, changed_paths):
+                        full_reload = True
+                if full_reload:
                     await reload_scripts_handler(None)
+                elif changed_paths:
+                    await reload_scripts_handler(None, changed_paths=changed_paths)
 
             except asyncio.CancelledError:
                 raise
@@ -276,7 +334,18 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     Webhook.init(hass)
     State.register_functions()
     GlobalContextMgr.init()
+    GlobalContextMgr.set_task_drain_timeout(config_entry.data.get(CONF_TASK_DRAIN_TIMEOUT))
     DecoratorRegistry.init(hass, config_entry)
+    ActionScheduler.init(config_entry.data.get(CONF_ACTION_CONCURRENCY))
+    Executor.configure(
+        config_entry.data.get(CONF_EXECUTOR_WORKERS), config_entry.data.get(CONF_EXECUTOR_PROCESSES)
+    )
+    AstEval.set_loop_budget(config_entry.data.get(CONF_LOOP_YIELD_MS))
+    StallMonitor.init(hass, config_entry.data.get(CONF_STALL_THRESHOLD_MS))
+    LoadReport.init(hass, config_entry.data.get(CONF_LOAD_REPORT_LOG, False))
+    StartupRamp.init(
+        config_entry.data.get(CONF_STARTUP_CONCURRENCY), config_entry.data.get(CONF_STARTUP_STAGGER_MS)
+    )
 
     pyscript_folder = hass.config.path(FOLDER)
     if not await hass.async_add_executor_job(os.path.isdir, pyscript_folder):
@@ -289,11 +358,32 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
 
     State.set_pyscript_config(config_entry.data)
 
-    await install_requirements(hass, config_entry, pyscript_folder)
+    LoadReport.begin()
+    with LoadReport.time_phase("install_requirements"):
+        await install_requirements(hass, config_entry, pyscript_folder)
+    if hass.is_running:
+        #
+        # hass_started won't fire when the entry is set up (or reloaded) after Home Assistant
+        # has started, so build the service parameters now; this also catches the services
+        # that changed while a reloaded entry wasn't listening for service events
+        #
+        await State.get_service_params()
     await load_scripts(hass, config_entry.data, global_ctx_only=global_ctx_only)
 
-    async def reload_scripts_handler(call: ServiceCall) -> None:
-        """Handle reload service calls."""
+    async def reload_scripts_handler(
+        call: ServiceCall | None, changed_paths: set[str] | None = None
+    ) -> None:
+        """Handle reload service calls, and watchdog reloads of changed script files."""
+        LoadReport.begin()
+        if changed_paths is not None:
+            #
+            # the yaml config and requirements haven't changed, so just rescan the changed files
+            #
+            _LOGGER.debug("reload: reloading changed scripts %s, and restarting", changed_paths)
+            await load_scripts(hass, config_entry.data, changed_paths=changed_paths)
+            start_global_contexts()
+            return
+
         _LOGGER.debug("reload: yaml, reloading scripts, and restarting")
 
         global_ctx_only = call.data.get("global_ctx", None) if call else None
@@ -301,10 +391,20 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
         if await update_yaml_config(hass, config_entry):
             global_ctx_only = "*"
         State.set_pyscript_config(config_entry.data)
+        ActionScheduler.set_limit(config_entry.data.get(CONF_ACTION_CONCURRENCY))
+        Executor.configure(
+            config_entry.data.get(CONF_EXECUTOR_WORKERS), config_entry.data.get(CONF_EXECUTOR_PROCESSES)
+        )
+        AstEval.set_loop_budget(config_entry.data.get(CONF_LOOP_YIELD_MS))
+        StallMonitor.set_threshold(config_entry.data.get(CONF_STALL_THRESHOLD_MS))
+        LoadReport.init(hass, config_entry.data.get(CONF_LOAD_REPORT_LOG, False))
+        GlobalContextMgr.set_task_drain_timeout(config_entry.data.get(CONF_TASK_DRAIN_TIMEOUT))
+        StartupRamp.configure(
+            config_entry.data.get(CONF_STARTUP_CONCURRENCY), config_entry.data.get(CONF_STARTUP_STAGGER_MS)
+        )
 
-        await State.get_service_params()
-
-        await install_requirements(hass, config_entry, pyscript_folder)
+        with LoadReport.time_phase("install_requirements"):
+            await install_requirements(hass, config_entry, pyscript_folder)
         await load_scripts(hass, config_entry.data, global_ctx_only=global_ctx_only)
 
         start_global_contexts(global_ctx_only=global_ctx_only)
@@ -352,6 +452,108 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
         DOMAIN, SERVICE_GENERATE_STUBS, generate_stubs_service, supports_response=SupportsResponse.ONLY
     )
 
+    async def action_stats_service(call: ServiceCall) -> dict[str, Any]:
+        """Report the action scheduler state, queue wait times per priority, and trigger queue counters."""
+        return {**ActionScheduler.get_stats(), "triggers": GlobalContextMgr.get_trigger_stats()}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_ACTION_STATS, action_stats_service, supports_response=SupportsResponse.ONLY
+    )
+
+    async def executor_stats_service(call: ServiceCall) -> dict[str, Any]:
+        """Report the pyscript executor pool size and queue depth."""
+        return Executor.get_stats()
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_EXECUTOR_STATS, executor_stats_service, supports_response=SupportsResponse.ONLY
+    )
+
+    async def stall_report_service(call: ServiceCall) -> dict[str, Any]:
+        """Report the pyscript code that held the event loop the longest, optionally resetting it."""
+        report = StallMonitor.get_report()
+        if call.data.get("reset", False):
+            StallMonitor.reset()
+        return report
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_STALL_REPORT, stall_report_service, supports_response=SupportsResponse.ONLY
+    )
+
+    async def profile_start_service(call: ServiceCall) -> None:
+        """Start sampling which pyscript functions and lines the event loop is running."""
+        #
+        # a running sampler is stopped in the executor, since joining its thread blocks; the
+        # new one must be started on the event loop, which is the thread it samples
+        #
+        await hass.async_add_executor_job(Profiler.stop)
+        Profiler.start(call.data["interval_ms"])
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_START,
+        profile_start_service,
+        schema=vol.Schema(
+            {
+                vol.Optional("interval_ms", default=DEFAULT_PROFILE_INTERVAL_MS): vol.All(
+                    vol.Coerce(float), vol.Range(min=1)
+                )
+            }
+        ),
+    )
+
+    async def profile_stop_service(call: ServiceCall) -> dict[str, Any]:
+        """Stop the profiler and report the hottest pyscript lines and functions."""
+        await hass.async_add_executor_job(Profiler.stop)
+        return Profiler.get_report(call.data["top"])
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_STOP,
+        profile_stop_service,
+        schema=vol.Schema(
+            {vol.Optional("top", default=DEFAULT_PROFILE_TOP): vol.All(vol.Coerce(int), vol.Range(min=1))}
+        ),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def import_report_service(call: ServiceCall) -> dict[str, Any]:
+        """Report which contexts import which modules, or what reloading one context cascades to."""
+        global_ctx_name = call.data.get("global_ctx")
+        if global_ctx_name is None:
+            return {
+                "importers": {
+                    mod_name: sorted(importers)
+                    for mod_name, importers in sorted(GlobalContextMgr.importers.items())
+                }
+            }
+        global_ctx = GlobalContextMgr.get(global_ctx_name)
+        return {
+            "global_ctx": global_ctx_name,
+            "imports": sorted(global_ctx.get_imports()) if global_ctx else [],
+            "importers": sorted(GlobalContextMgr.importers.get(global_ctx_name, ())),
+            "dependents": GlobalContextMgr.get_importers([global_ctx_name]),
+        }
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_IMPORT_REPORT, import_report_service, supports_response=SupportsResponse.ONLY
+    )
+
+    async def task_report_service(call: ServiceCall) -> dict[str, Any]:
+        """Report the number of running tasks of each global context."""
+        return GlobalContextMgr.get_task_report()
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_TASK_REPORT, task_report_service, supports_response=SupportsResponse.ONLY
+    )
+
+    async def load_report_service(call: ServiceCall) -> dict[str, Any]:
+        """Report the time spent in each phase, file and trigger of the last load, and its startup ramp."""
+        return LoadReport.get_report(call.data.get("top")) | {"startup_ramp": StartupRamp.get_report()}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_LOAD_REPORT, load_report_service, supports_response=SupportsResponse.ONLY
+    )
+
     async def jupyter_kernel_start(call: ServiceCall) -> None:
         """Handle Jupyter kernel start call."""
         _LOGGER.debug("service call to jupyter_kernel_start: %s", call.data)
@@ -416,6 +618,7 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
         await Function.waiter_sync()
         await Function.waiter_stop()
         await Function.reaper_stop()
+        await Executor.async_shutdown()
 
     # Store callbacks to event listeners so we can unsubscribe on unload
     _LOGGER.debug("adding state_changed listener")
@@ -424,6 +627,10 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
         hass.bus.async_listen(EVENT_HOMEASSISTANT_STARTED, hass_started)
     )
     hass.data[DOMAIN][UNSUB_LISTENERS].append(hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, hass_stop))
+    for event_type in (EVENT_SERVICE_REGISTERED, EVENT_SERVICE_REMOVED):
+        hass.data[DOMAIN][UNSUB_LISTENERS].append(
+            hass.bus.async_listen(event_type, State.service_changed_event)
+        )
 
     await watchdog_start(hass, pyscript_folder, reload_scripts_handler)
 
@@ -447,6 +654,9 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     await Function.waiter_stop()
     await Function.reaper_stop()
 
+    await Executor.async_shutdown()
+    await hass.async_add_executor_job(Profiler.stop)
+
     return True
 
 
@@ -470,9 +680,12 @@ async def unload_scripts(global_ctx_only: str | None = None, unload_all: bool =
 
 @bind_hass
 async def load_scripts(
-    hass: HomeAssistant, config_data: dict[str, Any], global_ctx_only: str | None = None
+    hass: HomeAssistant,
+    config_data: dict[str, Any],
+    global_ctx_only: str | None = None,
+    changed_paths: set[str] | None = None,
 ) -> None:
-    """Load all python scripts in FOLDER."""
+    """Load all python scripts in FOLDER, or only rescan changed_paths if given."""
 
     class SourceFile:
         """Class for information about a source file."""
@@ -489,6 +702,7 @@ async def load_scripts(
             source=None,
             mtime=None,
             autoload=None,
+            read_time=0.0,
         ):
             self.global_ctx_name = global_ctx_name
             self.file_path = file_path
@@ -500,94 +714,154 @@ async def load_scripts(
             self.source = source
             self.mtime = mtime
             self.autoload = autoload
+            self.read_time = read_time
             self.force = False
 
     pyscript_dir = hass.config.path(FOLDER)
 
+    #
+    # each source path is classified by the first of these it matches, by its top-level
+    # directory, its depth and whether it's a package __init__.py; the first source found
+    # for a global context name wins, so a package takes precedence over a module file
+    #
+    load_paths = [
+        # top-level dir, min depth, max depth (None for any), only __init__.py, check_config, autoload
+        ["", 1, 1, False, False, True],
+        ["apps", 3, 3, True, True, True],
+        ["apps", 2, 2, False, True, True],
+        ["apps", 3, None, False, False, False],
+        ["modules", 3, 3, True, False, False],
+        ["modules", 2, None, False, False, False],
+        ["scripts", 2, None, False, False, True],
+    ]
+
+    def classify_path(rel_path: str) -> list[tuple[int, str, bool, bool]]:
+        """Return the load_paths index, top-level dir, check_config and autoload of each matching entry."""
+        parts = rel_path.split("/")
+        top_dir = parts[0] if len(parts) > 1 else ""
+        path_classes = []
+        for idx, (path, min_depth, max_depth, init_only, check_config, autoload) in enumerate(load_paths):
+            if (
+                path != top_dir
+                or len(parts) < min_depth
+                or (max_depth is not None and len(parts) > max_depth)
+            ):
+                continue
+            if init_only and parts[-1] != "__init__.py":
+                continue
+            path_classes.append((idx, path, check_config, autoload))
+        return path_classes
+
     def glob_read_files(
-        load_paths: list[tuple[str, str, bool, bool]], apps_config: dict[str, Any]
-    ) -> dict[str, SourceFile]:
-        """Expand globs and read all the source files."""
+        apps_config: dict[str, Any], manifest: dict[str, tuple], changed_paths: set[str] | None
+    ) -> tuple[dict[str, SourceFile], dict[str, tuple]]:
+        """Find the source files and read those that changed since the manifest was made."""
+        #
+        # a single recursive glob finds all the candidate files; files whose stat data matches
+        # the manifest from the previous scan aren't read again; when watchdog tells us which
+        # files changed, the other files in the manifest aren't even stat'ed
+        #
+        if changed_paths is None:
+            all_paths = glob.glob(os.path.join(pyscript_dir, "**", "*.py"), recursive=True)
+        else:
+            all_paths = (manifest.keys() - changed_paths) | {
+                path for path in changed_paths if path.startswith(pyscript_dir) and os.path.isfile(path)
+            }
+        sources = []
+        for this_path in all_paths:
+            rel_path = this_path
+            if rel_path.startswith(pyscript_dir):
+                rel_path = rel_path[len(pyscript_dir) :]
+            if rel_path.startswith("/"):
+                rel_path = rel_path[1:]
+            if rel_path[0] == "#" or rel_path.find("/#") >= 0:
+                # skip "commented" files and directories
+                continue
+            #
+            # a path can match several entries (eg, apps/APP/__init__.py is also a module of
+            # an app that isn't configured); each is tried in order until one takes the file
+            #
+            for path_class in classify_path(rel_path):
+                sources.append((path_class[0], this_path, rel_path, *path_class[1:]))
+
         ctx2source = {}
-        for path, match, check_config, autoload in load_paths:
-            for this_path in sorted(glob.glob(os.path.join(pyscript_dir, path, match), recursive=True)):
-                rel_import_path = None
-                rel_path = this_path
-                if rel_path.startswith(pyscript_dir):
-                    rel_path = rel_path[len(pyscript_dir) :]
-                if rel_path.startswith("/"):
-                    rel_path = rel_path[1:]
-                if rel_path[0] == "#" or rel_path.find("/#") >= 0:
-                    # skip "commented" files and directories
-                    continue
-                mod_name = rel_path[0:-3]
-                if mod_name.endswith("/__init__"):
-                    rel_import_path = mod_name
-                    mod_name = mod_name[: -len("/__init__")]
-                mod_name = mod_name.replace("/", ".")
-                if path == "":
-                    global_ctx_name = f"file.{mod_name}"
-                    fq_mod_name = mod_name
-                else:
-                    fq_mod_name = global_ctx_name = mod_name
-                    i = fq_mod_name.find(".")
-                    if i >= 0:
-                        fq_mod_name = fq_mod_name[i + 1 :]
-                app_config = None
-
-                if global_ctx_name in ctx2source:
-                    # the globs result in apps/APP/__init__.py matching twice, so skip the 2nd time
-                    # also skip apps/APP.py if apps/APP/__init__.py is present
-                    continue
+        new_manifest = {}
+        for _, this_path, rel_path, path, check_config, autoload in sorted(sources):
+            rel_import_path = None
+            mod_name = rel_path[0:-3]
+            if mod_name.endswith("/__init__"):
+                rel_import_path = mod_name
+                mod_name = mod_name[: -len("/__init__")]
+            mod_name = mod_name.replace("/", ".")
+            if path == "":
+                global_ctx_name = f"file.{mod_name}"
+                fq_mod_name = mod_name
+            else:
+                fq_mod_name = global_ctx_name = mod_name
+                i = fq_mod_name.find(".")
+                if i >= 0:
+                    fq_mod_name = fq_mod_name[i + 1 :]
+            app_config = None
+
+            if global_ctx_name in ctx2source:
+                # a path matching several entries is only taken once; also skip apps/APP.py if
+                # apps/APP/__init__.py is present, and similarly for modules
+                continue
 
-                if check_config:
-                    app_name = fq_mod_name
-                    i = app_name.find(".")
-                    if i >= 0:
-                        app_name = app_name[0:i]
-                    if not isinstance(apps_config, dict) or app_name not in apps_config:
-                        _LOGGER.debug(
-                            "load_scripts: skipping %s (app_name=%s) because config not present",
-                            this_path,
-                            app_name,
-                        )
-                        continue
-                    app_config = apps_config[app_name]
+            if check_config:
+                app_name = fq_mod_name
+                i = app_name.find(".")
+                if i >= 0:
+                    app_name = app_name[0:i]
+                if not isinstance(apps_config, dict) or app_name not in apps_config:
+                    _LOGGER.debug(
+                        "load_scripts: skipping %s (app_name=%s) because config not present",
+                        this_path,
+                        app_name,
+                    )
+                    continue
+                app_config = apps_config[app_name]
 
+            entry = manifest.get(this_path)
+            stat_key = entry[0] if entry else None
+            if entry is None or changed_paths is None or this_path in changed_paths:
                 try:
+                    stat = os.stat(this_path)
+                    if (stat.st_mtime_ns, stat.st_size) != stat_key:
+                        stat_key = (stat.st_mtime_ns, stat.st_size)
+                        entry = None
+                except OSError:
+                    stat_key = entry = None
+            read_time = 0.0
+            if entry is not None:
+                _, source, mtime = entry
+            else:
+                try:
+                    read_start = time.perf_counter()
                     with open(this_path, encoding="utf-8") as file_desc:
                         source = file_desc.read()
                     mtime = os.path.getmtime(this_path)
+                    read_time = time.perf_counter() - read_start
                 except Exception as exc:
                     _LOGGER.error("load_scripts: skipping %s due to exception %s", this_path, exc)
                     continue
+            new_manifest[this_path] = (stat_key, source, mtime)
+
+            ctx2source[global_ctx_name] = SourceFile(
+                global_ctx_name=global_ctx_name,
+                file_path=this_path,
+                rel_path=rel_path,
+                rel_import_path=rel_import_path,
+                fq_mod_name=fq_mod_name,
+                check_config=check_config,
+                app_config=app_config,
+                source=source,
+                mtime=mtime,
+                autoload=autoload,
+                read_time=read_time,
+            )
 
-                ctx2source[global_ctx_name] = SourceFile(
-                    global_ctx_name=global_ctx_name,
-                    file_path=this_path,
-                    rel_path=rel_path,
-                    rel_import_path=rel_import_path,
-                    fq_mod_name=fq_mod_name,
-                    check_config=check_config,
-                    app_config=app_config,
-                    source=source,
-                    mtime=mtime,
-                    autoload=autoload,
-                )
-
-        return ctx2source
-
-    load_paths = [
-        # path, glob, check_config, autoload
-        ["", "*.py", False, True],
-        ["apps", "*/__init__.py", True, True],
-        ["apps", "*.py", True, True],
-        ["apps", "*/**/*.py", False, False],
-        ["modules", "*/__init__.py", False, False],
-        ["modules", "*.py", False, False],
-        ["modules", "*/**/*.py", False, False],
-        ["scripts", "**/*.py", False, True],
-    ]
+        return ctx2source, new_manifest
 
     #
     # get current global contexts
@@ -603,7 +877,15 @@ async def load_scripts(
     # get list and contents of all source files
     #
     apps_config = config_data.get("apps", None)
-    ctx2files = await hass.async_add_executor_job(glob_read_files, load_paths, apps_config)
+    with LoadReport.time_phase("read_files"):
+        ctx2files, hass.data[DOMAIN][SCRIPT_MANIFEST] = await hass.async_add_executor_job(
+            glob_read_files, apps_config, hass.data[DOMAIN].get(SCRIPT_MANIFEST, {}), changed_paths
+        )
+    for src_info in ctx2files.values():
+        if src_info.read_time:
+            LoadReport.add_file_time(
+                src_info.file_path, "read", src_info.read_time, src_info.global_ctx_name
+            )
 
     #
     # figure out what to reload based on global_ctx_only and what's changed
@@ -642,43 +924,32 @@ async def load_scripts(
 
     #
     # force reload if any files uses a module that is bring reloaded by
-    # recursively following each import; first find which modules are
-    # being reloaded
+    # recursively following each import; first find which modules and app
+    # packages are being reloaded
     #
     will_reload = set()
     for global_ctx_name, src_info in ctx2files.items():
-        if global_ctx_name.startswith("modules.") and (global_ctx_name in ctx_delete or src_info.force):
+        if global_ctx_name.startswith(("apps.", "modules.")) and (
+            global_ctx_name in ctx_delete or src_info.force
+        ):
             parts = global_ctx_name.split(".")
             root = f"{parts[0]}.{parts[1]}"
             will_reload.add(root)
 
     if len(will_reload) > 0:
-
-        def import_recurse(ctx_name, visited, ctx2imports):
-            if ctx_name in visited or ctx_name in ctx2imports:
-                return ctx2imports.get(ctx_name, set())
-            visited.add(ctx_name)
-            ctx = GlobalContextMgr.get(ctx_name)
-            if not ctx:
-                return set()
-            ctx2imports[ctx_name] = set()
-            for imp_name in ctx.get_imports():
-                ctx2imports[ctx_name].add(imp_name)
-                ctx2imports[ctx_name].update(import_recurse(imp_name, visited, ctx2imports))
-            return ctx2imports[ctx_name]
-
-        ctx2imports = {}
-        for global_ctx_name, global_ctx in ctx_all.items():
-            if global_ctx_name not in ctx2imports:
-                visited = set()
-                import_recurse(global_ctx_name, visited, ctx2imports)
-            for mod_name in ctx2imports.get(global_ctx_name, set()):
-                parts = mod_name.split(".")
-                root = f"{parts[0]}.{parts[1]}"
-                if root in will_reload:
-                    ctx_delete.add(global_ctx_name)
-                    if global_ctx_name in ctx2files:
-                        ctx2files[global_ctx_name].force = True
+        #
+        # the reverse import index gives the contexts that import those modules
+        #
+        reload_mods = set()
+        for mod_name in GlobalContextMgr.importers:
+            parts = mod_name.split(".")
+            if f"{parts[0]}.{parts[1]}" in will_reload:
+                reload_mods.add(mod_name)
+        for global_ctx_name in GlobalContextMgr.get_importers(reload_mods):
+            if global_ctx_name in ctx_all:
+                ctx_delete.add(global_ctx_name)
+                if global_ctx_name in ctx2files:
+                    ctx2files[global_ctx_name].force = True
 
     #
     # if any file in an app or module has changed, then reload just the top-level
@@ -706,36 +977,50 @@ async def load_scripts(
         done.add(root)
 
     #
-    # delete contexts that are no longer needed or will be reloaded
+    # delete contexts that are no longer needed or will be reloaded; the running decorator
+    # managers of contexts that will be reloaded are kept, so the reloaded functions whose
+    # decorators are unchanged keep their triggers
     #
-    for global_ctx_name in ctx_delete:
-        if global_ctx_name in ctx_all:
-            global_ctx = ctx_all[global_ctx_name]
-            global_ctx.stop()
-            if global_ctx_name not in ctx2files or not ctx2files[global_ctx_name].autoload:
-                _LOGGER.info("Unloaded %s", global_ctx.get_file_path())
-            GlobalContextMgr.delete(global_ctx_name)
-    await Function.waiter_sync()
+    with LoadReport.time_phase("unload_files"):
+        dms_prev = {}
+        for global_ctx_name in ctx_delete:
+            if global_ctx_name in ctx_all:
+                global_ctx = ctx_all[global_ctx_name]
+                src_info = ctx2files.get(global_ctx_name)
+                if src_info is not None and src_info.autoload and src_info.force:
+                    dms_prev[global_ctx_name] = global_ctx.take_decorator_managers()
+                global_ctx.stop()
+                if global_ctx_name not in ctx2files or not ctx2files[global_ctx_name].autoload:
+                    _LOGGER.info("Unloaded %s", global_ctx.get_file_path())
+                GlobalContextMgr.delete(global_ctx_name)
+        await Function.waiter_sync()
 
     #
-    # now load the requested files, and files that depend on loaded files
+    # now load the requested files, and files that depend on loaded files; they are parsed
+    # in executor threads, so only their evaluation, which must happen in order, runs on the
+    # event loop
     #
-    for global_ctx_name, src_info in sorted(ctx2files.items()):
-        if not src_info.autoload or not src_info.force:
-            continue
-        global_ctx = GlobalContext(
-            src_info.global_ctx_name,
-            global_sym_table={"__name__": src_info.fq_mod_name},
-            manager=GlobalContextMgr,
-            rel_import_path=src_info.rel_import_path,
-            app_config=src_info.app_config,
-            source=src_info.source,
-            mtime=src_info.mtime,
-        )
-        reload = src_info.global_ctx_name in ctx_delete
-        try:
-            await GlobalContextMgr.load_file(
-                global_ctx, src_info.file_path, source=src_info.source, reload=reload
+    load_list = [
+        src_info for _, src_info in sorted(ctx2files.items()) if src_info.autoload and src_info.force
+    ]
+    trees = GlobalContextMgr.parse_files([(src_info.source, src_info.file_path) for src_info in load_list])
+    with LoadReport.time_phase("load_files"):
+        for src_info in load_list:
+            tree = await anext(trees)
+            global_ctx = GlobalContext(
+                src_info.global_ctx_name,
+                global_sym_table={"__name__": src_info.fq_mod_name},
+                manager=GlobalContextMgr,
+                rel_import_path=src_info.rel_import_path,
+                app_config=src_info.app_config,
+                source=src_info.source,
+                mtime=src_info.mtime,
             )
-        except Exception:
-            _LOGGER.error("Failed to load %s", src_info.file_path)
+            global_ctx.dms_prev = dms_prev.pop(src_info.global_ctx_name, {})
+            reload = src_info.global_ctx_name in ctx_delete
+            try:
+                await GlobalContextMgr.load_file(
+                    global_ctx, src_info.file_path, source=src_info.source, reload=reload, tree=tree
+                )
+            except Exception:
+                _LOGGER.error("Failed to load %s", src_info.file_path)
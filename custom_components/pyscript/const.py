@@ -5,6 +5,7 @@ DOMAIN = "pyscript"
 CONFIG_ENTRY = "config_entry"
 CONFIG_ENTRY_OLD = "config_entry_old"
 UNSUB_LISTENERS = "unsub_listeners"
+SCRIPT_MANIFEST = "script_manifest"
 
 FOLDER = "pyscript"
 
@@ -14,13 +15,33 @@ ATTR_INSTALLED_VERSION = "installed_version"
 ATTR_SOURCES = "sources"
 ATTR_VERSION = "version"
 
+CONF_ACTION_CONCURRENCY = "action_concurrency"
 CONF_ALLOW_ALL_IMPORTS = "allow_all_imports"
+CONF_EXECUTOR_PROCESSES = "executor_processes"
+CONF_EXECUTOR_WORKERS = "executor_workers"
 CONF_HASS_IS_GLOBAL = "hass_is_global"
 CONF_INSTALLED_PACKAGES = "_installed_packages"
+CONF_LAZY_IMPORTS = "lazy_imports"
 CONF_LEGACY_DECORATORS = "legacy_decorators"
+CONF_LOAD_REPORT_LOG = "load_report_log"
+CONF_LOOP_YIELD_MS = "loop_yield_ms"
+CONF_STALL_THRESHOLD_MS = "stall_threshold_ms"
+CONF_STARTUP_CONCURRENCY = "startup_concurrency"
+CONF_STARTUP_STAGGER_MS = "startup_stagger_ms"
+CONF_TASK_DRAIN_TIMEOUT = "task_drain_timeout"
+CONF_WATCHDOG_DEBOUNCE_MS = "watchdog_debounce_ms"
+CONF_WATCHDOG_MAX_DELAY_MS = "watchdog_max_delay_ms"
 
 SERVICE_JUPYTER_KERNEL_START = "jupyter_kernel_start"
 SERVICE_GENERATE_STUBS = "generate_stubs"
+SERVICE_IMPORT_REPORT = "import_report"
+SERVICE_LOAD_REPORT = "load_report"
+SERVICE_ACTION_STATS = "action_stats"
+SERVICE_EXECUTOR_STATS = "executor_stats"
+SERVICE_STALL_REPORT = "stall_report"
+SERVICE_PROFILE_START = "profile_start"
+SERVICE_PROFILE_STOP = "profile_stop"
+SERVICE_TASK_REPORT = "task_report"
 
 LOGGER_PATH = "custom_components.pyscript"
 
@@ -28,6 +49,8 @@ REQUIREMENTS_FILE = "requirements.txt"
 REQUIREMENTS_PATHS = ("", "apps/*", "modules/*", "scripts/**")
 
 WATCHDOG_TASK = "watch_dog_task"
+WATCHDOG_DEBOUNCE_MS = 50
+WATCHDOG_MAX_DELAY_MS = 500
 
 ALLOWED_IMPORTS = {
     "black",
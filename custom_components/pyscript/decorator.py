@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import ast
 import asyncio
+import heapq
 import logging
 import os
+import time
 from typing import Any, ClassVar
 import weakref
 
@@ -20,12 +22,15 @@ from .decorator_abc import (
     DecoratorManager,
     DecoratorManagerStatus,
     DispatchData,
+    TaskHandlerDecorator,
     TriggerDecorator,
     TriggerHandlerDecorator,
 )
 from .eval import AstEval, EvalFunc, EvalFuncVar
 from .function import Function
+from .load_report import LoadReport
 from .state import State
+from .tracer import TraceRegistry
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -152,7 +157,15 @@ class DecoratorRegistry:
                 State.set(test_handshake[0], test_handshake[1])
         await dm.start()
 
-        ret = await dm.wait_until()
+        #
+        # an action waiting on a trigger isn't running, so it gives up its slot while it waits
+        #
+        priority = ActionScheduler.release_action()
+        try:
+            ret = await dm.wait_until()
+        finally:
+            if priority is not None and not asyncio.current_task().cancelling():
+                await ActionScheduler.acquire_action(priority)
 
         return ret
 
@@ -166,6 +179,131 @@ class DecoratorRegistry:
         return wait_until_call
 
 
+class ActionScheduler:
+    """Admit trigger actions by priority when their concurrency is limited."""
+
+    #
+    # maximum number of trigger actions running at once; None means unlimited, in which
+    # case actions never touch the scheduler
+    #
+    limit: ClassVar[int | None] = None
+    running: ClassVar[int] = 0
+    seq: ClassVar[int] = 0
+
+    #
+    # heap of (-priority, seq, enqueue time, future) of actions waiting for a slot
+    #
+    waiters: ClassVar[list[tuple[int, int, float, asyncio.Future]]] = []
+
+    #
+    # per priority: [actions admitted, actions that waited, total wait, max wait]
+    #
+    wait_stats: ClassVar[dict[int, list]] = {}
+
+    #
+    # tasks of the actions holding a slot, with their priority
+    #
+    holders: ClassVar[dict[asyncio.Task, int]] = {}
+
+    @classmethod
+    def init(cls, limit: int | None) -> None:
+        """Initialize the scheduler with the given concurrency limit."""
+        cls.limit = limit
+        cls.running = 0
+        cls.seq = 0
+        cls.waiters = []
+        cls.wait_stats = {}
+        cls.holders = {}
+
+    @classmethod
+    def set_limit(cls, limit: int | None) -> None:
+        """Change the concurrency limit, admitting waiting actions if there is now room."""
+        cls.limit = limit
+        while cls.waiters and (cls.limit is None or cls.running < cls.limit):
+            if not cls.admit_next():
+                break
+
+    @classmethod
+    async def acquire(cls, priority: int) -> None:
+        """Wait until an action of the given priority may run."""
+        stats = cls.wait_stats.setdefault(priority, [0, 0, 0.0, 0.0])
+        if cls.running < cls.limit and not cls.waiters:
+            cls.running += 1
+            stats[0] += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        cls.seq += 1
+        heapq.heappush(cls.waiters, (-priority, cls.seq, time.monotonic(), waiter))
+        try:
+            #
+            # the slot is handed over by admit_next, which has already counted it
+            #
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                cls.release()
+            raise
+
+    @classmethod
+    async def acquire_action(cls, priority: int) -> None:
+        """Wait until the action running in the current task may run, if actions are limited."""
+        if cls.limit is None:
+            return
+        await cls.acquire(priority)
+        cls.holders[asyncio.current_task()] = priority
+
+    @classmethod
+    def release_action(cls) -> int | None:
+        """Free the slot of the action running in the current task; return its priority if it held one."""
+        priority = cls.holders.pop(asyncio.current_task(), None)
+        if priority is not None:
+            cls.release()
+        return priority
+
+    @classmethod
+    def admit_next(cls) -> bool:
+        """Hand a slot to the highest priority waiting action; return False if there is none."""
+        while cls.waiters:
+            neg_priority, _, enqueued, waiter = heapq.heappop(cls.waiters)
+            if waiter.done():
+                continue
+            waited = time.monotonic() - enqueued
+            stats = cls.wait_stats.setdefault(-neg_priority, [0, 0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += 1
+            stats[2] += waited
+            stats[3] = max(stats[3], waited)
+            cls.running += 1
+            waiter.set_result(None)
+            return True
+        return False
+
+    @classmethod
+    def release(cls) -> None:
+        """Free a slot when an action finishes."""
+        cls.running -= 1
+        if cls.limit is None or cls.running < cls.limit:
+            cls.admit_next()
+
+    @classmethod
+    def get_stats(cls) -> dict[str, Any]:
+        """Return the scheduler state and queue wait times per priority."""
+        return {
+            "limit": cls.limit,
+            "running": cls.running,
+            "waiting": sum(1 for waiter in cls.waiters if not waiter[3].done()),
+            "priorities": {
+                str(priority): {
+                    "admitted": admitted,
+                    "waited": waited,
+                    "mean_wait": total_wait / waited if waited else 0.0,
+                    "max_wait": max_wait,
+                }
+                for priority, (admitted, waited, total_wait, max_wait) in sorted(cls.wait_stats.items())
+            },
+        }
+
+
 class WaitUntilDecoratorManager(DecoratorManager):
     """Decorator manager for task.wait_until."""
 
@@ -212,6 +350,9 @@ class WaitUntilDecoratorManager(DecoratorManager):
 class FunctionDecoratorManager(DecoratorManager):
     """Maintain and validate a set of decorators applied to a function."""
 
+    # action priority used by ActionScheduler; set by @task_priority
+    priority: int = 0
+
     def __init__(self, ast_ctx: AstEval, eval_func_var: EvalFuncVar) -> None:
         """Initialize the function decorator manager."""
         super().__init__(ast_ctx, f"{ast_ctx.get_global_ctx_name()}.{eval_func_var.get_name()}")
@@ -219,13 +360,72 @@ class FunctionDecoratorManager(DecoratorManager):
 
         self.logger = self.eval_func.logger
 
-        def on_func_var_deleted():
-            if self.status is DecoratorManagerStatus.RUNNING:
-                self.hass.async_create_task(self.stop())
-
-        weakref.finalize(eval_func_var, on_func_var_deleted)
+        self.func_var_finalizer = weakref.finalize(eval_func_var, self.on_func_var_deleted)
+
+    async def validate(self) -> None:
+        """Validate all decorators, adding the time to the load report."""
+        start = time.perf_counter()
+        try:
+            await super().validate()
+        finally:
+            LoadReport.add_trigger_time(self.name, "validate", time.perf_counter() - start)
+
+    async def start(self):
+        """Start all decorators, adding the time to the load report."""
+        start = time.perf_counter()
+        try:
+            await super().start()
+        finally:
+            LoadReport.add_trigger_time(self.name, "start", time.perf_counter() - start)
+
+    def on_func_var_deleted(self) -> None:
+        """Stop the manager when the variable holding its function is deleted."""
+        if self.status is DecoratorManagerStatus.RUNNING:
+            self.hass.async_create_task(self.stop())
+
+    def hot_swap(self, new_dm: FunctionDecoratorManager) -> bool:
+        """Switch this running manager to the function of new_dm if their decorators are the same."""
+        #
+        # on reload, a function whose decorators and their arguments haven't changed keeps
+        # its running manager, so its subscriptions stay in place and no trigger is missed;
+        # only the function that is called, and whatever the decorators derive from it, changes
+        #
+        old_decs = self._decorators
+        new_decs = new_dm.get_decorators()
+        if self.status is not DecoratorManagerStatus.RUNNING or len(old_decs) != len(new_decs):
+            return False
+        if not all(
+            old_dec.can_hot_swap(new_dec) for old_dec, new_dec in zip(old_decs, new_decs, strict=True)
+        ):
+            return False
+        for old_dec, new_dec in zip(old_decs, new_decs, strict=True):
+            old_dec.hot_swap(new_dec)
+        self.ast_ctx = new_dm.ast_ctx
+        self.eval_func = new_dm.eval_func
+        self.logger = new_dm.logger
+        self.priority = new_dm.priority
+
+        #
+        # from now on, the manager is stopped when the new function variable is deleted
+        #
+        self.func_var_finalizer.detach()
+        func_var_info = new_dm.func_var_finalizer.detach()
+        if func_var_info is not None:
+            self.func_var_finalizer = weakref.finalize(func_var_info[0], self.on_func_var_deleted)
+        return True
 
     async def _call(self, data: DispatchData) -> None:
+        spans = TraceRegistry.start("trigger_call", self.name, data) if TraceRegistry.tracers else None
+        try:
+            await self._run_call(data)
+        except BaseException as exc:
+            if spans is not None:
+                TraceRegistry.end(spans, "trigger_return", None, exc)
+            raise
+        if spans is not None:
+            TraceRegistry.end(spans, "trigger_return", None, None)
+
+    async def _run_call(self, data: DispatchData) -> None:
         handlers = self.get_decorators(CallHandlerDecorator)
         result_handlers = self.get_decorators(CallResultHandlerDecorator)
 
@@ -236,6 +436,19 @@ class FunctionDecoratorManager(DecoratorManager):
                 for result_handler_dec in result_handlers:
                     await result_handler_dec.handle_call_result(data, None)
                 return
+        #
+        # the action takes its slot only once the call handlers admit it, so an action parked
+        # by @task_limit or about to be dropped by @task_unique doesn't hold one
+        #
+        await ActionScheduler.acquire_action(self.priority)
+        try:
+            await self._run_action(data, result_handlers)
+        finally:
+            ActionScheduler.release_action()
+
+    async def _run_action(
+        self, data: DispatchData, result_handlers: list[CallResultHandlerDecorator]
+    ) -> None:
         # Fire an event indicating that pyscript is running
         # Note: the event must have an entity_id for logbook to work correctly.
         ev_name = self.name.replace(".", "_")
@@ -250,7 +463,7 @@ class FunctionDecoratorManager(DecoratorManager):
         for result_handler_dec in result_handlers:
             await result_handler_dec.handle_call_result(data, result)
 
-    async def dispatch(self, data: DispatchData) -> None:
+    async def dispatch(self, data: DispatchData) -> asyncio.Task | None:
         """Handle a trigger dispatch: run guards, create a context, and invoke the function."""
         _LOGGER.debug("Dispatching for %s: %s", self.name, data)
 
@@ -258,8 +471,17 @@ class FunctionDecoratorManager(DecoratorManager):
         for dec in decorators:
             if await dec.handle_dispatch(data) is False:
                 self.logger.debug("Trigger not active due to %s", dec)
-                return
+                return None
+
+        for task_dec in self.get_decorators(TaskHandlerDecorator):
+            if task_dec.handle_task(data) is False:
+                self.logger.debug("Action task not created due to %s", task_dec)
+                return None
+
+        return self.start_call(data)
 
+    def start_call(self, data: DispatchData) -> asyncio.Task:
+        """Create a context and a task that calls the function."""
         action_ast_ctx = AstEval(
             f"{self.eval_func.global_ctx_name}.{self.eval_func.name}", self.eval_func.global_ctx
         )
@@ -281,3 +503,4 @@ class FunctionDecoratorManager(DecoratorManager):
 
         task = Function.create_task(self._call(data), ast_ctx=action_ast_ctx)
         Function.task_done_callback_ctx(task, action_ast_ctx)
+        return task
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+import asyncio
 from dataclasses import dataclass, field
 from enum import StrEnum
 import logging
@@ -97,6 +98,27 @@ class Decorator(ABC):
             )
             raise type_error from err
 
+    def can_hot_swap(self, new_dec: Decorator) -> bool:
+        """Return True if this running decorator can be kept in place of new_dec on reload."""
+        try:
+            return (
+                type(new_dec) is type(self)
+                and new_dec.raw_args == self.raw_args
+                and new_dec.raw_kwargs == self.raw_kwargs
+            )
+        except Exception:
+            #
+            # arguments that can't be compared are treated as changed
+            #
+            return False
+
+    def hot_swap(self, new_dec: Decorator) -> None:  # noqa: B027
+        """Take over what new_dec derived from the reloaded function it decorates."""
+
+    def get_stats(self) -> dict[str, Any] | None:
+        """Return the runtime counters of the decorator, or None if it keeps none."""
+        return None
+
     async def start(self):  # noqa: B027
         """Start the decorator."""
 
@@ -210,8 +232,8 @@ class DecoratorManager(ABC):
         self.ast_ctx.log_exception(exc)
 
     @abstractmethod
-    async def dispatch(self, data: DispatchData) -> None:
-        """Dispatch a trigger call."""
+    async def dispatch(self, data: DispatchData) -> asyncio.Task | None:
+        """Dispatch a trigger call; return the task running the action if one was started."""
 
     def __repr__(self):
         """Return a string representation of the manager with status and decorators."""
@@ -230,14 +252,14 @@ class TriggerDecorator(Decorator, ABC):
                 {vol.Optional("kwargs"): vol.Coerce(dict[str, Any], msg="should be type dict")}
             )
 
-    async def dispatch(self, data: DispatchData) -> None:
-        """Dispatch a trigger call to the function."""
+    async def dispatch(self, data: DispatchData) -> asyncio.Task | None:
+        """Dispatch a trigger call to the function; return the task running the action if one was started."""
         if not data.trigger:
             data.trigger = self
 
         data.func_args.update(self.kwargs.get("kwargs", {}))
 
-        await self.dm.dispatch(data)
+        return await self.dm.dispatch(data)
 
 
 class TriggerHandlerDecorator(Decorator, ABC):
@@ -267,6 +289,14 @@ class TriggerHandlerDecorator(Decorator, ABC):
         """Handle a trigger dispatch call. Return False for stop dispatching."""
 
 
+class TaskHandlerDecorator(Decorator, ABC):
+    """Base class for decorators that control when an action task is created."""
+
+    @abstractmethod
+    def handle_task(self, data: DispatchData) -> bool | None:
+        """Handle an action before its task is created. Return False if it was deferred or dropped."""
+
+
 class CallHandlerDecorator(Decorator, ABC):
     """Base class for call-based handlers."""
 
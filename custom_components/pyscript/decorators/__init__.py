@@ -4,7 +4,7 @@ from .event import EventTriggerDecorator
 from .mqtt import MQTTTriggerDecorator
 from .service import ServiceDecorator
 from .state import StateActiveDecorator, StateTriggerDecorator
-from .task import TaskUniqueDecorator
+from .task import TaskLimitDecorator, TaskPriorityDecorator, TaskUniqueDecorator
 from .timing import TimeActiveDecorator, TimeTriggerDecorator
 from .webhook import WebhookTriggerDecorator
 
@@ -14,6 +14,8 @@ DECORATORS = [
     TimeTriggerDecorator,
     TimeActiveDecorator,
     TaskUniqueDecorator,
+    TaskLimitDecorator,
+    TaskPriorityDecorator,
     EventTriggerDecorator,
     MQTTTriggerDecorator,
     WebhookTriggerDecorator,
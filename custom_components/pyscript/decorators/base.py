@@ -44,6 +44,11 @@ class ExpressionDecorator(Decorator, ABC):
         Function.install_ast_funcs(self._ast_expression)
         self._ast_expression.parse(expression, mode="eval")
 
+    def hot_swap(self, new_dec: Decorator) -> None:
+        """Use the expression of new_dec, which is evaluated in the reloaded global context."""
+        super().hot_swap(new_dec)
+        self._ast_expression = new_dec._ast_expression
+
     def has_expression(self) -> bool:
         """Return True if expression was created."""
         return self._ast_expression is not None
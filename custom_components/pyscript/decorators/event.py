@@ -1,10 +1,13 @@
 """Event decorator."""
 
+from __future__ import annotations
+
 import logging
+from typing import Any, ClassVar
 
 import voluptuous as vol
 
-from homeassistant.core import CALLBACK_TYPE, Event
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant
 
 from ..decorator_abc import DispatchData, TriggerDecorator
 from .base import ExpressionDecorator
@@ -12,6 +15,65 @@ from .base import ExpressionDecorator
 _LOGGER = logging.getLogger(__name__)
 
 
+class EventDispatcher:
+    """Shared bus listener that fans out one event type to all subscribed triggers."""
+
+    #
+    # active dispatchers by event type
+    #
+    dispatchers: ClassVar[dict[str, EventDispatcher]] = {}
+
+    def __init__(self, hass: HomeAssistant, event_type: str) -> None:
+        """Initialize the dispatcher and register its bus listener."""
+        self.hass = hass
+        self.event_type = event_type
+        #
+        # dict used as an ordered set, so add and remove are O(1)
+        #
+        self.subscribers: dict[EventTriggerDecorator, None] = {}
+        self.remove_listener_callback: CALLBACK_TYPE = hass.bus.async_listen(event_type, self.event_listener)
+
+    @classmethod
+    def subscribe(cls, hass: HomeAssistant, event_type: str, decorator: EventTriggerDecorator) -> None:
+        """Add a trigger to the dispatcher for the event type, creating it if needed."""
+        dispatcher = cls.dispatchers.get(event_type)
+        if dispatcher is None or dispatcher.hass is not hass:
+            if dispatcher is not None:
+                dispatcher.remove_listener_callback()
+            _LOGGER.debug("Adding shared listener for event %s", event_type)
+            dispatcher = cls.dispatchers[event_type] = cls(hass, event_type)
+        dispatcher.subscribers[decorator] = None
+
+    @classmethod
+    def unsubscribe(cls, event_type: str, decorator: EventTriggerDecorator) -> None:
+        """Remove a trigger, dropping the bus listener once no triggers are left."""
+        dispatcher = cls.dispatchers.get(event_type)
+        if dispatcher is None or dispatcher.subscribers.pop(decorator, False) is False:
+            return
+        if not dispatcher.subscribers:
+            _LOGGER.debug("Removing shared listener for event %s", event_type)
+            dispatcher.remove_listener_callback()
+            del cls.dispatchers[event_type]
+
+    async def event_listener(self, event: Event) -> None:
+        """Build the trigger arguments once and deliver a copy to each subscriber."""
+        _LOGGER.debug("Event trigger received: %s %s", type(event), event)
+        func_args = {
+            "trigger_type": "event",
+            "event_type": event.event_type,
+            "context": event.context,
+        }
+        func_args.update(event.data)
+        #
+        # iterate over a snapshot, since a dispatched function can stop its own trigger
+        #
+        for decorator in list(self.subscribers):
+            try:
+                await decorator.handle_event(func_args.copy())
+            except Exception as exc:
+                _LOGGER.exception("%s failed handling event %s: %s", decorator, self.event_type, exc)
+
+
 class EventTriggerDecorator(TriggerDecorator, ExpressionDecorator):
     """Implementation for @event_trigger."""
 
@@ -23,22 +85,14 @@ class EventTriggerDecorator(TriggerDecorator, ExpressionDecorator):
         )
     )
 
-    remove_listener_callback: CALLBACK_TYPE | None = None
-
     async def validate(self) -> None:
         """Validate the event trigger."""
         await super().validate()
         if len(self.args) == 2:
             self.create_expression(self.args[1])
 
-    async def _event_callback(self, event: Event) -> None:
-        _LOGGER.debug("Event trigger received: %s %s", type(event), event)
-        func_args = {
-            "trigger_type": "event",
-            "event_type": event.event_type,
-            "context": event.context,
-        }
-        func_args.update(event.data)
+    async def handle_event(self, func_args: dict[str, Any]) -> None:
+        """Check the optional expression and dispatch the event."""
         if self.has_expression():
             if not await self.check_expression_vars(func_args):
                 return
@@ -48,12 +102,10 @@ class EventTriggerDecorator(TriggerDecorator, ExpressionDecorator):
     async def start(self) -> None:
         """Start the event trigger."""
         await super().start()
-        self.remove_listener_callback = self.dm.hass.bus.async_listen(self.args[0], self._event_callback)
+        EventDispatcher.subscribe(self.dm.hass, self.args[0], self)
         _LOGGER.debug("Event trigger started for event: %s", self.args[0])
-        _LOGGER.debug("Remove listener: %s", self.remove_listener_callback)
 
     async def stop(self) -> None:
         """Stop the event trigger."""
         await super().stop()
-        if self.remove_listener_callback:
-            self.remove_listener_callback()
+        EventDispatcher.unsubscribe(self.args[0], self)
@@ -2,49 +2,263 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+from collections.abc import Awaitable, Callable
 import logging
+from typing import Any, ClassVar
 
 import voluptuous as vol
 
 from homeassistant.components import mqtt
-from homeassistant.core import CALLBACK_TYPE
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
 
-from ..decorator_abc import DispatchData, TriggerDecorator
+from ..decorator import FunctionDecoratorManager
+from ..decorator_abc import Decorator, DispatchData, TriggerDecorator
+from ..json_codec import json_loads
 from .base import AutoKwargsDecorator, ExpressionDecorator
 
 _LOGGER = logging.getLogger(__name__)
 
+_UNDECODED = object()
+_INVALID_JSON = object()
+
+
+class MqttPayload:
+    """Mqtt message payload that is JSON-decoded at most once, on first use."""
+
+    __slots__ = ("_payload_obj", "payload")
+
+    def __init__(self, payload: Any) -> None:
+        """Initialize with the undecoded payload."""
+        self.payload = payload
+        self._payload_obj = _UNDECODED
+
+    def add_payload_obj(self, func_args: dict[str, Any]) -> None:
+        """Set payload_obj in func_args if the payload is valid JSON."""
+        if self._payload_obj is _UNDECODED:
+            try:
+                self._payload_obj = json_loads(self.payload)
+            except ValueError:
+                self._payload_obj = _INVALID_JSON
+        if self._payload_obj is not _INVALID_JSON:
+            func_args["payload_obj"] = self._payload_obj
+
+
+class MqttTopicFilter:
+    """A topic filter with its broker subscription and the triggers it delivers messages to."""
+
+    def __init__(self, topic_filter: str, encoding: str) -> None:
+        """Initialize the topic filter."""
+        self.topic_filter = topic_filter
+        self.encoding = encoding
+        #
+        # triggers of this filter, with the remove callback of the subscription that replays the
+        # retained messages to a trigger that joined once the filter was subscribed, if any
+        #
+        self.subscribers: dict[MQTTTriggerDecorator, CALLBACK_TYPE | None] = {}
+        self.remove_listener_callback: CALLBACK_TYPE | None = None
+        #
+        # set once the broker subscription is done; error is why it failed, if it did
+        #
+        self.ready = asyncio.Event()
+        self.error: Exception | None = None
+
+    async def wait_ready(self) -> None:
+        """Wait until the broker subscription is done, raising its error if it failed."""
+        if not self.ready.is_set():
+            await self.ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    async def message_handler(self, mqttmsg: mqtt.ReceiveMessage) -> None:
+        """Deliver a message to the triggers of this filter."""
+        #
+        # retained messages go to a trigger with its own replay subscription only through
+        # that one, so they aren't delivered twice when the client resubscribes
+        #
+        decorators = [
+            decorator for decorator, replay in self.subscribers.items() if not (mqttmsg.retain and replay)
+        ]
+        await self.deliver(mqttmsg, decorators)
+
+    def replay_handler_maker(self, decorator: MQTTTriggerDecorator) -> Callable[[Any], Awaitable[None]]:
+        """Return a handler that delivers the retained messages of a joining trigger to it."""
+
+        async def replay_handler(mqttmsg: mqtt.ReceiveMessage) -> None:
+            if mqttmsg.retain and decorator in self.subscribers:
+                await self.deliver(mqttmsg, [decorator])
+
+        return replay_handler
+
+    async def deliver(self, mqttmsg: mqtt.ReceiveMessage, decorators: list[MQTTTriggerDecorator]) -> None:
+        """Dispatch a message to the given triggers."""
+        if not decorators:
+            return
+        func_args = {
+            "trigger_type": "mqtt",
+            "topic": mqttmsg.topic,
+            "payload": mqttmsg.payload,
+            "qos": mqttmsg.qos,
+            "retain": mqttmsg.retain,
+        }
+        #
+        # payload_obj is only decoded if a subscriber needs it, and then only once
+        #
+        payload = MqttPayload(mqttmsg.payload)
+        for decorator in decorators:
+            try:
+                await decorator.handle_message(func_args.copy(), payload)
+            except Exception as exc:
+                _LOGGER.exception("%s failed handling mqtt message %s: %s", decorator, mqttmsg.topic, exc)
+
+
+class MqttSubscriptionManager:
+    """Share one broker subscription between the mqtt triggers of each topic filter."""
+
+    #
+    # Each distinct (encoding, topic filter) is subscribed once, and its subscription delivers
+    # every message to all the triggers of that filter. Home Assistant replays retained
+    # messages only to a new subscription, so a trigger that joins a filter that is already
+    # subscribed gets its own subscription, which only delivers retained messages to it.
+    #
+
+    hass: ClassVar[HomeAssistant | None] = None
+
+    #
+    # topic filters by (encoding, topic filter)
+    #
+    filters: ClassVar[dict[tuple[str, str], MqttTopicFilter]] = {}
+
+    @classmethod
+    async def subscribe(
+        cls, hass: HomeAssistant, topic_filter: str, encoding: str, decorator: MQTTTriggerDecorator
+    ) -> None:
+        """Add a trigger for the topic filter, subscribing to the broker if needed."""
+        if cls.hass is not hass:
+            cls.hass = hass
+            cls.filters = {}
+
+        key = (encoding, topic_filter)
+        flt = cls.filters.get(key)
+        if flt is not None:
+            flt.subscribers[decorator] = None
+            if not flt.ready.is_set():
+                #
+                # the retained messages are replayed once the subscription being made is done
+                #
+                await flt.wait_ready()
+                return
+            _LOGGER.debug("mqtt filter %s -> adding retained message subscription", topic_filter)
+            try:
+                remove_callback = await mqtt.async_subscribe(
+                    hass, topic_filter, flt.replay_handler_maker(decorator), encoding=encoding, qos=0
+                )
+            except Exception:
+                cls.unsubscribe(topic_filter, encoding, decorator)
+                raise
+            if decorator in flt.subscribers:
+                flt.subscribers[decorator] = remove_callback
+            else:
+                remove_callback()
+            return
+
+        flt = cls.filters[key] = MqttTopicFilter(topic_filter, encoding)
+        flt.subscribers[decorator] = None
+        _LOGGER.debug("mqtt filter %s -> adding broker subscription", topic_filter)
+        try:
+            remove_callback = await mqtt.async_subscribe(
+                hass, topic_filter, flt.message_handler, encoding=encoding, qos=0
+            )
+        except Exception as exc:
+            #
+            # the triggers that joined this filter while it was being subscribed are still
+            # waiting for it, so they all fail with the same error
+            #
+            if cls.filters.get(key) is flt:
+                del cls.filters[key]
+            flt.subscribers.clear()
+            flt.error = exc
+            flt.ready.set()
+            raise
+        flt.ready.set()
+        if flt.subscribers:
+            flt.remove_listener_callback = remove_callback
+        else:
+            #
+            # all triggers were stopped while we were subscribing
+            #
+            remove_callback()
+
+    @classmethod
+    def unsubscribe(cls, topic_filter: str, encoding: str, decorator: MQTTTriggerDecorator) -> None:
+        """Remove a trigger, dropping the filter and its broker subscription once unused."""
+        key = (encoding, topic_filter)
+        flt = cls.filters.get(key)
+        if flt is None or decorator not in flt.subscribers:
+            return
+        replay_remove_callback = flt.subscribers.pop(decorator)
+        if replay_remove_callback:
+            replay_remove_callback()
+        if flt.subscribers:
+            return
+        _LOGGER.debug("mqtt filter %s -> removing broker subscription", topic_filter)
+        del cls.filters[key]
+        if flt.remove_listener_callback:
+            flt.remove_listener_callback()
+            flt.remove_listener_callback = None
+
 
 class MQTTTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDecorator):
     """Implementation for @mqtt_trigger."""
 
     name = "mqtt_trigger"
     args_schema = vol.Schema(vol.All([vol.Coerce(str)], vol.Length(min=1, max=2)))
-    kwargs_schema = vol.Schema({vol.Optional("encoding", default="utf-8"): str})
+    kwargs_schema = vol.Schema(
+        {
+            vol.Optional("encoding", default="utf-8"): str,
+            vol.Optional("decode", default="json"): vol.In(["json", "raw"]),
+        }
+    )
 
     encoding: str
+    decode: str
 
-    remove_listener_callback: CALLBACK_TYPE | None = None
+    needs_payload_obj: bool = True
 
     async def validate(self) -> None:
         """Validate the MQTT trigger."""
         await super().validate()
         if len(self.args) == 2:
             self.create_expression(self.args[1])
+        self.needs_payload_obj = self.decode == "json" and (
+            self.function_uses_payload_obj() or await self.expression_uses_payload_obj()
+        )
 
-    async def _mqtt_message_handler(self, mqttmsg: mqtt.ReceiveMessage) -> None:
-        func_args = {
-            "trigger_type": "mqtt",
-            "topic": mqttmsg.topic,
-            "payload": mqttmsg.payload,
-            "qos": mqttmsg.qos,
-            "retain": mqttmsg.retain,
-        }
-        try:
-            func_args["payload_obj"] = json.loads(mqttmsg.payload)
-        except ValueError:
-            pass
+    def hot_swap(self, new_dec: Decorator) -> None:
+        """Take over the expression and whether the reloaded function needs payload_obj."""
+        super().hot_swap(new_dec)
+        self.needs_payload_obj = new_dec.needs_payload_obj
+
+    async def expression_uses_payload_obj(self) -> bool:
+        """Return True if the trigger expression references payload_obj."""
+        return self.has_expression() and "payload_obj" in await self._ast_expression.get_names()
+
+    def function_uses_payload_obj(self) -> bool:
+        """Return True if the triggered function can receive payload_obj."""
+        if not isinstance(self.dm, FunctionDecoratorManager):
+            #
+            # task.wait_until returns all the trigger variables to the caller
+            #
+            return True
+        args = self.dm.eval_func.func_def.args
+        if args.kwarg:
+            return True
+        return any(arg.arg == "payload_obj" for arg in args.posonlyargs + args.args + args.kwonlyargs)
+
+    async def handle_message(self, func_args: dict[str, Any], payload: MqttPayload) -> None:
+        """Check the optional expression and dispatch the message."""
+        if self.needs_payload_obj:
+            payload.add_payload_obj(func_args)
         if self.has_expression():
             if not await self.check_expression_vars(func_args):
                 return
@@ -53,17 +267,9 @@ class MQTTTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDeco
     async def start(self) -> None:
         """Start the MQTT trigger."""
         await super().start()
-        topic = self.args[0]
-        self.remove_listener_callback = await mqtt.async_subscribe(
-            self.dm.hass,
-            topic,
-            self._mqtt_message_handler,
-            encoding=self.encoding,
-            qos=0,
-        )
+        await MqttSubscriptionManager.subscribe(self.dm.hass, self.args[0], self.encoding, self)
 
     async def stop(self) -> None:
         """Stop the MQTT trigger."""
         await super().stop()
-        if self.remove_listener_callback:
-            self.remove_listener_callback()
+        MqttSubscriptionManager.unsubscribe(self.args[0], self.encoding, self)
@@ -89,6 +89,14 @@ class ServiceDecorator(Decorator):
                 fields[arg.arg] = OrderedDict(description=f"argument {arg.arg}")
             self.description = {"description": desc, "fields": fields}
 
+    def hot_swap(self, new_dec: Decorator) -> None:
+        """Update the service description from the docstring of the reloaded function."""
+        super().hot_swap(new_dec)
+        if new_dec.description != self.description:
+            self.description = new_dec.description
+            async_set_service_schema(Function.hass, self.args[0], self.args[1], self.description)
+            State.service_params_changed(self.args[0])
+
     async def _service_callback(self, call: ServiceCall) -> None:
         _LOGGER.info("Service callback: %s", call.service)
 
@@ -111,7 +119,7 @@ class ServiceDecorator(Decorator):
                 await self.dm.handle_exception(exc)
                 return None
 
-        task = Function.create_task(do_service_call(self.dm.eval_func, ast_ctx, func_args))
+        task = Function.create_task(do_service_call(self.dm.eval_func, ast_ctx, func_args), ast_ctx=ast_ctx)
         await task
         return task.result()
 
@@ -129,10 +137,9 @@ class ServiceDecorator(Decorator):
         )
         async_set_service_schema(Function.hass, domain, name, self.description)
 
-        # update service params. In the legacy implementation, Pyscript services were registered
-        # right after the function definition, then decorators were executed, and finally the
-        # service cache was updated.
-        await State.get_service_params()
+        # the service params are rebuilt from the description set above when the domain is next
+        # used, so registering many services doesn't fetch all the service descriptions each time
+        State.service_params_changed(domain)
 
     async def stop(self) -> None:
         """Unregister the service."""
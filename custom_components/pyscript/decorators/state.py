@@ -10,8 +10,15 @@ import voluptuous as vol
 from homeassistant.helpers import config_validation as cv
 
 from ..decorator import WaitUntilDecoratorManager
-from ..decorator_abc import DecoratorManagerStatus, DispatchData, TriggerDecorator, TriggerHandlerDecorator
-from ..state import State
+from ..decorator_abc import (
+    Decorator,
+    DecoratorManagerStatus,
+    DispatchData,
+    TriggerDecorator,
+    TriggerHandlerDecorator,
+)
+from ..startup_ramp import StartupRamp
+from ..state import QUEUE_POLICIES, QUEUE_POLICY_DROP_OLDEST, NotifyQueue, State, set_old_value
 from ..trigger import ident_any_values_changed, ident_values_changed
 from .base import AutoKwargsDecorator, ExpressionDecorator
 
@@ -80,6 +87,9 @@ class StateTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDec
             vol.Optional("state_hold_false"): vol.Any(None, cv.positive_float),
             vol.Optional("state_check_now"): cv.boolean,
             vol.Optional("watch"): vol.Any(None, vol.Coerce(set), msg="should be type list or set"),
+            vol.Optional("coalesce"): vol.Any(None, cv.positive_float),
+            vol.Optional("queue_size"): vol.Any(None, cv.positive_int),
+            vol.Optional("queue_policy"): vol.Any(None, vol.In(QUEUE_POLICIES)),
             vol.Optional("__test_handshake__"): vol.Coerce(list),
         }
     )
@@ -87,9 +97,12 @@ class StateTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDec
     state_hold: float | None
     state_hold_false: float | None
     state_check_now: bool | None
+    coalesce: float | None
+    queue_size: int | None
+    queue_policy: str | None
     __test_handshake__: list[str] | None
 
-    notify_q: asyncio.Queue
+    notify_q: NotifyQueue
     in_wait_until_function: bool
     cycle_task: asyncio.Task = None
 
@@ -109,6 +122,12 @@ class StateTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDec
 
         self.in_wait_until_function = isinstance(self.dm, WaitUntilDecoratorManager)
 
+        if self.queue_policy == QUEUE_POLICY_DROP_OLDEST and not self.queue_size:
+            raise TypeError(
+                f"function '{self.dm.func_name}' defined in {self.dm.ast_ctx.get_global_ctx_name()}: "
+                f"decorator @{self.name} queue_policy '{self.queue_policy}' requires queue_size"
+            )
+
         if self.state_check_now is None and self.in_wait_until_function:
             # check by default for task.wait_until
             self.state_check_now = True
@@ -144,12 +163,19 @@ class StateTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDec
                 self.dm.name,
             )
 
+    def can_hot_swap(self, new_dec: Decorator) -> bool:
+        """Return True if the trigger can be kept on reload; state_check_now triggers are restarted."""
+        #
+        # state_check_now checks the expression when the trigger starts, including on reload
+        #
+        return super().can_hot_swap(new_dec) and not self.state_check_now
+
     def _diff(self, dt: float, now: float) -> str:
         if dt is None:
             return "None"
         return f"{(now - dt):g} ago"
 
-    async def _check_new_state(self, trig_ok: bool) -> None:
+    async def _check_new_state(self, trig_ok: bool) -> asyncio.Task | None:
         now = asyncio.get_running_loop().time()
         if _LOGGER.isEnabledFor(logging.DEBUG):
             msg = f"check_new_state: {self}"
@@ -195,16 +221,31 @@ class StateTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDec
 
             if state_hold_true_passed:
                 self.true_entered_at = None
-                await self.dispatch(
+                task = await self.dispatch(
                     DispatchData(self.last_func_args, trigger_context={"new_vars": self.last_new_vars})
                 )
                 self.__test_handshake__ = None
+                return task
         else:
             self.true_entered_at = None
             if self.state_hold_false is not None:
                 if not self.false_entered_at:
                     _LOGGER.debug("state_hold_false started, %s", self)
                     self.false_entered_at = now
+        return None
+
+    async def _check_on_start(self) -> asyncio.Task | None:
+        self.last_new_vars = State.notify_var_get(self.state_trig_ident, {})
+        trig_ok = await self._is_trig_ok()
+
+        if self.in_wait_until_function and trig_ok and self.state_check_now is True:
+            self.state_hold_false = None
+
+        if self.state_check_now and self.has_expression():
+            return await self._check_new_state(trig_ok)
+        if not trig_ok and self.state_hold_false is not None:
+            self.false_entered_at = asyncio.get_running_loop().time()
+        return None
 
     async def _check_state_hold(self) -> None:
         if self.true_entered_at is None:
@@ -231,17 +272,14 @@ class StateTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDec
         check_state_expr_on_start = self.state_check_now or self.state_hold_false is not None
 
         if check_state_expr_on_start:
-            self.last_new_vars = State.notify_var_get(self.state_trig_ident, {})
-            trig_ok = await self._is_trig_ok()
-
-            if self.in_wait_until_function and trig_ok and self.state_check_now is True:
-                self.state_hold_false = None
-
-            if self.state_check_now and self.has_expression():
-                await self._check_new_state(trig_ok)
+            if self.in_wait_until_function:
+                await self._check_on_start()
             else:
-                if not trig_ok and self.state_hold_false is not None:
-                    self.false_entered_at = loop.time()
+                #
+                # the initial checks of all the triggers that start together go through the
+                # startup ramp, if it's configured, so they don't all run at once
+                #
+                await StartupRamp.run(self.dm.priority, self._check_on_start)
 
         if self.__test_handshake__ is not None:
             #
@@ -273,12 +311,19 @@ class StateTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDec
                     notify_type, notify_info = await asyncio.wait_for(self.notify_q.get(), effective_timeout)
                 if notify_type != "state":
                     raise RuntimeError(f"Invalid notify_type {notify_type}, {self}")
-                self.last_new_vars = notify_info[0]
-                self.last_func_args = notify_info[1]
+                changes = [notify_info]
+                if self.coalesce:
+                    changes += await self._gather_changes()
+                    self.last_new_vars, self.last_func_args = self._merge_changes(changes)
+                else:
+                    self.last_new_vars, self.last_func_args = notify_info
 
-                if ident_any_values_changed(self.last_func_args, self.state_trig_ident_any):
+                if any(
+                    ident_any_values_changed(func_args, self.state_trig_ident_any)
+                    for _, func_args in changes
+                ):
                     trig_ok = True
-                elif ident_values_changed(self.last_func_args, self.state_trig_ident):
+                elif any(ident_values_changed(func_args, self.state_trig_ident) for _, func_args in changes):
                     trig_ok = await self._is_trig_ok()
                 else:
                     trig_ok = False
@@ -286,6 +331,38 @@ class StateTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDec
             except TimeoutError:
                 await self._check_state_hold()
 
+    async def _gather_changes(self) -> list[list[dict[str, Any]]]:
+        """Return the further state changes that arrive within the coalesce window."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.coalesce
+        changes = []
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                notify_type, notify_info = await asyncio.wait_for(self.notify_q.get(), remaining)
+            except TimeoutError:
+                break
+            if notify_type != "state":
+                raise RuntimeError(f"Invalid notify_type {notify_type}, {self}")
+            changes.append(notify_info)
+        return changes
+
+    def _merge_changes(self, changes: list[list[dict[str, Any]]]) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Merge coalesced changes into the latest values, with the old values from before the window."""
+        new_vars, func_args = changes[-1]
+        new_vars = new_vars.copy()
+        func_args = func_args.copy()
+        first_old_value = {}
+        for _, change_args in changes:
+            var_name = change_args.get("var_name")
+            if var_name is not None and var_name not in first_old_value:
+                first_old_value[var_name] = change_args.get("old_value")
+        for var_name, old_value in first_old_value.items():
+            set_old_value(new_vars, var_name, old_value)
+        if func_args.get("var_name") in first_old_value:
+            func_args["old_value"] = first_old_value[func_args["var_name"]]
+        func_args["changes"] = [change_args for _, change_args in changes]
+        return new_vars, func_args
+
     async def _is_trig_ok(self) -> bool:
         if self.has_expression():
             return await self.check_expression_vars(self.last_new_vars)
@@ -298,10 +375,16 @@ class StateTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDec
         if exc is not None:
             self.dm.logger.error("%s failed", self, exc_info=exc)
 
+    def get_stats(self) -> dict[str, Any] | None:
+        """Return the notify queue counters if the queue is bounded or has an overflow policy."""
+        if (self.queue_size or self.queue_policy) and hasattr(self, "notify_q"):
+            return self.notify_q.get_stats()
+        return None
+
     async def start(self) -> None:
         """Start the trigger."""
         await super().start()
-        self.notify_q = asyncio.Queue(0)
+        self.notify_q = NotifyQueue(self.queue_size or 0, self.queue_policy, name=self.dm.name)
         if not await State.notify_add(self.state_trig_ident, self.notify_q):
             self.dm.logger.error(
                 "trigger %s: @state_trigger is not watching any variables; will never trigger",
@@ -319,3 +402,10 @@ class StateTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsDec
         if self.cycle_task is not None:
             self.cycle_task.cancel()
         State.notify_del(self.state_trig_ident, self.notify_q)
+        if self.notify_q.dropped or self.notify_q.coalesced:
+            _LOGGER.debug(
+                "trigger %s: notify queue dropped %d, coalesced %d",
+                self.dm.name,
+                self.notify_q.dropped,
+                self.notify_q.coalesced,
+            )
@@ -2,27 +2,86 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import deque
 import logging
+from typing import Any
 
 import voluptuous as vol
 
 from homeassistant.helpers import config_validation as cv
 
-from ..decorator_abc import CallHandlerDecorator, DispatchData
+from ..decorator import FunctionDecoratorManager
+from ..decorator_abc import (
+    CallHandlerDecorator,
+    Decorator,
+    DecoratorManagerStatus,
+    DispatchData,
+    TaskHandlerDecorator,
+)
 from ..function import Function
 from .base import AutoKwargsDecorator
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class TaskUniqueDecorator(CallHandlerDecorator, AutoKwargsDecorator):
+class TaskUniqueDecorator(CallHandlerDecorator, TaskHandlerDecorator, AutoKwargsDecorator):
     """Implementation for @task_unique."""
 
     name = "task_unique"
     args_schema = vol.Schema(vol.All([str], vol.Length(min=1, max=1)))
-    kwargs_schema = vol.Schema({vol.Optional("kill_me", default=False): cv.boolean})
+    kwargs_schema = vol.Schema(
+        {
+            vol.Optional("kill_me", default=False): cv.boolean,
+            vol.Optional("queue_latest", default=False): cv.boolean,
+        }
+    )
 
     kill_me: bool
+    queue_latest: bool
+
+    running_task: asyncio.Task | None = None
+    pending_data: DispatchData | None = None
+    waiting_on: asyncio.Task | None = None
+
+    async def validate(self) -> None:
+        """Validate the decorator arguments."""
+        await super().validate()
+        if self.kill_me and self.queue_latest:
+            raise TypeError(
+                f"function '{self.dm.func_name}' defined in {self.dm.ast_ctx.get_global_ctx_name()}: "
+                f"decorator @{self.name} kill_me and queue_latest can't both be set"
+            )
+
+    def handle_task(self, data: DispatchData) -> bool:
+        """With queue_latest, start the action if the name is free, otherwise keep it as the pending one."""
+        if not self.queue_latest or not isinstance(self.dm, FunctionDecoratorManager):
+            return True
+
+        blocking_task = self.running_task
+        if blocking_task is None or blocking_task.done():
+            full_name = f"{self.dm.ast_ctx.get_global_ctx_name()}.{self.args[0]}"
+            blocking_task = Function.unique_name2task.get(full_name)
+        if blocking_task is None or blocking_task.done():
+            self.running_task = self.dm.start_call(data)
+            return False
+
+        if self.pending_data is not None:
+            _LOGGER.debug("%s: @task_unique queue_latest replaced pending action", self.dm.name)
+        self.pending_data = data
+        if self.waiting_on is not blocking_task:
+            self.waiting_on = blocking_task
+            blocking_task.add_done_callback(self._on_blocking_task_done)
+        return False
+
+    def _on_blocking_task_done(self, task: asyncio.Task) -> None:
+        """Start the pending action once the task holding the name finishes."""
+        if task is not self.waiting_on:
+            return
+        self.waiting_on = None
+        data, self.pending_data = self.pending_data, None
+        if data is not None and self.dm.status is DecoratorManagerStatus.RUNNING:
+            self.handle_task(data)
 
     async def handle_call(self, data: DispatchData) -> bool:
         """Handle call."""
@@ -38,3 +97,120 @@ class TaskUniqueDecorator(CallHandlerDecorator, AutoKwargsDecorator):
         task_unique_func = Function.task_unique_factory(data.call_ast_ctx)
         await task_unique_func(self.args[0])
         return True
+
+    async def stop(self) -> None:
+        """Drop any pending action."""
+        await super().stop()
+        self.pending_data = None
+        self.waiting_on = None
+
+
+class TaskLimitDecorator(CallHandlerDecorator, AutoKwargsDecorator):
+    """Implementation for @task_limit."""
+
+    name = "task_limit"
+    kwargs_schema = vol.Schema(
+        {
+            vol.Required("max_concurrent"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional("queue"): vol.Any(None, cv.positive_int),
+            vol.Optional("overflow"): vol.In(["drop", "wait"]),
+        }
+    )
+
+    max_concurrent: int
+    queue: int | None
+    overflow: str | None
+
+    running: int
+    waiters: deque[asyncio.Future]
+    queued: int
+    rejected: int
+
+    async def validate(self) -> None:
+        """Validate the decorator arguments."""
+        await super().validate()
+        if "queue" in self.kwargs and "overflow" in self.kwargs:
+            raise TypeError(
+                f"function '{self.dm.func_name}' defined in {self.dm.ast_ctx.get_global_ctx_name()}: "
+                f"decorator @{self.name} queue and overflow can't both be set"
+            )
+        if self.queue is None:
+            #
+            # overflow picks the queue: drop (the default) never queues and wait always queues
+            #
+            self.queue = None if self.overflow == "wait" else 0
+        self.running = 0
+        self.waiters = deque()
+        self.queued = 0
+        self.rejected = 0
+
+    async def handle_call(self, data: DispatchData) -> bool:
+        """Run the action if a slot is free, otherwise wait in the queue or reject it."""
+        if self.running >= self.max_concurrent or self.waiters:
+            if self.queue is not None and len(self.waiters) >= self.queue:
+                self.rejected += 1
+                if self.rejected == 1:
+                    self.dm.logger.warning(
+                        "%s: @task_limit(max_concurrent=%d) is full; rejecting new actions",
+                        self.dm.name,
+                        self.max_concurrent,
+                    )
+                return False
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            self.queued += 1
+            try:
+                #
+                # the slot is handed over by _release, which has already counted it
+                #
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                elif waiter in self.waiters:
+                    self.waiters.remove(waiter)
+                raise
+        else:
+            self.running += 1
+        asyncio.current_task().add_done_callback(self._release)
+        return True
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the running and waiting actions, and how many were queued and rejected."""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self.running,
+            "waiting": sum(1 for waiter in self.waiters if not waiter.done()),
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
+
+    def _release(self, _task: asyncio.Task | None = None) -> None:
+        """Free a slot, handing it to the oldest waiting action if there is one."""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    async def stop(self) -> None:
+        """Log the admission counters."""
+        await super().stop()
+        if self.queued or self.rejected:
+            _LOGGER.debug(
+                "%s: @task_limit queued %d and rejected %d actions", self.dm.name, self.queued, self.rejected
+            )
+
+
+class TaskPriorityDecorator(Decorator):
+    """Implementation for @task_priority."""
+
+    name = "task_priority"
+    args_schema = vol.Schema(vol.All([vol.Coerce(int)], vol.Length(min=1, max=1)))
+
+    async def validate(self) -> None:
+        """Validate the decorator arguments and set the action priority."""
+        await super().validate()
+        if isinstance(self.dm, FunctionDecoratorManager):
+            self.dm.priority = self.args[0]
@@ -13,7 +13,14 @@ from homeassistant.helpers import config_validation as cv
 
 from .. import trigger
 from ..decorator import WaitUntilDecoratorManager
-from ..decorator_abc import DecoratorManagerStatus, DispatchData, TriggerDecorator, TriggerHandlerDecorator
+from ..decorator_abc import (
+    Decorator,
+    DecoratorManagerStatus,
+    DispatchData,
+    TriggerDecorator,
+    TriggerHandlerDecorator,
+)
+from ..startup_ramp import StartupRamp
 from .base import AutoKwargsDecorator
 
 _LOGGER = logging.getLogger(__name__)
@@ -95,9 +102,20 @@ class TimeTriggerDecorator(TriggerDecorator):
             self.run_on_shutdown = True
             self.timespec.remove("shutdown")
 
+    def can_hot_swap(self, new_dec: Decorator) -> bool:
+        """Return True if the trigger can be kept on reload; startup and shutdown triggers are restarted."""
+        #
+        # startup and shutdown triggers run when a function is loaded and unloaded,
+        # including on reload
+        #
+        return super().can_hot_swap(new_dec) and not self.run_on_startup and not self.run_on_shutdown
+
     async def _cycle(self):
         if self.run_on_startup:
-            await self.dispatch(DispatchData({"trigger_type": "time", "trigger_time": "startup"}))
+            await StartupRamp.run(
+                self.dm.priority,
+                lambda: self.dispatch(DispatchData({"trigger_type": "time", "trigger_time": "startup"})),
+            )
 
         first_run = True
         try:
@@ -10,6 +10,7 @@ from homeassistant.components.webhook import SUPPORTED_METHODS
 from homeassistant.helpers import config_validation as cv
 
 from ..decorator_abc import DispatchData, TriggerDecorator
+from ..json_codec import json_loads
 from .base import AutoKwargsDecorator, ExpressionDecorator
 
 _LOGGER = logging.getLogger(__name__)
@@ -51,7 +52,7 @@ class WebhookTriggerDecorator(TriggerDecorator, ExpressionDecorator, AutoKwargsD
         }
 
         if "json" in request.headers.get(hdrs.CONTENT_TYPE, ""):
-            func_args["payload"] = await request.json()
+            func_args["payload"] = await request.json(loads=json_loads)
         else:
             # Could potentially return multiples of a key - only take the first
             payload_multidict = await request.post()
@@ -14,7 +14,7 @@ import sys
 import time
 import traceback
 from types import TracebackType
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 import weakref
 
 import yaml
@@ -31,8 +31,11 @@ from .const import (
     LOGGER_PATH,
     SERVICE_JUPYTER_KERNEL_START,
 )
+from .executor import Executor
 from .function import Function
-from .state import State
+from .lazy_module import LazyModule
+from .state import QUEUE_POLICIES, QUEUE_POLICY_DROP_OLDEST, State
+from .tracer import TraceRegistry
 
 if TYPE_CHECKING:
     from .global_ctx import GlobalContext
@@ -72,6 +75,7 @@ COMP_DECORATORS = {
 }
 
 TRIGGER_KWARGS = {
+    "changes",
     "context",
     "event_type",
     "old_value",
@@ -404,6 +408,8 @@ class EvalFunc:
                 "state_check_now": {bool, int},
                 "state_hold_false": {int, float},
                 "watch": {set, list},
+                "queue_size": {int},
+                "queue_policy": {str},
             },
             "webhook_trigger": {
                 "kwargs": {dict},
@@ -517,7 +523,9 @@ class EvalFunc:
                                 ast_ctx.log_exception(exc)
                             return None
 
-                        task = Function.create_task(do_service_call(func, ast_ctx, func_args))
+                        task = Function.create_task(
+                            do_service_call(func, ast_ctx, func_args), ast_ctx=ast_ctx
+                        )
                         await task
                         return task.result()
 
@@ -544,6 +552,18 @@ class EvalFunc:
                 if len(bad := set(dec_kwargs["methods"]).difference(WEBHOOK_METHODS)) > 0:
                     raise TypeError(f"{exc_mesg}: {bad} aren't valid {dec_name} methods")
 
+            if dec_name == "state_trigger":
+                queue_size = dec_kwargs.get("queue_size", None)
+                queue_policy = dec_kwargs.get("queue_policy", None)
+                if queue_size is not None and queue_size <= 0:
+                    raise TypeError(f"{exc_mesg}: decorator @{dec_name} queue_size should be positive")
+                if queue_policy is not None and queue_policy not in QUEUE_POLICIES:
+                    raise TypeError(f"{exc_mesg}: '{queue_policy}' isn't a valid {dec_name} queue_policy")
+                if queue_policy == QUEUE_POLICY_DROP_OLDEST and not queue_size:
+                    raise TypeError(
+                        f"{exc_mesg}: decorator @{dec_name} queue_policy '{queue_policy}' requires queue_size"
+                    )
+
             if dec_name not in trig_decs:
                 trig_decs[dec_name] = []
             if len(trig_decs[dec_name]) > 0 and "rep_ok" not in arg_info:
@@ -902,6 +922,13 @@ class EvalFuncVarClassInst(EvalFuncVar):
 class AstEval:
     """Python interpreter AST object evaluator."""
 
+    #
+    # if set, an interpreted loop that runs longer than this many seconds without awaiting
+    # yields to the event loop at its back-edge, so other tasks stay responsive
+    #
+    loop_budget: ClassVar[float | None] = None
+    loop_budget_warned: ClassVar[set[tuple[str, str, int]]] = set()
+
     def __init__(self, name: str, global_ctx: "GlobalContext", logger_name: str | None = None) -> None:
         """Initialize an interpreter execution context."""
         self.name = name
@@ -923,6 +950,48 @@ class AstEval:
         self.config_entry = Function.hass.data.get(DOMAIN, {}).get(CONFIG_ENTRY, {})
         self.dec_eval_depth = 0
 
+    @classmethod
+    def set_loop_budget(cls, budget_ms: float | None) -> None:
+        """Set the loop yield budget in milliseconds; None disables it."""
+        cls.loop_budget = budget_ms / 1000 if budget_ms else None
+        cls.loop_budget_warned = set()
+
+    @staticmethod
+    def loop_slice_start(loop_slice: list | None = None) -> list:
+        """Start a loop slice of [start time, suspended flag]; the flag is set once the task awaits."""
+        if loop_slice is None:
+            loop_slice = [0.0, False]
+        loop_slice[0] = time.monotonic()
+        loop_slice[1] = False
+        #
+        # this callback can only run once the task running the loop has given up the event
+        # loop, so it tells us the loop body really awaited, and the slice starts over
+        #
+        asyncio.get_running_loop().call_soon(loop_slice.__setitem__, 1, True)
+        return loop_slice
+
+    def loop_slice_expired(self, loop_slice: list) -> bool:
+        """Return True if a loop ran longer than its budget since it last awaited."""
+        if loop_slice[1]:
+            self.loop_slice_start(loop_slice)
+            return False
+        return time.monotonic() - loop_slice[0] > self.loop_budget
+
+    async def loop_yield(self, arg: ast.AST) -> None:
+        """Yield to the event loop from a loop that exceeded its budget."""
+        func_name = self.curr_func.name if self.curr_func else "<module>"
+        key = (self.get_global_ctx_name(), func_name, arg.lineno)
+        if key not in self.loop_budget_warned:
+            self.loop_budget_warned.add(key)
+            self.get_logger().warning(
+                "%s: loop in %s at line %d ran for more than %g ms without awaiting; yielding to other tasks",
+                key[0],
+                func_name,
+                arg.lineno,
+                self.loop_budget * 1000,
+            )
+        await asyncio.sleep(0)
+
     async def ast_not_implemented(self, arg, *args):
         """Raise NotImplementedError exception for unimplemented AST types."""
         name = "ast_" + arg.__class__.__name__.lower()
@@ -951,7 +1020,7 @@ class AstEval:
     async def ast_import(self, arg):
         """Execute import."""
         for imp in arg.names:
-            mod = await self.global_ctx.module_import(imp.name, 0)
+            mod = await self.global_ctx.module_import(imp.name, 0, lazy=True)
             if not mod:
                 if (
                     not self.config_entry.data.get(CONF_ALLOW_ALL_IMPORTS, False)
@@ -969,7 +1038,7 @@ class AstEval:
         if arg.module is None:
             # handle: "from . import xyz"
             for imp in arg.names:
-                mod = await self.global_ctx.module_import(imp.name, arg.level)
+                mod = await self.global_ctx.module_import(imp.name, arg.level, lazy=True)
                 if not mod:
                     raise ModuleNotFoundError(f"module '{imp.name}' not found")
                 self.sym_table[imp.name if imp.asname is None else imp.asname] = mod
@@ -1018,6 +1087,9 @@ class AstEval:
 
     async def ast_for(self, arg):
         """Execute for statement."""
+        budget = self.loop_budget
+        if budget is not None:
+            loop_slice = self.loop_slice_start()
         for loop_var in await self.aeval(arg.iter):
             await self.recurse_assign(arg.target, loop_var)
             for arg1 in arg.body:
@@ -1028,6 +1100,8 @@ class AstEval:
                 break
             if isinstance(val, EvalReturn):
                 return val
+            if budget is not None and self.loop_slice_expired(loop_slice):
+                await self.loop_yield(arg)
         else:
             for arg1 in arg.orelse:
                 val = await self.aeval(arg1)
@@ -1041,6 +1115,9 @@ class AstEval:
 
     async def ast_while(self, arg):
         """Execute while statement."""
+        budget = self.loop_budget
+        if budget is not None:
+            loop_slice = self.loop_slice_start()
         while await self.aeval(arg.test):
             for arg1 in arg.body:
                 val = await self.aeval(arg1)
@@ -1050,6 +1127,8 @@ class AstEval:
                 break
             if isinstance(val, EvalReturn):
                 return val
+            if budget is not None and self.loop_slice_expired(loop_slice):
+                await self.loop_yield(arg)
         else:
             for arg1 in arg.orelse:
                 val = await self.aeval(arg1)
@@ -1118,10 +1197,25 @@ class AstEval:
             pyscript_compile = dec
 
         if pyscript_compile:
+            executor_kwargs = {}
+            process = False
             if isinstance(pyscript_compile, ast.Call):
                 if len(pyscript_compile.args) > 0:
                     raise TypeError(f"@{dec_name}() takes 0 positional arguments")
-                if len(pyscript_compile.keywords) > 0:
+                if dec_name == "pyscript_executor":
+                    for keyword in pyscript_compile.keywords:
+                        if keyword.arg not in {"timeout", "process"}:
+                            raise TypeError(
+                                f"@{dec_name}() got an unexpected keyword argument '{keyword.arg}'"
+                            )
+                        executor_kwargs[keyword.arg] = await self.aeval(keyword.value)
+                    timeout = executor_kwargs.get("timeout")
+                    if timeout is not None and (
+                        isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0
+                    ):
+                        raise TypeError(f"@{dec_name}() timeout must be a positive number")
+                    process = executor_kwargs.pop("process", False)
+                elif len(pyscript_compile.keywords) > 0:
                     raise TypeError(f"@{dec_name}() takes no keyword arguments")
             arg.decorator_list = other_dec
             local_var = None
@@ -1132,12 +1226,26 @@ class AstEval:
 
             func = self.sym_table[arg.name]
             if dec_name == "pyscript_executor":
-                if not asyncio.iscoroutinefunction(func):
+                if process and not asyncio.iscoroutinefunction(func):
+                    Executor.check_process_function(func)
+                    #
+                    # start the worker processes now, so the first call doesn't wait for them
+                    #
+                    await Function.hass.async_add_executor_job(Executor.get_process_pool)
+
+                    def process_wrap_factory(func):
+                        async def process_wrap(*args, **kwargs):
+                            return await Executor.run_process(func, args, kwargs, **executor_kwargs)
+
+                        return process_wrap
+
+                    self.sym_table[arg.name] = process_wrap_factory(func)
+                elif not asyncio.iscoroutinefunction(func):
 
                     def executor_wrap_factory(func):
                         async def executor_wrap(*args, **kwargs):
-                            return await Function.hass.async_add_executor_job(
-                                functools.partial(func, **kwargs), *args
+                            return await Executor.run(
+                                functools.partial(func, **kwargs), *args, **executor_kwargs
                             )
 
                         return executor_wrap
@@ -1514,6 +1622,8 @@ class AstEval:
             if not isinstance(val, EvalName):
                 return val
         val = await self.aeval(arg.value)
+        if isinstance(val, LazyModule):
+            await val.load()
         if isinstance(arg.ctx, ast.Store):
             return EvalAttrSet(val, arg.attr)
         return getattr(val, arg.attr)
@@ -1748,6 +1858,9 @@ class AstEval:
         """Recursive list comprehension."""
         out = []
         gen = generators[0]
+        budget = self.loop_budget
+        if budget is not None:
+            loop_slice = self.loop_slice_start()
         for loop_var in await self.aeval(gen.iter):
             await self.recurse_assign(gen.target, loop_var)
             for cond in gen.ifs:
@@ -1758,6 +1871,8 @@ class AstEval:
                     out.append(await self.aeval(elt))
                 else:
                     out += await self.listcomp_loop(generators[1:], elt)
+            if budget is not None and self.loop_slice_expired(loop_slice):
+                await self.loop_yield(gen.iter)
         return out
 
     async def ast_listcomp(self, arg):
@@ -1786,6 +1901,9 @@ class AstEval:
         """Recursive dict comprehension."""
         out = {}
         gen = generators[0]
+        budget = self.loop_budget
+        if budget is not None:
+            loop_slice = self.loop_slice_start()
         for loop_var in await self.aeval(gen.iter):
             await self.recurse_assign(gen.target, loop_var)
             for cond in gen.ifs:
@@ -1800,6 +1918,8 @@ class AstEval:
                     out[key_val] = await self.aeval(value)
                 else:
                     out.update(await self.dictcomp_loop(generators[1:], key, value))
+            if budget is not None and self.loop_slice_expired(loop_slice):
+                await self.loop_yield(gen.iter)
         return out
 
     async def ast_dictcomp(self, arg):
@@ -1820,6 +1940,9 @@ class AstEval:
         """Recursive list comprehension."""
         out = set()
         gen = generators[0]
+        budget = self.loop_budget
+        if budget is not None:
+            loop_slice = self.loop_slice_start()
         for loop_var in await self.aeval(gen.iter):
             await self.recurse_assign(gen.target, loop_var)
             for cond in gen.ifs:
@@ -1830,6 +1953,8 @@ class AstEval:
                     out.add(await self.aeval(elt))
                 else:
                     out.update(await self.setcomp_loop(generators[1:], elt))
+            if budget is not None and self.loop_slice_expired(loop_slice):
+                await self.loop_yield(gen.iter)
         return out
 
     async def ast_setcomp(self, arg):
@@ -1892,27 +2017,41 @@ class AstEval:
                 func_name = "<function>"
         arg_str = ", ".join(['"' + elt + '"' if isinstance(elt, str) else str(elt) for elt in args])
         _LOGGER.debug("%s: calling %s(%s, %s)", self.name, func_name, arg_str, kwargs)
-        if isinstance(func, (EvalFunc, EvalFuncVar)):
-            return await func.call(self, *args, **kwargs)
-        if inspect.isclass(func) and hasattr(func, "__init__evalfunc_wrap__"):
-            has_init_wrapper = getattr(func, "__init__evalfunc_wrap__") is not None
-            inst = func(*args, **kwargs) if not has_init_wrapper else func()
-            if has_init_wrapper:
-                #
-                # since our __init__ function is async, call the renamed one
-                #
-                await inst.__init__evalfunc_wrap__.call(self, *args, **kwargs)
-            return inst
-        if asyncio.iscoroutinefunction(func):
-            return await func(*args, **kwargs)
-        if callable(func):
-            if func == time.sleep:  # pylint: disable=comparison-with-callable
-                _LOGGER.warning(
-                    "%s calls blocking time.sleep(); replaced with asyncio.sleep()", self.filename
-                )
-                return await asyncio.sleep(*args, **kwargs)
-            return func(*args, **kwargs)
-        raise TypeError(f"'{func_name}' is not callable (got {func})")
+        spans = (
+            TraceRegistry.start("function_call", self, func_name, args, kwargs)
+            if TraceRegistry.tracers
+            else None
+        )
+        try:
+            if isinstance(func, (EvalFunc, EvalFuncVar)):
+                result = await func.call(self, *args, **kwargs)
+            elif inspect.isclass(func) and hasattr(func, "__init__evalfunc_wrap__"):
+                has_init_wrapper = getattr(func, "__init__evalfunc_wrap__") is not None
+                result = func(*args, **kwargs) if not has_init_wrapper else func()
+                if has_init_wrapper:
+                    #
+                    # since our __init__ function is async, call the renamed one
+                    #
+                    await result.__init__evalfunc_wrap__.call(self, *args, **kwargs)
+            elif asyncio.iscoroutinefunction(func):
+                result = await func(*args, **kwargs)
+            elif callable(func):
+                if func == time.sleep:  # pylint: disable=comparison-with-callable
+                    _LOGGER.warning(
+                        "%s calls blocking time.sleep(); replaced with asyncio.sleep()", self.filename
+                    )
+                    result = await asyncio.sleep(*args, **kwargs)
+                else:
+                    result = func(*args, **kwargs)
+            else:
+                raise TypeError(f"'{func_name}' is not callable (got {func})")
+        except BaseException as exc:
+            if spans is not None:
+                TraceRegistry.end(spans, "function_return", None, exc)
+            raise
+        if spans is not None:
+            TraceRegistry.end(spans, "function_return", result, None)
+        return result
 
     async def ast_ifexp(self, arg):
         """Evaluate if expression."""
@@ -2062,8 +2201,14 @@ class AstEval:
             await self.get_names_set(this_ast, names, nonlocal_names, global_names, local_names)
         return names
 
-    def parse(self, code_str: str | list[str], filename: str | None = None, mode: str = "exec") -> None:
-        """Parse the code_str source code into an AST tree."""
+    def parse(
+        self,
+        code_str: str | list[str],
+        filename: str | None = None,
+        mode: str = "exec",
+        tree: ast.AST | None = None,
+    ) -> None:
+        """Parse the code_str source code into an AST tree, unless the already parsed tree is given."""
         self.ast = None
         if filename is not None:
             self.filename = filename
@@ -2076,7 +2221,7 @@ class AstEval:
         else:
             self.code_str = code_str
             self.code_list = []
-        self.ast = ast.parse(self.code_str, filename=self.filename, mode=mode)
+        self.ast = tree if tree is not None else ast.parse(self.code_str, filename=self.filename, mode=mode)
 
     def log_exception(self, exc: Exception) -> None:
         """Log eval exception."""
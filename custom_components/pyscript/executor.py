@@ -0,0 +1,321 @@
+"""Thread and process pools used by pyscript to run blocking functions."""
+
+from __future__ import annotations
+
+import asyncio
+import builtins
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import dis
+import functools
+import importlib
+import logging
+import marshal
+import multiprocessing
+import os
+import pickle
+import threading
+import types
+from typing import Any, ClassVar
+
+from .const import LOGGER_PATH
+
+_LOGGER = logging.getLogger(LOGGER_PATH + ".executor")
+
+DEFAULT_EXECUTOR_WORKERS = 8
+
+
+def code_global_names(code: types.CodeType) -> set[str]:
+    """Return the global names loaded by code and the code objects nested in it."""
+    names = {
+        instr.argval for instr in dis.get_instructions(code) if instr.opname in {"LOAD_GLOBAL", "LOAD_NAME"}
+    }
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= code_global_names(const)
+    return names
+
+
+def process_warm_up() -> int:
+    """Return the worker's pid; used to start the worker processes ahead of the first call."""
+    return os.getpid()
+
+
+def process_call(payload: bytes) -> bytes:
+    """Rebuild a marshalled function in a worker process, call it and return its pickled result."""
+    code, name, defaults, kwdefaults, modules, values, args, kwargs = pickle.loads(payload)  # noqa: S301
+    func_globals = {"__builtins__": builtins, "__name__": name}
+    for var_name, mod_name in modules.items():
+        func_globals[var_name] = importlib.import_module(mod_name)
+    func_globals.update(values)
+    func = types.FunctionType(marshal.loads(code), func_globals, name, defaults)  # noqa: S302
+    func.__kwdefaults__ = kwdefaults
+    result = func(*args, **kwargs)
+    try:
+        return pickle.dumps(result)
+    except Exception as exc:
+        raise TypeError(f"result of {name} can't be returned from a process: {exc}") from None
+
+
+class Executor:
+    """Run blocking functions in pyscript-owned thread and process pools."""
+
+    #
+    # pyscript runs @pyscript_executor functions and task.executor calls in its own pool,
+    # so slow blocking helpers don't starve the Home Assistant executor, and vice versa
+    #
+    max_workers: ClassVar[int] = DEFAULT_EXECUTOR_WORKERS
+    pool: ClassVar[ThreadPoolExecutor | None] = None
+
+    #
+    # @pyscript_executor(process=True) functions run in a process pool, so CPU-bound work
+    # isn't limited by the GIL; None processes means one per CPU
+    #
+    max_processes: ClassVar[int | None] = None
+    process_pool: ClassVar[ProcessPoolExecutor | None] = None
+
+    #
+    # set by shutdown, so no pool is created again until the executor is configured
+    #
+    closed: ClassVar[bool] = False
+
+    #
+    # metrics; queued and running are also updated from the worker threads, so they are
+    # protected by a lock
+    #
+    lock: ClassVar[threading.Lock] = threading.Lock()
+    queued: ClassVar[int] = 0
+    running: ClassVar[int] = 0
+    max_queued: ClassVar[int] = 0
+    completed: ClassVar[int] = 0
+    timeouts: ClassVar[int] = 0
+    cancelled: ClassVar[int] = 0
+    process_calls: ClassVar[int] = 0
+
+    @classmethod
+    def configure(cls, max_workers: int | None, max_processes: int | None = None) -> None:
+        """Set the number of worker threads and processes, replacing a pool if its size changes."""
+        cls.closed = False
+        max_workers = max_workers or DEFAULT_EXECUTOR_WORKERS
+        if max_workers != cls.max_workers:
+            cls.max_workers = max_workers
+            if cls.pool is not None:
+                #
+                # calls already running in the old pool finish there
+                #
+                cls.pool.shutdown(wait=False)
+                cls.pool = None
+        if max_processes != cls.max_processes:
+            cls.max_processes = max_processes
+            if cls.process_pool is not None:
+                cls.process_pool.shutdown(wait=False)
+                cls.process_pool = None
+
+    @classmethod
+    def shutdown(cls, wait: bool = False) -> None:
+        """Shut down the pools, dropping calls that haven't started."""
+        cls.closed = True
+        if cls.pool is None and cls.process_pool is None:
+            return
+        _LOGGER.debug("shutting down executor: %s", cls.get_stats())
+        if cls.pool is not None:
+            cls.pool.shutdown(wait=wait, cancel_futures=True)
+            cls.pool = None
+        if cls.process_pool is not None:
+            cls.process_pool.shutdown(wait=wait, cancel_futures=True)
+            cls.process_pool = None
+
+    @classmethod
+    async def async_shutdown(cls) -> None:
+        """Shut down the pools, and wait in another thread until the worker processes have exited."""
+        #
+        # a thread can't be interrupted, so only the worker processes are waited for; they
+        # exit once their running calls finish
+        #
+        process_pool = cls.process_pool
+        cls.process_pool = None
+        cls.shutdown()
+        if process_pool is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(process_pool.shutdown, wait=True, cancel_futures=True)
+            )
+
+    @classmethod
+    def get_pool(cls) -> ThreadPoolExecutor:
+        """Return the pool, creating it on first use."""
+        if cls.pool is None:
+            if cls.closed:
+                raise RuntimeError("pyscript executor is shut down")
+            cls.pool = ThreadPoolExecutor(max_workers=cls.max_workers, thread_name_prefix="pyscript")
+        return cls.pool
+
+    @classmethod
+    def get_process_pool(cls) -> ProcessPoolExecutor:
+        """Return the process pool, creating it and starting its workers on first use."""
+        with cls.lock:
+            if cls.process_pool is None:
+                if cls.closed:
+                    raise RuntimeError("pyscript executor is shut down")
+                #
+                # spawn avoids forking the Home Assistant process with all its threads
+                #
+                max_processes = cls.max_processes or os.cpu_count() or 1
+                cls.process_pool = ProcessPoolExecutor(
+                    max_workers=max_processes, mp_context=multiprocessing.get_context("spawn")
+                )
+                for _ in range(max_processes):
+                    cls.process_pool.submit(process_warm_up)
+            return cls.process_pool
+
+    @classmethod
+    def check_process_function(cls, func: Callable[..., Any]) -> None:
+        """Raise TypeError if func can't be run in a worker process."""
+        if func.__closure__:
+            raise TypeError(
+                f"@pyscript_executor(process=True) function {func.__name__} can't use variables "
+                "of an enclosing function"
+            )
+
+    @classmethod
+    async def run_process(
+        cls,
+        func: types.FunctionType,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        timeout: float | None = None,
+    ) -> Any:
+        """Run a compiled function in the process pool and return its result."""
+        #
+        # the function is defined in a pyscript global context that isn't importable, so it
+        # can't be pickled by reference; send its code, and its globals (modules by name)
+        #
+        modules = {}
+        values = {}
+        for var_name in code_global_names(func.__code__):
+            if var_name not in func.__globals__:
+                continue
+            value = func.__globals__[var_name]
+            if isinstance(value, types.ModuleType):
+                modules[var_name] = value.__name__
+            else:
+                values[var_name] = value
+        try:
+            payload = pickle.dumps(
+                (
+                    marshal.dumps(func.__code__),
+                    func.__name__,
+                    func.__defaults__,
+                    func.__kwdefaults__,
+                    modules,
+                    values,
+                    args,
+                    kwargs,
+                )
+            )
+        except Exception as exc:
+            raise TypeError(
+                f"arguments or globals of {func.__name__} can't be passed to a process: {exc}"
+            ) from None
+
+        loop = asyncio.get_running_loop()
+        pool = cls.process_pool or await loop.run_in_executor(cls.get_pool(), cls.get_process_pool)
+        cls.process_calls += 1
+        try:
+            future = loop.run_in_executor(pool, process_call, payload)
+            result = await cls.wait_call(future, timeout, func.__name__)
+        except BrokenProcessPool:
+            #
+            # a worker process died, eg, killed or out of memory; the pool can't run any more
+            # calls, so drop it and start new workers on the next call
+            #
+            _LOGGER.warning("worker process died running %s; restarting the process pool", func.__name__)
+            with cls.lock:
+                if cls.process_pool is pool:
+                    cls.process_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            cls.process_calls -= 1
+        return pickle.loads(result)  # noqa: S301
+
+    @classmethod
+    async def wait_call(cls, future: asyncio.Future, timeout: float | None, name: str) -> Any:
+        """Wait for the result of a call, counting it as completed, timed out or cancelled."""
+        try:
+            if timeout is None:
+                result = await future
+            else:
+                result = await asyncio.wait_for(future, timeout)
+        except asyncio.CancelledError:
+            cls.cancelled += 1
+            raise
+        except TimeoutError:
+            if not future.cancelled():
+                #
+                # the function itself raised TimeoutError
+                #
+                cls.completed += 1
+                raise
+            cls.timeouts += 1
+            raise TimeoutError(f"executor call of {name} timed out after {timeout}s") from None
+        except Exception:
+            cls.completed += 1
+            raise
+        cls.completed += 1
+        return result
+
+    @classmethod
+    async def run(
+        cls, func: Callable[..., Any], *args: Any, timeout: float | None = None, **kwargs: Any
+    ) -> Any:
+        """Run func(*args, **kwargs) in the pool and return its result, optionally with a timeout."""
+        started = False
+
+        def run_job() -> Any:
+            nonlocal started
+            with cls.lock:
+                if not started:
+                    started = True
+                    cls.queued -= 1
+                cls.running += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with cls.lock:
+                    cls.running -= 1
+
+        with cls.lock:
+            cls.queued += 1
+            cls.max_queued = max(cls.max_queued, cls.running + cls.queued - cls.max_workers)
+        try:
+            future = asyncio.get_running_loop().run_in_executor(cls.get_pool(), run_job)
+            #
+            # a thread can't be interrupted, so a call that has already started keeps running
+            # after it times out or is cancelled
+            #
+            name = getattr(getattr(func, "func", func), "__name__", func)
+            return await cls.wait_call(future, timeout, name)
+        finally:
+            with cls.lock:
+                if not started:
+                    #
+                    # the call was cancelled before a worker picked it up
+                    #
+                    started = True
+                    cls.queued -= 1
+
+    @classmethod
+    def get_stats(cls) -> dict[str, Any]:
+        """Return the pool size and queue-depth metrics."""
+        return {
+            "workers": cls.max_workers,
+            "running": cls.running,
+            "queued": cls.queued,
+            "max_queued": cls.max_queued,
+            "completed": cls.completed,
+            "timeouts": cls.timeouts,
+            "cancelled": cls.cancelled,
+            "processes": cls.max_processes or os.cpu_count() or 1,
+            "process_calls": cls.process_calls,
+        }
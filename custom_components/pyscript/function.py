@@ -10,6 +10,8 @@ from typing import ClassVar
 from homeassistant.core import Context, SupportsResponse
 
 from .const import LOGGER_PATH
+from .stall_monitor import StallMonitor
+from .tracer import TraceRegistry
 
 _LOGGER = logging.getLogger(LOGGER_PATH + ".function")
 
@@ -425,6 +427,8 @@ class Function:
             hass_args["return_response"] = True
             if "blocking" not in hass_args:
                 hass_args["blocking"] = True
+        if TraceRegistry.tracers:
+            return await TraceRegistry.call_service(cls.hass, domain, service, kwargs, **hass_args)
         return await cls.hass.services.async_call(domain, service, kwargs, **hass_args)
 
     @classmethod
@@ -464,8 +468,11 @@ class Function:
 
     @classmethod
     def create_task(cls, coro, ast_ctx=None):
-        """Create a new task that runs a coroutine."""
-        return cls.hass.loop.create_task(cls.run_coro(coro, ast_ctx=ast_ctx))
+        """Create a new task that runs a coroutine, on behalf of the global context of ast_ctx if given."""
+        task = cls.hass.loop.create_task(cls.run_coro(StallMonitor.wrap(coro, ast_ctx), ast_ctx=ast_ctx))
+        if ast_ctx is not None:
+            ast_ctx.get_global_ctx().add_task(task)
+        return task
 
     @classmethod
     def service_register(
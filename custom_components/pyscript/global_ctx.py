@@ -1,23 +1,77 @@
 """Global context handling."""
 
 import ast
-from collections.abc import Awaitable, Callable
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
 import logging
 import os
+import time
 from types import ModuleType
 from typing import Any, ClassVar
 
 from homeassistant.config_entries import ConfigEntry
 
-from .const import CONF_HASS_IS_GLOBAL, CONFIG_ENTRY, DOMAIN, FOLDER, LOGGER_PATH
+from .const import CONF_HASS_IS_GLOBAL, CONF_LAZY_IMPORTS, CONFIG_ENTRY, DOMAIN, FOLDER, LOGGER_PATH
 from .decorator import DecoratorRegistry, FunctionDecoratorManager
 from .decorator_abc import Decorator, DecoratorManagerStatus
-from .eval import AstEval, EvalFunc, EvalFuncVar, SymTable
+from .eval import TRIG_SERV_DECORATORS, AstEval, EvalFunc, EvalFuncVar, SymTable
 from .function import Function
+from .lazy_module import LazyModule
+from .load_report import LoadReport
 from .trigger import TrigInfo
 
 _LOGGER = logging.getLogger(LOGGER_PATH + ".global_ctx")
 
+#
+# number of script files parsed ahead of the one being evaluated during load
+#
+PARSE_FILES_AHEAD = 8
+
+
+def parse_source(source: str, file_path: str) -> tuple[ast.Module | None, float]:
+    """Parse source into an AST tree, or None if it has errors; also return the parse time."""
+    start = time.perf_counter()
+    try:
+        tree = ast.parse(source, filename=file_path)
+    except Exception:
+        #
+        # load_file parses it again on the event loop, which reports the error
+        #
+        tree = None
+    return tree, time.perf_counter() - start
+
+
+def read_source(file_path: str) -> tuple[str | None, float]:
+    """Return the source of a script file and its mtime, or None if it can't be read."""
+    try:
+        with open(file_path, encoding="utf-8") as file_desc:
+            source = file_desc.read()
+        return source, os.path.getmtime(file_path)
+    except Exception as exc:
+        _LOGGER.error("%s", exc)
+        return None, 0
+
+
+def parse_lazy_module(source: str, file_path: str) -> ast.Module | None:
+    """Return the parsed module, or None if it has triggers, services or errors and must load eagerly."""
+    try:
+        tree = ast.parse(source, filename=file_path)
+    except Exception:
+        #
+        # load it right away, so the error is reported by the import
+        #
+        return None
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for dec in node.decorator_list:
+            if isinstance(dec, ast.Call):
+                dec = dec.func
+            if isinstance(dec, ast.Name) and dec.id in TRIG_SERV_DECORATORS:
+                return None
+    return tree
+
 
 class GlobalContext:
     """Define class for global variables and trigger context."""
@@ -39,6 +93,12 @@ class GlobalContext:
         self.triggers_delay_start: set[EvalFunc] = set()
         self.dms: set[FunctionDecoratorManager] = set()
         self.dms_delay_start: set[FunctionDecoratorManager] = set()
+        #
+        # on reload, the running decorator managers of the previous version of this context,
+        # by name; the ones whose decorators are unchanged are kept, and the rest are stopped
+        # once the new version is loaded
+        #
+        self.dms_prev: dict[str, FunctionDecoratorManager] = {}
         self.logger: logging.Logger = logging.getLogger(LOGGER_PATH + "." + name)
         self.manager = manager
         self.auto_start: bool = False
@@ -49,6 +109,11 @@ class GlobalContext:
         self.mtime: float = mtime
         self.app_config = app_config
         self.imports: set[str] = set()
+        #
+        # unfinished tasks started on behalf of this context: trigger actions, task.create()
+        # and service calls; stop() drains them if task_drain_timeout is configured
+        #
+        self.tasks: set[asyncio.Task] = set()
         config_entry: ConfigEntry = Function.hass.data.get(DOMAIN, {}).get(CONFIG_ENTRY, {})
         if config_entry.data.get(CONF_HASS_IS_GLOBAL, False):
             #
@@ -81,9 +146,19 @@ class GlobalContext:
         try:
             await dm.validate()
             if dm.status is DecoratorManagerStatus.VALIDATED:
+                dm_prev = self.dms_prev.get(dm.name) if self.dms_prev else None
+                if dm_prev is not None and dm_prev.hot_swap(dm):
+                    _LOGGER.debug("%s: kept running triggers of %s", self.name, dm.name)
+                    del self.dms_prev[dm.name]
+                    self.dms.add(dm_prev)
+                    return
                 self.dms.add(dm)
 
-                if self.auto_start:
+                #
+                # while previous managers are still running, new ones wait until they are
+                # stopped, so they don't overlap (eg, registering the same service)
+                #
+                if self.auto_start and not self.dms_prev:
                     await dm.start()
                 else:
                     self.dms_delay_start.add(dm)
@@ -99,15 +174,36 @@ class GlobalContext:
         """Set the auto-start flag."""
         self.auto_start = auto_start
 
-    def start(self) -> None:
-        """Start any unstarted triggers."""
+    def start(self) -> list[asyncio.Task]:
+        """Start any unstarted triggers; returns the tasks starting the decorator managers."""
         for func in self.triggers_delay_start:
             func.trigger_start()
         self.triggers_delay_start = set()
 
-        for dm in self.dms_delay_start:
-            Function.hass.async_create_task(dm.start())
+        tasks = [Function.hass.async_create_task(dm.start()) for dm in self.dms_delay_start]
         self.dms_delay_start = set()
+        return tasks
+
+    def take_decorator_managers(self) -> dict[str, FunctionDecoratorManager]:
+        """Remove the running decorator managers, so a reload can keep them; return them by name."""
+        dms = {dm.name: dm for dm in self.dms if dm.status is DecoratorManagerStatus.RUNNING}
+        self.dms.difference_update(dms.values())
+        for dm in dms.values():
+            #
+            # deleting this context's functions must not stop them; the managers that
+            # aren't kept are stopped by stop_prev_decorator_managers
+            #
+            dm.func_var_finalizer.detach()
+        return dms
+
+    async def stop_prev_decorator_managers(self) -> None:
+        """Stop the decorator managers of the previous version of this context that weren't kept."""
+        dms_prev, self.dms_prev = self.dms_prev, {}
+        for dm in dms_prev.values():
+            if dm.status is DecoratorManagerStatus.RUNNING:
+                await dm.stop()
+        if self.auto_start:
+            self.start()
 
     def stop(self) -> None:
         """Stop all triggers and auto_start."""
@@ -120,6 +216,36 @@ class GlobalContext:
         self.dms = set()
         self.dms_delay_start = set()
         self.set_auto_start(False)
+        timeout = GlobalContextMgr.task_drain_timeout
+        if timeout is not None and self.tasks:
+            #
+            # a reload can run in one of our tasks (eg, a trigger action that calls pyscript.reload),
+            # which mustn't be canceled before it finishes
+            #
+            tasks = self.tasks - {asyncio.current_task()}
+            if tasks:
+                self.tasks -= tasks
+                Function.hass.async_create_task(self.drain_tasks(tasks, timeout))
+
+    def add_task(self, task: asyncio.Task) -> None:
+        """Add a task started on behalf of this context; it's removed when it finishes."""
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def get_task_count(self) -> int:
+        """Return the number of unfinished tasks started on behalf of this context."""
+        return len(self.tasks)
+
+    async def drain_tasks(self, tasks: set[asyncio.Task], timeout: float) -> None:
+        """Wait up to timeout seconds for tasks to finish, then cancel the rest."""
+        if timeout > 0:
+            _, tasks = await asyncio.wait(tasks, timeout=timeout)
+        if not tasks:
+            return
+        _LOGGER.debug("%s: canceling %d tasks still running after %g s", self.name, len(tasks), timeout)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
     def get_name(self) -> str:
         """Return the global context name."""
@@ -153,12 +279,19 @@ class GlobalContext:
         """Return the imports."""
         return self.imports
 
+    def add_import(self, ctx_name: str) -> None:
+        """Record that this context imports the module context ctx_name."""
+        self.imports.add(ctx_name)
+        self.manager.add_importer(ctx_name, self.name)
+
     def get_trig_info(self, name: str, trig_args: dict[str, Any]) -> TrigInfo:
         """Return a new trigger info instance with the given args."""
         return TrigInfo(name, trig_args, self)
 
-    async def module_import(self, module_name: str, import_level: int) -> ModuleType | None:
-        """Import a pyscript module from the pyscript/modules or apps folder."""
+    async def module_import(
+        self, module_name: str, import_level: int, lazy: bool = False
+    ) -> ModuleType | None:
+        """Import a pyscript module from the pyscript/modules or apps folder, lazily if allowed."""
 
         pyscript_dir = Function.hass.config.path(FOLDER)
         module_path = module_name.replace(".", "/")
@@ -210,7 +343,9 @@ class GlobalContext:
         for ctx_name, _, _ in file_paths:
             mod_ctx = self.manager.get(ctx_name)
             if mod_ctx and mod_ctx.module:
-                self.imports.add(mod_ctx.get_name())
+                if not lazy and isinstance(mod_ctx.module, LazyModule):
+                    await mod_ctx.module.load()
+                self.add_import(mod_ctx.get_name())
                 return mod_ctx.module
 
         #
@@ -222,6 +357,12 @@ class GlobalContext:
 
         [ctx_name, file_path, rel_import_path] = file_info
 
+        config_entry: ConfigEntry = Function.hass.data[DOMAIN][CONFIG_ENTRY]
+        if lazy and config_entry.data.get(CONF_LAZY_IMPORTS, False):
+            mod = await self.module_import_lazy(module_name, ctx_name, file_path, rel_import_path)
+            if mod is not None:
+                return mod
+
         mod = ModuleType(module_name)
         global_ctx = GlobalContext(
             ctx_name, global_sym_table=mod.__dict__, manager=self.manager, rel_import_path=rel_import_path
@@ -239,7 +380,60 @@ class GlobalContext:
             global_ctx.stop()
             raise
         global_ctx.module = mod
-        self.imports.add(ctx_name)
+        self.add_import(ctx_name)
+        return mod
+
+    async def module_import_lazy(
+        self, module_name: str, ctx_name: str, file_path: str, rel_import_path: str | None
+    ) -> LazyModule | None:
+        """Return a proxy that loads a module on first use, or None if it has to be loaded now."""
+        #
+        # modules with triggers or services are always loaded eagerly, since their side
+        # effects must not depend on whether, or when, the importer uses them
+        #
+        source, mtime = await Function.hass.async_add_executor_job(read_source, file_path)
+        if source is None:
+            return None
+        #
+        # keep the parsed tree, so the module isn't parsed again when it's loaded
+        #
+        tree = await Function.hass.async_add_executor_job(parse_lazy_module, source, file_path)
+        if tree is None:
+            return None
+
+        async def load_module() -> None:
+            _LOGGER.debug(
+                "module_import: loading lazily imported module %s, ctx = %s", module_name, ctx_name
+            )
+            #
+            # the importer may have been started since it imported the module
+            #
+            global_ctx.set_auto_start(self.auto_start)
+            try:
+                await self.manager.load_file(global_ctx, file_path, source=source, tree=tree)
+            except Exception:
+                _LOGGER.error(
+                    "module_import: failed to load lazily imported module %s, ctx = %s, path = %s",
+                    module_name,
+                    ctx_name,
+                    file_path,
+                )
+                global_ctx.stop()
+                raise
+
+        mod = LazyModule(module_name, load_module)
+        global_ctx = GlobalContext(
+            ctx_name,
+            global_sym_table=mod.__dict__,
+            manager=self.manager,
+            rel_import_path=rel_import_path,
+            source=source,
+            mtime=mtime,
+        )
+        global_ctx.file_path = file_path
+        global_ctx.module = mod
+        self.manager.set(ctx_name, global_ctx)
+        self.add_import(ctx_name)
         return mod
 
 
@@ -251,11 +445,23 @@ class GlobalContextMgr:
     #
     contexts: ClassVar[dict[str, GlobalContext]] = {}
 
+    #
+    # reverse import index: map of module context names to the names of the contexts
+    # that import them, updated as imports happen
+    #
+    importers: ClassVar[dict[str, set[str]]] = {}
+
     #
     # sequence number for sessions
     #
     name_seq: ClassVar[int] = 0
 
+    #
+    # seconds a stopped context's tasks are given to finish before they are canceled; if None,
+    # they keep running until they finish
+    #
+    task_drain_timeout: ClassVar[float | None] = None
+
     def __init__(self) -> None:
         """Report an error if GlobalContextMgr in instantiated."""
         _LOGGER.error("GlobalContextMgr class is not meant to be instantiated")
@@ -318,14 +524,72 @@ class GlobalContextMgr:
         """Return all the global context items."""
         return sorted(cls.contexts.items())
 
+    @classmethod
+    def set_task_drain_timeout(cls, timeout: float | None) -> None:
+        """Set the seconds a stopped context's tasks are given to finish; None lets them run."""
+        cls.task_drain_timeout = timeout
+
+    @classmethod
+    def get_task_report(cls) -> dict[str, Any]:
+        """Return the drain timeout and the number of unfinished tasks of each context, most first."""
+        counts = [(name, ctx.get_task_count()) for name, ctx in cls.contexts.items() if ctx.tasks]
+        counts.sort(key=lambda item: item[1], reverse=True)
+        return {
+            "task_drain_timeout": cls.task_drain_timeout,
+            "total": len(Function.our_tasks),
+            "contexts": dict(counts),
+        }
+
+    @classmethod
+    def get_trigger_stats(cls) -> dict[str, dict[str, Any]]:
+        """Return the runtime counters of each function's decorators that keep any, by function."""
+        stats = {}
+        for global_ctx in cls.contexts.values():
+            for dm in global_ctx.dms:
+                dm_stats = {}
+                for dec in dm.get_decorators():
+                    if (dec_stats := dec.get_stats()) is not None:
+                        dm_stats[dec.name] = dec_stats
+                if dm_stats:
+                    stats[dm.name] = dm_stats
+        return dict(sorted(stats.items()))
+
     @classmethod
     def delete(cls, name: str) -> None:
         """Delete the given GlobalContext."""
         if name in cls.contexts:
             global_ctx = cls.contexts[name]
             global_ctx.stop()
+            cls.remove_importer(global_ctx)
             del cls.contexts[name]
 
+    @classmethod
+    def add_importer(cls, ctx_name: str, importer_name: str) -> None:
+        """Record in the reverse import index that importer_name imports ctx_name."""
+        cls.importers.setdefault(ctx_name, set()).add(importer_name)
+
+    @classmethod
+    def remove_importer(cls, global_ctx: GlobalContext) -> None:
+        """Remove the imports of global_ctx from the reverse import index."""
+        for imp_name in global_ctx.get_imports():
+            importers = cls.importers.get(imp_name)
+            if importers is not None:
+                importers.discard(global_ctx.get_name())
+                if not importers:
+                    del cls.importers[imp_name]
+
+    @classmethod
+    def get_importers(cls, ctx_names: Iterable[str]) -> list[str]:
+        """Return the sorted names of the contexts that import any of ctx_names, directly or indirectly."""
+        found = set()
+        todo = list(ctx_names)
+        while todo:
+            for importer_name in cls.importers.get(todo.pop(), ()):
+                if importer_name not in found:
+                    found.add(importer_name)
+                    todo.append(importer_name)
+        return sorted(found)
+
     @classmethod
     def new_name(cls, root: str) -> str:
         """Find a unique new name by appending a sequence number to root."""
@@ -335,32 +599,61 @@ class GlobalContextMgr:
             if name not in cls.contexts:
                 return name
 
+    @classmethod
+    async def parse_files(
+        cls, sources: Iterable[tuple[str, str]], ahead: int = PARSE_FILES_AHEAD
+    ) -> AsyncIterator[ast.Module | None]:
+        """Parse (source, file_path) pairs in executor threads, yielding their trees in order."""
+        #
+        # parsing a large file blocks for a long time, so it's done off the event loop; the
+        # Home Assistant executor is used, so parsing doesn't hold up @pyscript_executor calls.
+        # Up to ahead files are parsed while the caller uses the earlier trees; parsing
+        # everything up front would keep all the trees alive at once, which makes garbage
+        # collection during evaluation much slower
+        #
+        pending = deque()
+
+        async def parse_next() -> ast.Module | None:
+            file_path, future = pending.popleft()
+            tree, elapsed = await future
+            LoadReport.add_file_time(file_path, "parse", elapsed)
+            return tree
+
+        for source, file_path in sources:
+            future = Function.hass.async_add_executor_job(parse_source, source, file_path)
+            pending.append((file_path, future))
+            if len(pending) > ahead:
+                yield await parse_next()
+        while pending:
+            yield await parse_next()
+
     @classmethod
     async def load_file(
-        cls, global_ctx: GlobalContext, file_path: str, source: str | None = None, reload: bool = False
+        cls,
+        global_ctx: GlobalContext,
+        file_path: str,
+        source: str | None = None,
+        reload: bool = False,
+        tree: ast.Module | None = None,
     ) -> None:
-        """Load, parse and run the given script file."""
+        """Load, parse and run the given script file; tree is its already parsed source, if any."""
 
         mtime = None
         if source is None:
-
-            def read_file(path: str) -> tuple[str | None, float]:
-                try:
-                    with open(path, encoding="utf-8") as file_desc:
-                        source = file_desc.read()
-                    return source, os.path.getmtime(path)
-                except Exception as exc:
-                    _LOGGER.error("%s", exc)
-                    return None, 0
-
-            source, mtime = await Function.hass.async_add_executor_job(read_file, file_path)
+            start = time.perf_counter()
+            source, mtime = await Function.hass.async_add_executor_job(read_source, file_path)
+            LoadReport.add_file_time(file_path, "read", time.perf_counter() - start, global_ctx.get_name())
 
         if source is None:
+            await global_ctx.stop_prev_decorator_managers()
             return
 
         ctx_curr = cls.get(global_ctx.get_name())
-        if ctx_curr:
-            # stop triggers and destroy old global context
+        if ctx_curr and ctx_curr is not global_ctx:
+            # stop triggers and destroy old global context, keeping its running decorator managers
+            # so the ones that are unchanged in the new source keep running; a lazily imported
+            # module is already registered with its own context
+            global_ctx.dms_prev.update(ctx_curr.take_decorator_managers())
             ctx_curr.stop()
             cls.delete(global_ctx.get_name())
 
@@ -374,12 +667,20 @@ class GlobalContextMgr:
         if mtime is not None:
             global_ctx.mtime = mtime
         try:
-            ast_ctx.parse(source, filename=file_path)
+            start = time.perf_counter()
+            ast_ctx.parse(source, filename=file_path, tree=tree)
+            if tree is None:
+                LoadReport.add_file_time(file_path, "parse", time.perf_counter() - start)
+            start = time.perf_counter()
             await ast_ctx.eval()
+            LoadReport.add_file_time(file_path, "eval", time.perf_counter() - start, global_ctx.get_name())
         except Exception as e:
             global_ctx.stop()
+            cls.remove_importer(global_ctx)
             ast_ctx.log_exception(e)
             raise
+        finally:
+            await global_ctx.stop_prev_decorator_managers()
         cls.set(global_ctx.get_name(), global_ctx)
 
         _LOGGER.info("%s %s", "Reloaded" if reload else "Loaded", file_path)
@@ -0,0 +1,76 @@
+"""JSON encoding and decoding, using orjson when it is importable."""
+
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+#
+# Name of the JSON library used for the fast path, for diagnostics and tests
+#
+JSON_LIBRARY = "orjson" if orjson else "json"
+
+
+def _stdlib_loads(data: str | bytes | bytearray) -> Any:
+    """Decode JSON with the standard library."""
+    return json.loads(data)
+
+
+def _stdlib_dumps_bytes(obj: Any) -> bytes:
+    """Encode to UTF-8 JSON bytes with the standard library."""
+    return json.dumps(obj).encode("utf-8")
+
+
+if orjson:
+    #
+    # orjson is stricter than json: it rejects NaN and Infinity, and integers beyond 64 bits
+    # (ie, 20 or more digits); only input containing those is worth decoding again with json
+    #
+    _STDLIB_ONLY_RE = re.compile(r"NaN|Infinity|\d{20}")
+    _STDLIB_ONLY_BYTES_RE = re.compile(rb"NaN|Infinity|\d{20}")
+
+    #
+    # orjson natively encodes datetimes and dataclasses, which json rejects; passing them
+    # through makes orjson raise, so json raises its usual TypeError for them
+    #
+    _DUMPS_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+    def json_loads(data: str | bytes | bytearray) -> Any:
+        """Decode JSON, raising ValueError if data is not valid JSON."""
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            stdlib_only_re = _STDLIB_ONLY_RE if isinstance(data, str) else _STDLIB_ONLY_BYTES_RE
+            if stdlib_only_re.search(data) is None:
+                raise
+            return json.loads(data)
+
+    def json_dumps_bytes(obj: Any) -> bytes:
+        """Encode obj to UTF-8 JSON bytes, raising TypeError if it is not serializable."""
+        #
+        # unlike json.dumps, NaN and infinite floats are encoded as null, and UUID and Enum
+        # values are encoded as their value
+        #
+        try:
+            return orjson.dumps(obj, option=_DUMPS_OPTIONS)
+        except orjson.JSONEncodeError:
+            #
+            # let json encode what orjson rejects (eg, integers beyond 64 bits), or raise its
+            # usual error
+            #
+            return _stdlib_dumps_bytes(obj)
+
+else:
+    json_loads = _stdlib_loads
+    json_dumps_bytes = _stdlib_dumps_bytes
+
+
+def json_dumps(obj: Any) -> str:
+    """Encode obj to a JSON string."""
+    return json_dumps_bytes(obj).decode("utf-8")
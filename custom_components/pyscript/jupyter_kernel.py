@@ -11,7 +11,6 @@ import asyncio
 import datetime
 import hashlib
 import hmac
-import json
 import logging
 import logging.handlers
 import re
@@ -23,6 +22,7 @@ from .const import LOGGER_PATH
 from .eval import EvalExceptionFormatter
 from .function import Function
 from .global_ctx import GlobalContextMgr
+from .json_codec import json_dumps_bytes, json_loads
 from .state import State
 
 _LOGGER = logging.getLogger(LOGGER_PATH + ".jupyter_kernel")
@@ -266,7 +266,7 @@ class Kernel:
         msg_frames = wire_msg[delim_idx + 2 :]
 
         def decode(msg):
-            return json.loads(msg.decode("utf-8"))
+            return json_loads(msg)
 
         msg = {}
         msg["header"] = decode(msg_frames[0])
@@ -309,7 +309,7 @@ class Kernel:
         header = self.new_header(msg_type)
 
         def encode(msg):
-            return str_to_bytes(json.dumps(msg))
+            return json_dumps_bytes(msg)
 
         msg_lst = [
             encode(header),
@@ -0,0 +1,56 @@
+"""Module proxy for pyscript modules whose evaluation is deferred until first use."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule(ModuleType):
+    """Pyscript module that is loaded by the interpreter the first time one of its attributes is used."""
+
+    #
+    # the module's __dict__ is its global symbol table, so the loader state lives in slots
+    #
+    __slots__ = ("load_error", "load_lock", "loader")
+
+    def __init__(self, name: str, loader: Callable[[], Awaitable[None]]) -> None:
+        """Initialize the module proxy; loader evaluates the module into its __dict__."""
+        super().__init__(name)
+        self.loader = loader
+        self.load_lock = asyncio.Lock()
+        self.load_error = None
+
+    def is_loaded(self) -> bool:
+        """Return True if the module has been loaded."""
+        return self.loader is None
+
+    async def load(self) -> None:
+        """Load the module if it isn't loaded yet; raise ImportError if loading failed."""
+        if self.loader is None:
+            return
+        async with self.load_lock:
+            if self.loader is None:
+                return
+            if self.load_error is None:
+                try:
+                    await self.loader()
+                    self.loader = None
+                    return
+                except Exception as exc:
+                    self.load_error = exc
+            #
+            # the error was logged when loading failed; each use of the module raises the same error
+            #
+            raise ImportError(f"lazily imported module {self.__name__} failed to load") from self.load_error
+
+    def __getattr__(self, name: str) -> Any:
+        """Explain why an attribute of a module that isn't loaded yet is missing."""
+        if self.loader is not None:
+            raise AttributeError(
+                f"lazily imported module {self.__name__} isn't loaded yet; use one of its attributes "
+                f"in pyscript code, or import it with 'from {self.__name__} import ...', to load it"
+            )
+        raise AttributeError(f"module '{self.__name__}' has no attribute '{name}'")
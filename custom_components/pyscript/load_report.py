@@ -0,0 +1,167 @@
+"""Report where loading and reloading scripts spends its time."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+import logging
+import time
+from typing import Any, ClassVar
+
+from homeassistant.core import HomeAssistant
+
+from .const import LOGGER_PATH
+
+_LOGGER = logging.getLogger(LOGGER_PATH + ".load_report")
+
+LOAD_REPORT_SIZE = 10
+
+FILE_PHASES = ("read", "parse", "eval")
+TRIGGER_PHASES = ("validate", "start")
+
+
+class LoadReport:
+    """Record the time of each load phase, and per file and per trigger, of the last (re)load."""
+
+    hass: ClassVar[HomeAssistant | None] = None
+
+    #
+    # log a summary of the slowest phases, files and triggers at INFO when a load completes
+    #
+    log_summary: ClassVar[bool] = False
+
+    complete: ClassVar[bool] = False
+
+    #
+    # incremented by each load, so a load that completes late doesn't complete a newer one
+    #
+    load_seq: ClassVar[int] = 0
+
+    #
+    # seconds spent per phase, per file path and phase, and per trigger function and phase;
+    # a phase that runs several times (eg, fetching the service parameters) is accumulated
+    #
+    phases: ClassVar[dict[str, float]] = {}
+    files: ClassVar[dict[str, dict[str, Any]]] = {}
+    triggers: ClassVar[dict[str, dict[str, float]]] = {}
+
+    @classmethod
+    def init(cls, hass: HomeAssistant, log_summary: bool) -> None:
+        """Initialize the report, and whether its summary is logged when a load completes."""
+        cls.hass = hass
+        cls.log_summary = log_summary
+
+    @classmethod
+    def begin(cls) -> None:
+        """Start the report of a new load or reload, discarding the previous one."""
+        cls.complete = False
+        cls.load_seq += 1
+        cls.phases = {}
+        cls.files = {}
+        cls.triggers = {}
+
+    @classmethod
+    def add_phase_time(cls, phase: str, elapsed: float) -> None:
+        """Add elapsed seconds to a load phase."""
+        cls.phases[phase] = cls.phases.get(phase, 0.0) + elapsed
+
+    @classmethod
+    @contextmanager
+    def time_phase(cls, phase: str) -> Iterator[None]:
+        """Time the enclosed code as a load phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.add_phase_time(phase, time.perf_counter() - start)
+
+    @classmethod
+    def add_file_time(
+        cls, file_path: str, phase: str, elapsed: float, global_ctx_name: str | None = None
+    ) -> None:
+        """Add elapsed seconds to a phase of loading a file."""
+        stats = cls.files.get(file_path)
+        if stats is None:
+            stats = cls.files[file_path] = {"global_ctx": None} | dict.fromkeys(FILE_PHASES, 0.0)
+        if global_ctx_name is not None:
+            stats["global_ctx"] = global_ctx_name
+        stats[phase] += elapsed
+
+    @classmethod
+    def add_trigger_time(cls, name: str, phase: str, elapsed: float) -> None:
+        """Add elapsed seconds to a phase of setting up the triggers of a function."""
+        stats = cls.triggers.get(name)
+        if stats is None:
+            stats = cls.triggers[name] = dict.fromkeys(TRIGGER_PHASES, 0.0)
+        stats[phase] += elapsed
+
+    @classmethod
+    def end_after(cls, tasks: Iterable[asyncio.Task]) -> None:
+        """Complete the report once the given trigger start tasks are done."""
+        tasks = list(tasks)
+        start = time.perf_counter()
+        load_seq = cls.load_seq
+
+        async def wait_tasks() -> None:
+            if tasks:
+                await asyncio.wait(tasks)
+            if load_seq == cls.load_seq:
+                cls.add_phase_time("start_triggers", time.perf_counter() - start)
+                cls.end()
+
+        cls.hass.async_create_task(wait_tasks())
+
+    @classmethod
+    def end(cls) -> None:
+        """Complete the report, logging its summary if configured."""
+        cls.complete = True
+        if cls.log_summary:
+            _LOGGER.info("%s", cls.get_summary())
+
+    @classmethod
+    def get_report(cls, size: int | None = None) -> dict[str, Any]:
+        """Return the phase, file and trigger times in ms, the slowest first, up to size of each."""
+
+        def to_ms(seconds: float) -> float:
+            return round(seconds * 1000, 1)
+
+        files = [
+            {
+                "file": file_path,
+                "global_ctx": stats["global_ctx"],
+                "total_ms": to_ms(sum(stats[phase] for phase in FILE_PHASES)),
+            }
+            | {f"{phase}_ms": to_ms(stats[phase]) for phase in FILE_PHASES}
+            for file_path, stats in cls.files.items()
+        ]
+        triggers = [
+            {"function": name, "total_ms": to_ms(sum(stats.values()))}
+            | {f"{phase}_ms": to_ms(stats[phase]) for phase in TRIGGER_PHASES}
+            for name, stats in cls.triggers.items()
+        ]
+        files.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        triggers.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        return {
+            "complete": cls.complete,
+            "phases": {phase: to_ms(elapsed) for phase, elapsed in cls.phases.items()},
+            "files": files[:size],
+            "triggers": triggers[:size],
+        }
+
+    @classmethod
+    def get_summary(cls, size: int = LOAD_REPORT_SIZE) -> str:
+        """Return a one-line summary of the phases, and of the slowest files and triggers."""
+        report = cls.get_report(size)
+        phases = ", ".join(f"{phase} {elapsed:g} ms" for phase, elapsed in report["phases"].items())
+        files = ", ".join(
+            f"{entry['file']} {entry['total_ms']:g} ms"
+            f" (read {entry['read_ms']:g}, parse {entry['parse_ms']:g}, eval {entry['eval_ms']:g})"
+            for entry in report["files"]
+        )
+        triggers = ", ".join(
+            f"{entry['function']} {entry['total_ms']:g} ms"
+            f" (validate {entry['validate_ms']:g}, start {entry['start_ms']:g})"
+            for entry in report["triggers"]
+        )
+        return f"load report: {phases}; slowest files: {files or 'none'}; slowest triggers: {triggers or 'none'}"
@@ -1,11 +1,11 @@
 """Handles mqtt messages and notification."""
 
-import json
 import logging
 
 from homeassistant.components import mqtt
 
 from .const import LOGGER_PATH
+from .json_codec import json_loads
 
 _LOGGER = logging.getLogger(LOGGER_PATH + ".mqtt")
 
@@ -19,7 +19,7 @@ class Mqtt:
     hass = None
 
     #
-    # notify message queues by mqtt message topic
+    # notify message queues by mqtt message topic, with whether each needs payload_obj
     #
     notify = {}
     notify_remove = {}
@@ -48,26 +48,30 @@ class Mqtt:
                 "retain": mqttmsg.retain,
             }
 
-            try:
-                func_args["payload_obj"] = json.loads(mqttmsg.payload)
-            except ValueError:
-                pass
+            #
+            # the payload is only decoded if a listener needs payload_obj, and then only once
+            #
+            if any(cls.notify.get(subscribed_topic, {}).values()):
+                try:
+                    func_args["payload_obj"] = json_loads(mqttmsg.payload)
+                except ValueError:
+                    pass
 
             await cls.update(subscribed_topic, func_args)
 
         return mqtt_message_handler
 
     @classmethod
-    async def notify_add(cls, topic, queue, encoding=None):
+    async def notify_add(cls, topic, queue, encoding=None, needs_payload_obj=True):
         """Register to notify for mqtt messages of given topic to be sent to queue."""
 
         if topic not in cls.notify:
-            cls.notify[topic] = set()
+            cls.notify[topic] = {}
             _LOGGER.debug("mqtt.notify_add(%s) -> adding mqtt subscription", topic)
             cls.notify_remove[topic] = await mqtt.async_subscribe(
                 cls.hass, topic, cls.mqtt_message_handler_maker(topic), encoding=encoding or "utf-8", qos=0
             )
-        cls.notify[topic].add(queue)
+        cls.notify[topic][queue] = needs_payload_obj
 
     @classmethod
     def notify_del(cls, topic, queue):
@@ -75,7 +79,7 @@ class Mqtt:
 
         if topic not in cls.notify or queue not in cls.notify[topic]:
             return
-        cls.notify[topic].discard(queue)
+        del cls.notify[topic][queue]
         if len(cls.notify[topic]) == 0:
             cls.notify_remove[topic]()
             _LOGGER.debug("mqtt.notify_del(%s) -> removing mqtt subscription", topic)
@@ -0,0 +1,166 @@
+"""Sampling profiler that attributes time to pyscript functions and source lines."""
+
+from __future__ import annotations
+
+from collections import Counter
+import logging
+import sys
+import threading
+import time
+from types import FrameType
+from typing import Any, ClassVar
+
+from . import eval as eval_module
+from .const import LOGGER_PATH
+from .eval import EvalFunc
+
+_LOGGER = logging.getLogger(LOGGER_PATH + ".profiler")
+
+DEFAULT_PROFILE_INTERVAL_MS = 5
+DEFAULT_PROFILE_TOP = 20
+
+EVAL_FILE = eval_module.__file__
+
+
+def pyscript_stack(frame: FrameType | None) -> tuple[tuple[str, str, int | None], ...]:
+    """Return the pyscript (global context, function, line) stack of a Python stack, outermost first."""
+    frames = []
+    while frame is not None:
+        if frame.f_code.co_filename == EVAL_FILE:
+            frames.append(frame)
+        frame = frame.f_back
+    stack: list[list] = []
+    for frame in reversed(frames):
+        code_name = frame.f_code.co_name
+        if code_name == "call":
+            #
+            # EvalFunc.call starts a new pyscript function frame
+            #
+            func = frame.f_locals.get("self")
+            if isinstance(func, EvalFunc):
+                stack.append([func.global_ctx_name, func.name, None])
+        elif code_name.startswith("ast_"):
+            #
+            # the innermost ast_* node of each pyscript function frame gives its current line
+            #
+            lineno = getattr(frame.f_locals.get("arg"), "lineno", None)
+            if lineno is None:
+                continue
+            if not stack:
+                ast_ctx = frame.f_locals.get("self")
+                stack.append([ast_ctx.get_global_ctx_name(), "<module>", None])
+            stack[-1][2] = lineno
+    return tuple(tuple(entry) for entry in stack)
+
+
+class Profiler:
+    """Sample the event loop thread and aggregate time per pyscript line and function."""
+
+    #
+    # the sampler is a thread that only exists while profiling, so there is no cost otherwise
+    #
+    thread: ClassVar[threading.Thread | None] = None
+    stop_event: ClassVar[threading.Event | None] = None
+    loop_thread_id: ClassVar[int | None] = None
+    interval: ClassVar[float] = DEFAULT_PROFILE_INTERVAL_MS / 1000
+
+    start_time: ClassVar[float] = 0.0
+    stop_time: ClassVar[float] = 0.0
+    samples: ClassVar[int] = 0
+    stacks: ClassVar[Counter] = Counter()
+
+    @classmethod
+    def is_running(cls) -> bool:
+        """Return True if the profiler is sampling."""
+        return cls.thread is not None
+
+    @classmethod
+    def start(cls, interval_ms: float = DEFAULT_PROFILE_INTERVAL_MS) -> None:
+        """Start sampling the calling thread, which should be the event loop thread, discarding earlier samples."""
+        cls.stop()
+        cls.loop_thread_id = threading.get_ident()
+        cls.interval = interval_ms / 1000
+        cls.samples = 0
+        cls.stacks = Counter()
+        cls.stop_event = threading.Event()
+        cls.start_time = time.monotonic()
+        cls.thread = threading.Thread(target=cls.sampler, name="pyscript_profiler", daemon=True)
+        cls.thread.start()
+        _LOGGER.debug("profiler started with interval %g ms", interval_ms)
+
+    @classmethod
+    def stop(cls) -> None:
+        """Stop sampling, waiting for the sampler thread to exit; the samples are kept for reporting."""
+        if cls.thread is None:
+            return
+        cls.stop_event.set()
+        cls.thread.join()
+        cls.thread = None
+        cls.stop_time = time.monotonic()
+        _LOGGER.debug("profiler stopped after %d samples", cls.samples)
+
+    @classmethod
+    def sampler(cls) -> None:
+        """Take a sample of the event loop thread every interval until stopped."""
+        stop_event = cls.stop_event
+        while not stop_event.wait(cls.interval):
+            frame = sys._current_frames().get(cls.loop_thread_id)
+            cls.samples += 1
+            stack = pyscript_stack(frame)
+            del frame
+            if stack:
+                cls.stacks[stack] += 1
+
+    @classmethod
+    def get_report(cls, top: int = DEFAULT_PROFILE_TOP) -> dict[str, Any]:
+        """Return the hottest lines and functions, with self and cumulative time, and collapsed stacks."""
+        duration = (cls.stop_time if cls.thread is None else time.monotonic()) - cls.start_time
+        ms_per_sample = duration * 1000 / cls.samples if cls.samples else 0.0
+        line_self: Counter = Counter()
+        line_cumulative: Counter = Counter()
+        func_self: Counter = Counter()
+        func_cumulative: Counter = Counter()
+        for stack, count in cls.stacks.items():
+            line_self[stack[-1]] += count
+            func_self[stack[-1][:2]] += count
+            #
+            # count each line and function once per sample, even if it recurses
+            #
+            for line in set(stack):
+                line_cumulative[line] += count
+            for func in {entry[:2] for entry in stack}:
+                func_cumulative[func] += count
+
+        def entry_stats(key: tuple, self_count: int, cumulative_count: int) -> dict[str, Any]:
+            stats = {"global_ctx": key[0], "function": key[1]}
+            if len(key) > 2:
+                stats["line"] = key[2]
+            stats["self_ms"] = round(self_count * ms_per_sample, 1)
+            stats["cumulative_ms"] = round(cumulative_count * ms_per_sample, 1)
+            stats["self_samples"] = self_count
+            stats["cumulative_samples"] = cumulative_count
+            return stats
+
+        def hottest(self_counts: Counter, cumulative_counts: Counter) -> list[dict[str, Any]]:
+            keys = sorted(
+                cumulative_counts, key=lambda key: (self_counts[key], cumulative_counts[key]), reverse=True
+            )
+            return [entry_stats(key, self_counts[key], cumulative_counts[key]) for key in keys[:top]]
+
+        #
+        # one "frame;frame;frame count" line per stack, as used by flamegraph tools
+        #
+        collapsed = "\n".join(
+            ";".join(f"{global_ctx}.{func}:{lineno}" for global_ctx, func, lineno in stack) + f" {count}"
+            for stack, count in sorted(cls.stacks.items())
+        )
+        return {
+            "running": cls.thread is not None,
+            "duration_s": round(duration, 3),
+            "samples": cls.samples,
+            "pyscript_samples": sum(cls.stacks.values()),
+            "ms_per_sample": round(ms_per_sample, 3),
+            "lines": hottest(line_self, line_cumulative),
+            "functions": hottest(func_self, func_cumulative),
+            "collapsed": collapsed,
+        }
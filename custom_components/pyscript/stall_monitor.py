@@ -0,0 +1,202 @@
+"""Monitor for pyscript code that holds the event loop too long between awaits."""
+
+from __future__ import annotations
+
+import ast
+from collections.abc import Coroutine
+import logging
+import time
+from typing import Any, ClassVar
+
+from homeassistant.core import HomeAssistant
+
+from .const import LOGGER_PATH
+
+_LOGGER = logging.getLogger(LOGGER_PATH + ".stall_monitor")
+
+STALL_SENSOR = "sensor.pyscript_stalls"
+STALL_REPORT_SIZE = 10
+
+
+class TimedCoroutine(Coroutine):
+    """Wrap a task's coroutine and time each step it runs on the event loop."""
+
+    __slots__ = ("ast_ctx", "coro", "threshold")
+
+    def __init__(self, coro: Coroutine, ast_ctx: Any, threshold: float) -> None:
+        """Wrap coro, whose stalls are attributed to ast_ctx if no interpreter frame is found."""
+        self.coro = coro
+        self.ast_ctx = ast_ctx
+        self.threshold = threshold
+
+    def __await__(self):
+        """Return self as the iterator driven by the awaiting task."""
+        return self
+
+    def __next__(self) -> Any:
+        """Run the next step of the coroutine."""
+        return self.send(None)
+
+    def send(self, value: Any) -> Any:
+        """Run the next step of the coroutine, timing it."""
+        start = time.perf_counter()
+        try:
+            return self.coro.send(value)
+        finally:
+            elapsed = time.perf_counter() - start
+            if elapsed > self.threshold:
+                StallMonitor.record_stall(self, elapsed)
+
+    def throw(self, *args: Any) -> Any:
+        """Throw an exception into the coroutine, timing the step it runs."""
+        start = time.perf_counter()
+        try:
+            return self.coro.throw(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            if elapsed > self.threshold:
+                StallMonitor.record_stall(self, elapsed)
+
+    def close(self) -> None:
+        """Close the coroutine."""
+        self.coro.close()
+
+
+class StallMonitor:
+    """Attribute event loop stalls to pyscript global contexts, functions and lines."""
+
+    hass: ClassVar[HomeAssistant | None] = None
+
+    #
+    # steps longer than threshold seconds are recorded; None disables the monitor, in which
+    # case tasks aren't wrapped at all
+    #
+    threshold: ClassVar[float | None] = None
+
+    #
+    # (global context, function, line) to [count, total seconds, max seconds]
+    #
+    stalls: ClassVar[dict[tuple[str, str, int | None], list]] = {}
+    stall_count: ClassVar[int] = 0
+    sensor_update_pending: ClassVar[bool] = False
+
+    @classmethod
+    def init(cls, hass: HomeAssistant, threshold_ms: float | None) -> None:
+        """Initialize the monitor with the given stall threshold in milliseconds."""
+        cls.hass = hass
+        cls.set_threshold(threshold_ms)
+        cls.reset()
+        if cls.threshold is not None:
+            cls.update_sensor()
+
+    @classmethod
+    def set_threshold(cls, threshold_ms: float | None) -> None:
+        """Set the stall threshold in milliseconds; None disables the monitor for new tasks."""
+        cls.threshold = threshold_ms / 1000 if threshold_ms else None
+
+    @classmethod
+    def reset(cls) -> None:
+        """Clear the recorded stalls."""
+        cls.stalls = {}
+        cls.stall_count = 0
+
+    @classmethod
+    def wrap(cls, coro: Coroutine, ast_ctx: Any = None) -> Coroutine:
+        """Return coro wrapped for timing if the monitor is enabled."""
+        if cls.threshold is None:
+            return coro
+        return TimedCoroutine(coro, ast_ctx, cls.threshold)
+
+    @classmethod
+    def find_position(cls, coro: Any) -> tuple[Any, int | None]:
+        """Return the innermost interpreter context and line a suspended coroutine chain is at."""
+        #
+        # follow the chain of awaited coroutines; the innermost AstEval.ast_* frame tells us
+        # the statement or expression that was running when the task suspended
+        #
+        ast_ctx = None
+        lineno = None
+        while coro is not None:
+            if isinstance(coro, TimedCoroutine):
+                coro = coro.coro
+            frame = getattr(coro, "cr_frame", None)
+            if frame is None:
+                break
+            frame_self = frame.f_locals.get("self")
+            frame_arg = frame.f_locals.get("arg")
+            if hasattr(frame_self, "curr_func") and isinstance(frame_arg, ast.AST):
+                ast_ctx = frame_self
+                lineno = getattr(frame_arg, "lineno", lineno)
+            coro = getattr(coro, "cr_await", None)
+        return ast_ctx, lineno
+
+    @classmethod
+    def record_stall(cls, timed_coro: TimedCoroutine, elapsed: float) -> None:
+        """Record a step that held the event loop longer than the threshold."""
+        ast_ctx, lineno = cls.find_position(timed_coro.coro)
+        if ast_ctx is None:
+            ast_ctx = timed_coro.ast_ctx
+        if ast_ctx is not None:
+            global_ctx_name = ast_ctx.get_global_ctx_name()
+            if ast_ctx.curr_func is not None:
+                func_name = ast_ctx.curr_func.name
+            else:
+                func_name = ast_ctx.name.removeprefix(global_ctx_name + ".")
+        else:
+            global_ctx_name = "<unknown>"
+            func_name = getattr(timed_coro.coro, "__qualname__", "<unknown>")
+        key = (global_ctx_name, func_name, lineno)
+        stats = cls.stalls.setdefault(key, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+        cls.stall_count += 1
+        _LOGGER.debug(
+            "%s: %s line %s held the event loop for %.1f ms",
+            global_ctx_name,
+            func_name,
+            lineno,
+            elapsed * 1000,
+        )
+        if not cls.sensor_update_pending and cls.hass is not None:
+            #
+            # coalesce the sensor updates of stalls in the same loop iteration
+            #
+            cls.sensor_update_pending = True
+            cls.hass.loop.call_soon(cls.update_sensor)
+
+    @classmethod
+    def update_sensor(cls) -> None:
+        """Update the stall sensor with the count and the worst offenders."""
+        cls.sensor_update_pending = False
+        report = cls.get_report()
+        cls.hass.states.async_set(
+            STALL_SENSOR,
+            report["stall_count"],
+            {
+                "threshold_ms": report["threshold_ms"],
+                "offenders": report["offenders"],
+                "friendly_name": "Pyscript event loop stalls",
+                "state_class": "total_increasing",
+            },
+        )
+
+    @classmethod
+    def get_report(cls, size: int = STALL_REPORT_SIZE) -> dict[str, Any]:
+        """Return the stall count and the offenders with the most stalled time, worst first."""
+        worst = sorted(cls.stalls.items(), key=lambda item: item[1][1], reverse=True)[:size]
+        return {
+            "threshold_ms": cls.threshold * 1000 if cls.threshold is not None else None,
+            "stall_count": cls.stall_count,
+            "offenders": [
+                {
+                    "global_ctx": global_ctx_name,
+                    "function": func_name,
+                    "line": lineno,
+                    "count": count,
+                    "total_ms": round(total * 1000, 1),
+                    "max_ms": round(max_stall * 1000, 1),
+                }
+                for (global_ctx_name, func_name, lineno), (count, total, max_stall) in worst
+            ],
+        }
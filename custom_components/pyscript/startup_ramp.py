@@ -0,0 +1,203 @@
+"""Ramp that spreads out the startup actions and initial state checks of triggers."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import heapq
+import logging
+import time
+from typing import Any, ClassVar
+
+from .const import LOGGER_PATH
+
+_LOGGER = logging.getLogger(LOGGER_PATH + ".startup_ramp")
+
+#
+# a startup action holds its slot until it finishes, but at most this many seconds, so
+# an action that runs forever (eg, a polling loop) doesn't block the rest of the ramp
+#
+STARTUP_SLOT_MAX_HOLD = 10
+
+
+class StartupRamp:
+    """Admit startup actions and initial state checks by priority, with a concurrency cap and stagger."""
+
+    #
+    # maximum number of startup actions and initial checks running at once, and the seconds
+    # between admitting one and the next; with neither set, triggers never touch the ramp
+    #
+    concurrency: ClassVar[int | None] = None
+    stagger: ClassVar[float] = 0.0
+
+    running: ClassVar[int] = 0
+    seq: ClassVar[int] = 0
+
+    #
+    # heap of (-priority, seq, enqueue time, future) of checks waiting to be admitted
+    #
+    waiters: ClassVar[list[tuple[int, int, float, asyncio.Future]]] = []
+
+    #
+    # pending call of admit(), and the loop time before which stagger doesn't allow another
+    #
+    admit_handle: ClassVar[asyncio.Handle | None] = None
+    next_admit_time: ClassVar[float] = 0.0
+
+    #
+    # report of the last ramp: when it began and last went idle, the checks it admitted,
+    # their total and max wait, and the most that ran at once
+    #
+    start_time: ClassVar[float | None] = None
+    end_time: ClassVar[float | None] = None
+    admitted: ClassVar[int] = 0
+    total_wait: ClassVar[float] = 0.0
+    max_wait: ClassVar[float] = 0.0
+    max_running: ClassVar[int] = 0
+
+    @classmethod
+    def init(cls, concurrency: int | None, stagger_ms: float | None) -> None:
+        """Initialize the ramp with the given concurrency cap and stagger."""
+        cls.running = 0
+        cls.seq = 0
+        cls.waiters = []
+        cls.admit_handle = None
+        cls.next_admit_time = 0.0
+        cls.start_time = None
+        cls.end_time = None
+        cls.configure(concurrency, stagger_ms)
+
+    @classmethod
+    def configure(cls, concurrency: int | None, stagger_ms: float | None) -> None:
+        """Set the concurrency cap and the milliseconds between admissions; None disables either."""
+        cls.concurrency = concurrency
+        cls.stagger = stagger_ms / 1000 if stagger_ms else 0.0
+        if cls.waiters:
+            cls.schedule_admit()
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """Return True if startup actions and initial checks go through the ramp."""
+        return cls.concurrency is not None or cls.stagger > 0
+
+    @classmethod
+    def begin(cls) -> None:
+        """Start the report of a new ramp when triggers are started."""
+        cls.start_time = time.monotonic()
+        cls.end_time = None
+        cls.admitted = 0
+        cls.total_wait = 0.0
+        cls.max_wait = 0.0
+        cls.max_running = cls.running
+
+    @classmethod
+    async def run(cls, priority: int, check: Callable[[], Awaitable[asyncio.Task | None]]) -> None:
+        """Run a trigger's initial check when admitted; an action it starts holds the slot until done."""
+        if not cls.is_enabled():
+            await check()
+            return
+        await cls.acquire(priority)
+        task = None
+        try:
+            task = await check()
+        finally:
+            cls.release_after(task)
+
+    @classmethod
+    async def acquire(cls, priority: int) -> None:
+        """Wait until an initial check of the given priority is admitted."""
+        waiter = asyncio.get_running_loop().create_future()
+        cls.seq += 1
+        heapq.heappush(cls.waiters, (-priority, cls.seq, time.monotonic(), waiter))
+        #
+        # admit() runs on a later loop iteration, so the checks of triggers that start together
+        # are all waiting by then and are admitted highest priority first
+        #
+        cls.schedule_admit()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                cls.release()
+            raise
+
+    @classmethod
+    def schedule_admit(cls) -> None:
+        """Schedule admitting waiting checks, no sooner than stagger allows."""
+        if cls.admit_handle is not None:
+            return
+        loop = asyncio.get_running_loop()
+        delay = cls.next_admit_time - loop.time()
+        if delay > 0:
+            cls.admit_handle = loop.call_later(delay, cls.admit)
+        else:
+            cls.admit_handle = loop.call_soon(cls.admit)
+
+    @classmethod
+    def admit(cls) -> None:
+        """Admit the highest priority waiting checks there is room for; just one if staggered."""
+        cls.admit_handle = None
+        while cls.waiters and (cls.concurrency is None or cls.running < cls.concurrency):
+            _, _, enqueued, waiter = heapq.heappop(cls.waiters)
+            if waiter.done():
+                continue
+            waited = time.monotonic() - enqueued
+            cls.admitted += 1
+            cls.total_wait += waited
+            cls.max_wait = max(cls.max_wait, waited)
+            cls.running += 1
+            cls.max_running = max(cls.max_running, cls.running)
+            waiter.set_result(None)
+            if cls.stagger:
+                cls.next_admit_time = asyncio.get_running_loop().time() + cls.stagger
+                if cls.waiters and (cls.concurrency is None or cls.running < cls.concurrency):
+                    cls.schedule_admit()
+                break
+
+    @classmethod
+    def release(cls) -> None:
+        """Free a slot when an initial check, and the action it started, is done."""
+        cls.running -= 1
+        if cls.waiters:
+            cls.schedule_admit()
+        elif cls.running == 0:
+            cls.end_time = time.monotonic()
+            _LOGGER.debug("startup ramp done: %s", cls.get_report())
+
+    @classmethod
+    def release_after(cls, task: asyncio.Task | None) -> None:
+        """Free a slot when task is done, or after STARTUP_SLOT_MAX_HOLD seconds; now if there is no task."""
+        if task is None or task.done():
+            cls.release()
+            return
+        released = False
+
+        def release_once(*args: Any) -> None:
+            nonlocal released
+            if not released:
+                released = True
+                timer.cancel()
+                cls.release()
+
+        timer = asyncio.get_running_loop().call_later(STARTUP_SLOT_MAX_HOLD, release_once)
+        task.add_done_callback(release_once)
+
+    @classmethod
+    def get_report(cls) -> dict[str, Any]:
+        """Return the ramp settings, and how long the last ramp took and its checks waited."""
+        if cls.start_time is None or not cls.admitted:
+            duration = None
+        else:
+            duration = round((cls.end_time or time.monotonic()) - cls.start_time, 3)
+        return {
+            "concurrency": cls.concurrency,
+            "stagger_ms": cls.stagger * 1000,
+            "complete": cls.running == 0 and not cls.waiters,
+            "duration_s": duration,
+            "admitted": cls.admitted,
+            "running": cls.running,
+            "waiting": sum(1 for waiter in cls.waiters if not waiter[3].done()),
+            "max_running": cls.max_running,
+            "mean_wait": cls.total_wait / cls.admitted if cls.admitted else 0.0,
+            "max_wait": cls.max_wait,
+        }
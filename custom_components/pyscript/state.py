@@ -3,12 +3,13 @@
 import asyncio
 from datetime import datetime
 import logging
+import time
 from typing import Any, ClassVar, Self
 
 from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
-from homeassistant.core import Context, HomeAssistant, State as CoreState
+from homeassistant.core import Context, Event as HAEvent, HomeAssistant, State as CoreState, callback
 from homeassistant.helpers.restore_state import DATA_RESTORE_STATE
-from homeassistant.helpers.service import async_get_all_descriptions
+from homeassistant.helpers.service import async_get_all_descriptions, async_get_cached_service_description
 from homeassistant.helpers.template import (
     _SENTINEL,
     forgiving_boolean,
@@ -22,12 +23,108 @@ from homeassistant.util import dt as dt_util
 from .const import LOGGER_PATH
 from .entity import PyscriptEntity
 from .function import Function
+from .load_report import LoadReport
+from .tracer import TraceRegistry
 
 _LOGGER = logging.getLogger(LOGGER_PATH + ".state")
 
 STATE_VIRTUAL_ATTRS = {"entity_id", "last_changed", "last_updated", "last_reported"}
 
 
+QUEUE_POLICY_DROP_OLDEST = "drop_oldest"
+QUEUE_POLICY_COALESCE = "coalesce"
+QUEUE_POLICIES = [QUEUE_POLICY_DROP_OLDEST, QUEUE_POLICY_COALESCE]
+
+
+def set_old_value(new_vars: dict[str, Any], var_name: str, old_value: Any) -> None:
+    """Set the old value of var_name in new_vars, including any of its old attributes there."""
+    old_var_name = f"{var_name}.old"
+    new_vars[old_var_name] = old_value
+    for name in new_vars:
+        if name.startswith(f"{old_var_name}."):
+            new_vars[name] = getattr(old_value, name[len(old_var_name) + 1 :], None)
+
+
+class NotifyQueue(asyncio.Queue):
+    """Trigger notification queue with an optional size limit and overflow policy."""
+
+    def __init__(self, maxsize: int = 0, policy: str | None = None, name: str = "") -> None:
+        """Initialize the queue; once maxsize is reached, the oldest notification is dropped."""
+        #
+        # the underlying queue is unbounded, so put() never waits: State.update()
+        # delivers to every trigger in turn, and must not stall on a slow one
+        #
+        super().__init__(0)
+        self.name = name
+        self.limit = maxsize
+        self.policy = policy or (QUEUE_POLICY_DROP_OLDEST if maxsize else None)
+        self.dropped = 0
+        self.coalesced = 0
+        #
+        # queued notification for each state variable, used to coalesce
+        #
+        self.queued_by_var: dict[str, list[Any]] = {}
+
+    @staticmethod
+    def _var_name(item: list[Any]) -> str | None:
+        """Return the state variable name of a queued state notification."""
+        if item[0] != "state":
+            return None
+        return item[1][1].get("var_name")
+
+    def put_nowait(self, item: list[Any]) -> None:
+        """Queue a notification, applying the overflow policy."""
+        var_name = self._var_name(item) if self.policy == QUEUE_POLICY_COALESCE else None
+        if var_name is not None:
+            queued = self.queued_by_var.get(var_name)
+            if queued is not None:
+                #
+                # replace the queued notification with the latest one, keeping the
+                # original old value so the merged change still starts where it began
+                #
+                new_vars, func_args = item[1]
+                func_args["old_value"] = queued[1][1].get("old_value")
+                set_old_value(new_vars, var_name, func_args["old_value"])
+                queued[1] = [new_vars, func_args]
+                self.coalesced += 1
+                return
+        if 0 < self.limit <= self.qsize():
+            self._forget(self._queue.popleft())
+            self.dropped += 1
+            if self.dropped == 1:
+                _LOGGER.warning(
+                    "trigger %s: notify queue full (size %d), dropping oldest notifications",
+                    self.name,
+                    self.limit,
+                )
+        super().put_nowait(item)
+        if var_name is not None:
+            self.queued_by_var[var_name] = item
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return the overflow policy and how many notifications are queued, dropped and coalesced."""
+        return {
+            "queue_policy": self.policy,
+            "queue_size": self.limit or None,
+            "queued": self.qsize(),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+    def _get(self) -> list[Any]:
+        """Remove and return the next notification."""
+        item = super()._get()
+        self._forget(item)
+        return item
+
+    def _forget(self, item: list[Any]) -> None:
+        """Stop coalescing into a notification that has left the queue."""
+        if self.queued_by_var:
+            var_name = self._var_name(item)
+            if var_name is not None and self.queued_by_var.get(var_name) is item:
+                del self.queued_by_var[var_name]
+
+
 class StateVal(str):
     """Class for representing the value and attributes of a state variable."""
 
@@ -116,10 +213,25 @@ class State:
     persisted_vars: ClassVar[dict[str, PyscriptEntity]] = {}
 
     #
-    # other parameters of all services that have "entity_id" as a parameter
+    # other parameters of all services that have "entity_id" as a parameter, by domain; use
+    # service_args() to read it, since it's only updated incrementally
     #
     service2args: ClassVar[dict[str, dict[str, Any]]] = {}
 
+    #
+    # domains whose services were registered, removed or redescribed since their entry in
+    # service2args was built; each is rebuilt from the cached descriptions on its next use, so
+    # many registrations (eg, at startup) cost one rebuild
+    #
+    service_domains_changed: ClassVar[set[str]] = set()
+
+    #
+    # domains with services whose descriptions aren't cached yet, and whether a task that loads
+    # them is pending
+    #
+    service_domains_undescribed: ClassVar[set[str]] = set()
+    service_desc_load_pending: ClassVar[bool] = False
+
     def __init__(self):
         """Warn on State instantiation."""
         _LOGGER.error("State class is not meant to be instantiated")
@@ -129,18 +241,76 @@ class State:
         """Initialize State."""
         cls.hass = hass
 
+    @staticmethod
+    def service_desc_args(desc: dict[str, Any]) -> set[str] | None:
+        """Return the other parameters of a service description if it has an entity_id parameter."""
+        if "entity_id" not in desc["fields"] and "target" not in desc:
+            return None
+        return set(desc["fields"].keys()) - {"entity_id"}
+
     @classmethod
     async def get_service_params(cls):
         """Get parameters for all services."""
+        start = time.perf_counter()
         cls.service2args = {}
+        cls.service_domains_changed = set()
         all_services = await async_get_all_descriptions(cls.hass)
         for domain in all_services:
             cls.service2args[domain] = {}
             for service, desc in all_services[domain].items():
-                if "entity_id" not in desc["fields"] and "target" not in desc:
+                args = cls.service_desc_args(desc)
+                if args is not None:
+                    cls.service2args[domain][service] = args
+        LoadReport.add_phase_time("service_params", time.perf_counter() - start)
+
+    @classmethod
+    @callback
+    def service_changed_event(cls, event: HAEvent) -> None:
+        """Handle a service registered or removed event."""
+        cls.service_params_changed(event.data["domain"])
+
+    @classmethod
+    def service_params_changed(cls, domain: str) -> None:
+        """Mark the service parameters of a domain to be rebuilt on their next use."""
+        cls.service_domains_changed.add(domain.lower())
+
+    @classmethod
+    def service_args(cls, domain: str) -> dict[str, set[str]]:
+        """Return the other parameters of the services of domain that have an entity_id parameter."""
+        if domain in cls.service_domains_changed:
+            cls.service_domains_changed.discard(domain)
+            domain_args = {}
+            for service in cls.hass.services.async_services_for_domain(domain):
+                desc = async_get_cached_service_description(cls.hass, domain, service)
+                if desc is None:
+                    cls.service_descriptions_load(domain)
                     continue
-                cls.service2args[domain][service] = set(desc["fields"].keys())
-                cls.service2args[domain][service].discard("entity_id")
+                args = cls.service_desc_args(desc)
+                if args is not None:
+                    domain_args[service] = args
+            cls.service2args[domain] = domain_args
+        return cls.service2args.get(domain, {})
+
+    @classmethod
+    def service_descriptions_load(cls, domain: str) -> None:
+        """Load the descriptions of services that aren't cached yet, batching the domains that need it."""
+        cls.service_domains_undescribed.add(domain)
+        if cls.service_desc_load_pending:
+            return
+        cls.service_desc_load_pending = True
+
+        async def load_descriptions() -> None:
+            try:
+                #
+                # this only loads the services.yaml files of the domains with undescribed services
+                #
+                await async_get_all_descriptions(cls.hass)
+            finally:
+                cls.service_desc_load_pending = False
+                cls.service_domains_changed |= cls.service_domains_undescribed
+                cls.service_domains_undescribed = set()
+
+        cls.hass.async_create_task(load_descriptions())
 
     @classmethod
     async def notify_add(cls, var_names: set[str], queue: asyncio.Queue) -> bool:
@@ -183,8 +353,12 @@ class State:
 
         if notify:
             _LOGGER.debug("state.update(%s, %s)", new_vars, func_args)
+            #
+            # notify queues never fill up (a bounded NotifyQueue drops instead), so
+            # a trigger that falls behind doesn't delay delivery to the others
+            #
             for queue, var_names in notify.items():
-                await queue.put(["state", [cls.notify_var_get(var_names, new_vars), func_args.copy()]])
+                queue.put_nowait(["state", [cls.notify_var_get(var_names, new_vars), func_args.copy()]])
 
     @classmethod
     def notify_var_get(cls, var_names, new_vars):
@@ -248,6 +422,8 @@ class State:
 
         _LOGGER.debug("setting %s = %s, attr = %s", var_name, value, new_attributes)
         cls.hass.states.async_set(var_name, value, new_attributes, context=context)
+        if TraceRegistry.tracers:
+            TraceRegistry.event("state_set", var_name, value, new_attributes, context)
         if var_name in cls.notify_var_last or var_name in cls.notify:
             #
             # immediately update a variable we are monitoring since it could take a while
@@ -311,7 +487,7 @@ class State:
             return False
         if (
             len(parts) == 2
-            or (parts[0] in cls.service2args and parts[2] in cls.service2args[parts[0]])
+            or parts[2] in cls.service_args(parts[0])
             or parts[2] in value.attributes
             or parts[2] in STATE_VIRTUAL_ATTRS
             or parts[2] in STATE_CALLABLE_ATTRS
@@ -337,8 +513,9 @@ class State:
         #
         # see if this is a service that has an entity_id parameter
         #
-        if parts[0] in cls.service2args and parts[2] in cls.service2args[parts[0]]:
-            params = cls.service2args[parts[0]][parts[2]]
+        service_args = cls.service_args(parts[0])
+        if parts[2] in service_args:
+            params = service_args[parts[2]]
 
             def service_call_factory(domain, service, entity_id, params):
                 async def service_call(*args, **kwargs):
@@ -366,6 +543,10 @@ class State:
                         raise TypeError(f"service {domain}.{service} takes no positional arguments")
 
                     # return await Function.hass_services_async_call(domain, service, kwargs, **hass_args)
+                    if TraceRegistry.tracers:
+                        return await TraceRegistry.call_service(
+                            cls.hass, domain, service, kwargs, **hass_args
+                        )
                     return await cls.hass.services.async_call(domain, service, kwargs, **hass_args)
 
                 return service_call
@@ -448,8 +629,7 @@ class State:
             if value:
                 attr_root = root[last_period + 1 :]
                 attrs = set(value.attributes.keys()).union(STATE_VIRTUAL_ATTRS)
-                if parts[0] in cls.service2args:
-                    attrs.update(set(cls.service2args[parts[0]].keys()))
+                attrs.update(cls.service_args(parts[0]).keys())
                 for attr_name in attrs:
                     if attr_name.lower().startswith(attr_root):
                         words.add(f"{name}.{attr_name}")
@@ -37,6 +37,9 @@ def state_trigger(
     state_check_now: bool = False,
     kwargs: dict | None = None,
     watch: list[str] | set[str] | None = None,
+    coalesce: int | float | None = None,
+    queue_size: int | None = None,
+    queue_policy: Literal["drop_oldest", "coalesce"] | None = None,
 ) -> Callable[..., Any]:
     """Trigger when any provided state expression evaluates truthy.
 
@@ -47,6 +50,11 @@ def state_trigger(
         state_check_now: Evaluate at registration time and fire immediately if the expression is true.
         kwargs: Extra keywords injected into each call in addition to the standard trigger context.
         watch: Explicit entities or attributes to monitor when autodetection from the expression is insufficient.
+        coalesce: Seconds to gather changes after the first one and evaluate them once against the latest values;
+            the function also receives the merged ``changes`` list.
+        queue_size: Maximum number of queued state changes; unbounded by default.
+        queue_policy: ``"drop_oldest"`` discards the oldest change when the queue is full, and ``"coalesce"`` also
+            merges changes to the same entity, keeping the latest value.
 
     Trigger kwargs include ``trigger_type="state"``, ``var_name``, ``value`` and ``old_value`` when available.
     """
@@ -72,12 +80,35 @@ def time_trigger(*time_spec: str | None, kwargs: dict | None = None) -> Callable
     ...
 
 
-def task_unique(name: str, kill_me: bool = False) -> Callable[..., Any]:
+def task_unique(name: str, kill_me: bool = False, queue_latest: bool = False) -> Callable[..., Any]:
     """Ensure only one running instance of the decorated task.
 
     Args:
         name: Identifier used to reclaim prior tasks that called ``task.unique`` or ``@task_unique``.
         kill_me: Cancel the new run instead of the existing one when a conflict is found.
+        queue_latest: Keep the latest trigger pending and run it after the current run finishes.
+    """
+    ...
+
+
+def task_limit(
+    max_concurrent: int, queue: int | None = None, overflow: Literal["drop", "wait"] = "drop"
+) -> Callable[..., Any]:
+    """Limit how many triggered runs of the decorated function execute at once.
+
+    Args:
+        max_concurrent: Maximum number of runs executing at the same time.
+        queue: Maximum number of runs waiting for a free slot; runs beyond that are rejected.
+        overflow: Default for ``queue``; ``"drop"`` queues nothing and ``"wait"`` queues without limit.
+    """
+    ...
+
+
+def task_priority(priority: int) -> Callable[..., Any]:
+    """Set the priority of the decorated function's triggered runs.
+
+    Args:
+        priority: When ``action_concurrency`` is set, waiting runs with a higher priority start first.
     """
     ...
 
@@ -109,7 +140,11 @@ def time_active(*time_spec: str, hold_off: int | float | None = None) -> Callabl
 
 
 def mqtt_trigger(
-    topic: str, str_expr: str | None = None, encoding: str = "utf-8", kwargs: dict | None = None
+    topic: str,
+    str_expr: str | None = None,
+    encoding: str = "utf-8",
+    decode: Literal["json", "raw"] = "json",
+    kwargs: dict | None = None,
 ) -> Callable[..., Any]:
     """Trigger when a subscribed MQTT message matches the specification.
 
@@ -117,6 +152,7 @@ def mqtt_trigger(
         topic: MQTT topic to monitor; wildcards ``+`` and ``#`` are supported.
         str_expr: Optional expression evaluated against ``payload``, ``payload_obj``, ``retain``, ``topic``, and ``qos``.
         encoding: Character encoding for MQTT payload decoding; defaults to ``"utf-8"``.
+        decode: ``"json"`` to provide ``payload_obj`` when it is used, or ``"raw"`` to never decode it.
         kwargs: Extra keyword arguments merged into each invocation.
     """
     ...
@@ -149,10 +185,15 @@ def pyscript_compile() -> Callable[..., Any]:
     ...
 
 
-def pyscript_executor() -> Callable[..., Any]:
+def pyscript_executor(timeout: float | None = None, process: bool = False) -> Callable[..., Any]:
     """Compile the wrapped function and run it transparently in ``task.executor``.
 
     Use it for blocking or I/O-bound code so each call runs in a background thread.
+
+    Args:
+        timeout: Seconds to wait for each call before raising ``TimeoutError``.
+        process: Run each call in a worker process instead, for CPU-bound code; arguments,
+            results and used globals must be picklable.
     """
     ...
 
@@ -0,0 +1,110 @@
+"""Hooks that let other code trace pyscript function calls, trigger actions, service calls and state sets."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+from typing import Any, ClassVar
+
+from homeassistant.core import Context, HomeAssistant
+
+from .const import LOGGER_PATH
+
+_LOGGER = logging.getLogger(LOGGER_PATH + ".tracer")
+
+
+class Tracer:
+    """Base class of tracers; subclasses override the hooks of the events they trace."""
+
+    #
+    # the *_call hooks are called when an event starts; whatever they return (eg, a span) is
+    # passed as token to the matching *_return hook when it ends, with the result or exception
+    #
+    def function_call(self, ast_ctx: Any, func_name: str, args: tuple, kwargs: dict[str, Any]) -> Any:
+        """Handle the start of a function call from pyscript code."""
+        return None
+
+    def function_return(self, token: Any, result: Any, exc: BaseException | None) -> None:
+        """Handle the end of a function call from pyscript code."""
+
+    def trigger_call(self, func_name: str, data: Any) -> Any:
+        """Handle the start of a trigger action; data is the DispatchData of the trigger."""
+        return None
+
+    def trigger_return(self, token: Any, result: Any, exc: BaseException | None) -> None:
+        """Handle the end of a trigger action."""
+
+    def service_call(self, domain: str, service: str, data: dict[str, Any], context: Context | None) -> Any:
+        """Handle the start of a service call made by pyscript."""
+        return None
+
+    def service_return(self, token: Any, result: Any, exc: BaseException | None) -> None:
+        """Handle the end of a service call made by pyscript."""
+
+    def state_set(
+        self, var_name: str, value: Any, attributes: dict[str, Any], context: Context | None
+    ) -> None:
+        """Handle pyscript setting a state variable."""
+
+
+class TraceRegistry:
+    """Registered tracers and the helpers the interpreter uses to call their hooks."""
+
+    #
+    # the interpreter only checks whether this tuple is empty, so tracing costs nothing
+    # when no tracer is registered
+    #
+    tracers: ClassVar[tuple[Tracer, ...]] = ()
+
+    @classmethod
+    def register(cls, tracer: Tracer) -> Callable[[], None]:
+        """Register a tracer; returns a function that unregisters it."""
+        cls.tracers = (*cls.tracers, tracer)
+
+        def unregister() -> None:
+            cls.tracers = tuple(other for other in cls.tracers if other is not tracer)
+
+        return unregister
+
+    @classmethod
+    def start(cls, hook: str, *args: Any) -> list[tuple[Tracer, Any]]:
+        """Call the hook of each tracer at the start of an event; returns the tracers and their tokens."""
+        spans = []
+        for tracer in cls.tracers:
+            try:
+                spans.append((tracer, getattr(tracer, hook)(*args)))
+            except Exception:
+                _LOGGER.exception("tracer %s failed in %s", tracer, hook)
+        return spans
+
+    @classmethod
+    def end(cls, spans: list[tuple[Tracer, Any]], hook: str, result: Any, exc: BaseException | None) -> None:
+        """Call the hook of each tracer that saw the start of an event at its end."""
+        for tracer, token in spans:
+            try:
+                getattr(tracer, hook)(token, result, exc)
+            except Exception:
+                _LOGGER.exception("tracer %s failed in %s", tracer, hook)
+
+    @classmethod
+    def event(cls, hook: str, *args: Any) -> None:
+        """Call the hook of each tracer for an event that has no duration."""
+        for tracer in cls.tracers:
+            try:
+                getattr(tracer, hook)(*args)
+            except Exception:
+                _LOGGER.exception("tracer %s failed in %s", tracer, hook)
+
+    @classmethod
+    async def call_service(
+        cls, hass: HomeAssistant, domain: str, service: str, data: dict[str, Any], **hass_args: Any
+    ) -> Any:
+        """Call a hass service, tracing the call."""
+        spans = cls.start("service_call", domain, service, data, hass_args.get("context"))
+        try:
+            result = await hass.services.async_call(domain, service, data, **hass_args)
+        except BaseException as exc:
+            cls.end(spans, "service_return", None, exc)
+            raise
+        cls.end(spans, "service_return", result, None)
+        return result
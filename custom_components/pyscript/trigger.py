@@ -18,9 +18,10 @@ from homeassistant.util import dt as dt_util
 from .const import LOGGER_PATH
 from .eval import AstEval, EvalFunc, EvalFuncVar
 from .event import Event
+from .executor import Executor
 from .function import Function
 from .mqtt import Mqtt
-from .state import STATE_VIRTUAL_ATTRS, State
+from .state import STATE_VIRTUAL_ATTRS, NotifyQueue, State
 from .webhook import Webhook
 
 _LOGGER = logging.getLogger(LOGGER_PATH + ".trigger")
@@ -604,7 +605,7 @@ class TrigTime:
             raise TypeError(
                 "pyscript functions can't be called from task.executor - must be a regular python function"
             )
-        return await cls.hass.async_add_executor_job(functools.partial(func, **kwargs), *args)
+        return await Executor.run(functools.partial(func, **kwargs), *args)
 
     @classmethod
     async def parse_date_time(cls, date_time_str, day_offset, now, startup_time):
@@ -906,7 +907,11 @@ class TrigInfo:
         self.task_unique_kwargs = trig_cfg.get("task_unique", {}).get("kwargs", None)
         self.action = trig_cfg.get("action")
         self.global_sym_table = trig_cfg.get("global_sym_table", {})
-        self.notify_q = asyncio.Queue(0)
+        self.notify_q = NotifyQueue(
+            self.state_trigger_kwargs.get("queue_size", None) or 0,
+            self.state_trigger_kwargs.get("queue_policy", None),
+            name=self.name,
+        )
         self.active_expr = None
         self.state_active_ident = None
         self.state_trig_expr = None
@@ -1081,7 +1086,10 @@ class TrigInfo:
             if self.mqtt_trigger is not None:
                 _LOGGER.debug("trigger %s adding mqtt_trigger %s", self.name, self.mqtt_trigger[0])
                 await Mqtt.notify_add(
-                    self.mqtt_trigger[0], self.notify_q, encoding=self.mqtt_trigger_encoding
+                    self.mqtt_trigger[0],
+                    self.notify_q,
+                    encoding=self.mqtt_trigger_encoding,
+                    needs_payload_obj=await self.mqtt_uses_payload_obj(),
                 )
             if self.webhook_trigger is not None:
                 _LOGGER.debug("trigger %s adding webhook_trigger %s", self.name, self.webhook_trigger[0])
@@ -1335,6 +1343,15 @@ class TrigInfo:
                 Webhook.notify_del(self.webhook_trigger[0], self.notify_q)
             return
 
+    async def mqtt_uses_payload_obj(self):
+        """Return True if the mqtt trigger expression or the function can use payload_obj."""
+        if self.mqtt_trig_expr and "payload_obj" in await self.mqtt_trig_expr.get_names():
+            return True
+        args = self.action.func_def.args
+        if args.kwarg:
+            return True
+        return any(arg.arg == "payload_obj" for arg in args.posonlyargs + args.args + args.kwonlyargs)
+
     async def _call_expression(self, ast_expr, notify_info):
         try:
             return await ast_expr.eval(notify_info)
@@ -7,6 +7,7 @@ from aiohttp import hdrs
 from homeassistant.components import webhook
 
 from .const import LOGGER_PATH
+from .json_codec import json_loads
 
 _LOGGER = logging.getLogger(LOGGER_PATH + ".webhook")
 
@@ -45,7 +46,7 @@ class Webhook:
         }
 
         if "json" in request.headers.get(hdrs.CONTENT_TYPE, ""):
-            func_args["payload"] = await request.json()
+            func_args["payload"] = await request.json(loads=json_loads)
         else:
             # Could potentially return multiples of a key - only take the first
             payload_multidict = await request.post()
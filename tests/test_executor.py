@@ -0,0 +1,222 @@
+"""Tests for the pyscript executor pool."""
+
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+import math
+import os
+import threading
+
+import pytest
+
+from custom_components.pyscript.executor import DEFAULT_EXECUTOR_WORKERS, Executor
+
+
+@pytest.fixture(autouse=True)
+def reset_executor():
+    """Give each test a fresh pool."""
+    Executor.shutdown()
+    Executor.configure(None)
+    yield
+    Executor.shutdown(wait=True)
+    Executor.configure(None)
+
+
+async def test_executor_runs_in_pyscript_pool():
+    """Calls run in the pyscript-owned threads and return their result."""
+    assert await Executor.run(int, "ff", base=16) == 255
+    thread_name = await Executor.run(lambda: threading.current_thread().name)
+    assert thread_name.startswith("pyscript")
+    assert Executor.pool._max_workers == DEFAULT_EXECUTOR_WORKERS
+
+
+async def test_executor_queue_depth():
+    """Calls beyond the pool size are queued, and the depth is reported."""
+    Executor.configure(2)
+    release = threading.Event()
+    calls = [asyncio.create_task(Executor.run(release.wait, 5)) for _ in range(5)]
+    while Executor.running < 2:
+        await asyncio.sleep(0.01)
+    stats = Executor.get_stats()
+    assert stats["workers"] == 2
+    assert stats["running"] == 2
+    assert stats["queued"] == 3
+    assert stats["max_queued"] >= 3
+
+    release.set()
+    assert await asyncio.gather(*calls) == [True] * 5
+    stats = Executor.get_stats()
+    assert stats["running"] == 0
+    assert stats["queued"] == 0
+
+
+async def test_executor_timeout():
+    """A call that doesn't finish in time raises TimeoutError; a queued one is dropped."""
+    Executor.configure(1)
+    release = threading.Event()
+    timeouts = Executor.timeouts
+    with pytest.raises(TimeoutError, match=r"executor call of wait timed out after 0\.05s"):
+        await Executor.run(release.wait, 5, timeout=0.05)
+    with pytest.raises(TimeoutError):
+        await Executor.run(release.wait, 5, timeout=0.05)
+    assert Executor.timeouts == timeouts + 2
+    assert Executor.queued == 0
+    release.set()
+
+
+async def test_executor_completed_and_cancelled():
+    """Only calls that finish count as completed; timed out and cancelled calls are counted apart."""
+    Executor.configure(1)
+    release = threading.Event()
+
+    def fail():
+        raise TimeoutError("raised by the function")
+
+    stats = Executor.get_stats()
+    assert await Executor.run(sum, [1, 2]) == 3
+    with pytest.raises(TimeoutError, match="raised by the function"):
+        await Executor.run(fail, timeout=5)
+    with pytest.raises(TimeoutError, match="timed out"):
+        await Executor.run(release.wait, 5, timeout=0.05)
+    call = asyncio.create_task(Executor.run(release.wait, 5))
+    await asyncio.sleep(0.05)
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    release.set()
+    new_stats = Executor.get_stats()
+    assert new_stats["completed"] == stats["completed"] + 2
+    assert new_stats["timeouts"] == stats["timeouts"] + 1
+    assert new_stats["cancelled"] == stats["cancelled"] + 1
+
+
+async def test_executor_shutdown():
+    """Shutting down drops the pool, and no new one is created until the executor is configured."""
+    await Executor.run(sum, [1, 2])
+    pool = Executor.pool
+    Executor.shutdown()
+    assert Executor.pool is None
+    assert pool._shutdown
+    with pytest.raises(RuntimeError, match="pyscript executor is shut down"):
+        await Executor.run(sum, [1, 2])
+    assert Executor.pool is None
+    Executor.configure(None)
+    assert await Executor.run(sum, [1, 2]) == 3
+    assert Executor.pool is not pool
+
+
+def compile_function(source: str, func_globals: dict) -> object:
+    """Compile a function the way pyscript compiles @pyscript_executor functions."""
+    sym_table = {}
+    exec(compile(source, "file.hello", "exec"), func_globals, sym_table)  # pylint: disable=exec-used
+    return next(iter(sym_table.values()))
+
+
+async def test_executor_process():
+    """A compiled function runs in a worker process, and the workers stop on shutdown."""
+    Executor.configure(None, 1)
+    func_globals = {"__name__": "file.hello", "math": math, "SCALE": 10}
+    func = compile_function(
+        """
+def hypot_scaled(x, y, *, offset=0):
+    import os
+    return math.hypot(x, y) * SCALE + offset, os.getpid()
+""",
+        func_globals,
+    )
+    Executor.check_process_function(func)
+    result, pid = await Executor.run_process(func, (3, 4), {"offset": 1})
+    assert result == 51.0
+    assert pid != os.getpid()
+    assert Executor.get_stats()["processes"] == 1
+
+    func = compile_function(
+        """
+def make_lambda():
+    return lambda: 1
+""",
+        func_globals,
+    )
+    with pytest.raises(TypeError, match="result of make_lambda can't be returned from a process"):
+        await Executor.run_process(func, (), {})
+
+    processes = list(Executor.process_pool._processes.values())
+    assert len(processes) == 1
+    Executor.shutdown(wait=True)
+    assert Executor.process_pool is None
+    assert not any(process.is_alive() for process in processes)
+
+
+async def test_executor_process_broken_pool():
+    """A worker process that dies breaks the pool, and the next call starts new workers."""
+    Executor.configure(None, 1)
+    func_globals = {"__name__": "file.hello"}
+    die = compile_function(
+        """
+def die():
+    import os
+    os._exit(1)
+""",
+        func_globals,
+    )
+    getpid = compile_function(
+        """
+def getpid():
+    import os
+    return os.getpid()
+""",
+        func_globals,
+    )
+    await Executor.run_process(getpid, (), {})
+    pool = Executor.process_pool
+    with pytest.raises(BrokenProcessPool):
+        await Executor.run_process(die, (), {})
+    assert Executor.process_pool is None
+    assert await Executor.run_process(getpid, (), {}) != os.getpid()
+    assert Executor.process_pool is not pool
+
+
+async def test_executor_async_shutdown():
+    """Shutting down from the event loop waits for the worker processes to exit."""
+    Executor.configure(None, 1)
+    pool = await asyncio.get_running_loop().run_in_executor(None, Executor.get_process_pool)
+    processes = list(pool._processes.values())
+    await Executor.async_shutdown()
+    assert Executor.process_pool is None
+    assert not pool._executor_manager_thread
+    assert not any(process.is_alive() for process in processes)
+
+
+async def test_executor_process_pickling_errors():
+    """Closures and values that can't be pickled are reported as TypeError."""
+    func_globals = {"__name__": "file.hello", "LOCK": threading.Lock()}
+    func = compile_function(
+        """
+def uses_lock():
+    return LOCK.locked()
+""",
+        func_globals,
+    )
+    with pytest.raises(TypeError, match="arguments or globals of uses_lock can't be passed to a process"):
+        await Executor.run_process(func, (), {})
+
+    func = compile_function(
+        """
+def identity(value):
+    return value
+""",
+        func_globals,
+    )
+    with pytest.raises(TypeError, match="arguments or globals of identity can't be passed to a process"):
+        await Executor.run_process(func, (threading.Lock(),), {})
+
+    def outer():
+        value = 1
+
+        def inner():
+            return value
+
+        return inner
+
+    with pytest.raises(TypeError, match="can't use variables of an enclosing function"):
+        Executor.check_process_function(outer())
+    assert Executor.process_pool is None
@@ -12,6 +12,8 @@ import pytest
 from custom_components.pyscript import trigger
 from custom_components.pyscript.const import CONF_ALLOW_ALL_IMPORTS, CONF_HASS_IS_GLOBAL, DOMAIN, FOLDER
 from custom_components.pyscript.function import Function
+from custom_components.pyscript.stall_monitor import StallMonitor
+from custom_components.pyscript.tracer import Tracer, TraceRegistry
 from homeassistant.const import EVENT_HOMEASSISTANT_STARTED, EVENT_STATE_CHANGED
 from homeassistant.core import Context, ServiceRegistry
 from homeassistant.setup import async_setup_component
@@ -1210,6 +1212,168 @@ def func_startup_sync2(trigger_type=None, var_name=None):
         assert literal_eval(await wait_until_done(notify_q)) == [0, "state", "pyscript.fstartup0"]
 
 
+@pytest.mark.asyncio
+async def test_state_trigger_coalesce(hass, caplog):
+    """Test state trigger coalescing window."""
+    notify_q = asyncio.Queue(0)
+
+    await setup_script(
+        hass,
+        notify_q,
+        None,
+        [dt(2020, 7, 1, 10, 59, 59, 999998), dt(2020, 7, 1, 11, 59, 59, 999998)],
+        """
+
+@state_trigger("pyscript.power", "pyscript.mode == 'on'", coalesce=0.2)
+def func_coalesce(var_name=None, value=None, old_value=None, changes=None):
+    pyscript.done = [var_name, value, old_value, [[c["var_name"], c["value"]] for c in changes]]
+""",
+    )
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+
+    hass.states.async_set("pyscript.power", 1)
+    hass.states.async_set("pyscript.power", 2)
+    hass.states.async_set("pyscript.mode", "on")
+    hass.states.async_set("pyscript.power", 3)
+    assert literal_eval(await wait_until_done(notify_q)) == [
+        "pyscript.power",
+        "3",
+        None,
+        [["pyscript.power", "1"], ["pyscript.power", "2"], ["pyscript.mode", "on"], ["pyscript.power", "3"]],
+    ]
+
+    hass.states.async_set("pyscript.power", 4)
+    assert literal_eval(await wait_until_done(notify_q)) == [
+        "pyscript.power",
+        "4",
+        "3",
+        [["pyscript.power", "4"]],
+    ]
+    assert notify_q.empty()
+
+
+async def test_stall_monitor(hass, caplog):
+    """Test the stall monitor attributes long steps to pyscript functions and lines."""
+    notify_q = asyncio.Queue(0)
+
+    await setup_script(
+        hass,
+        notify_q,
+        None,
+        [dt(2020, 7, 1, 10, 59, 59, 999998)],
+        """
+
+@state_trigger("pyscript.go == '1'")
+def busy():
+    n = 0
+    for i in range(5000):
+        n += i
+    task.sleep(0)
+    pyscript.done = n
+""",
+        config={DOMAIN: {CONF_ALLOW_ALL_IMPORTS: True, "stall_threshold_ms": 1}},
+    )
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+
+    hass.states.async_set("pyscript.go", "1")
+    assert literal_eval(await wait_until_done(notify_q)) == sum(range(5000))
+
+    report = await hass.services.async_call(
+        DOMAIN, "stall_report", {"reset": True}, blocking=True, return_response=True
+    )
+    assert report["threshold_ms"] == 1
+    offender = report["offenders"][0]
+    assert offender["global_ctx"] == "file.hello"
+    assert offender["function"] == "busy"
+    assert offender["line"] == 8
+    assert offender["max_ms"] > 1
+
+    await hass.async_block_till_done()
+    sensor = hass.states.get("sensor.pyscript_stalls")
+    assert int(sensor.state) >= 1
+    assert sensor.attributes["offenders"][0]["function"] == "busy"
+
+    report = await hass.services.async_call(DOMAIN, "stall_report", {}, blocking=True, return_response=True)
+    assert report["offenders"] == []
+    StallMonitor.init(hass, None)
+
+
+@pytest.mark.asyncio
+async def test_tracer(hass, caplog):
+    """Test a registered tracer sees function calls, trigger actions, service calls and state sets."""
+    notify_q = asyncio.Queue(0)
+    events = []
+
+    class RecordingTracer(Tracer):
+        def function_call(self, ast_ctx, func_name, args, kwargs):
+            return ("function", func_name)
+
+        def function_return(self, token, result, exc):
+            events.append((*token, result))
+
+        def trigger_call(self, func_name, data):
+            events.append(("trigger_call", func_name, data.func_args["value"]))
+            return ("trigger", func_name)
+
+        def trigger_return(self, token, result, exc):
+            events.append((*token, exc))
+
+        def service_call(self, domain, service, data, context):
+            assert context is not None
+            return ("service", f"{domain}.{service}")
+
+        def service_return(self, token, result, exc):
+            events.append((*token, exc))
+
+        def state_set(self, var_name, value, attributes, context):
+            events.append(("state", var_name, value))
+
+    async def handle_svc(call):
+        pass
+
+    hass.services.async_register("test", "svc", handle_svc)
+
+    await setup_script(
+        hass,
+        notify_q,
+        None,
+        [dt(2020, 7, 1, 10, 59, 59, 999998)],
+        """
+
+def double(x):
+    return 2 * x
+
+@state_trigger("pyscript.go == '1'")
+def traced(value=None):
+    service.call("test", "svc", blocking=True)
+    pyscript.done = double(21)
+""",
+    )
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+
+    unregister = TraceRegistry.register(RecordingTracer())
+    try:
+        hass.states.async_set("pyscript.go", "1")
+        assert literal_eval(await wait_until_done(notify_q)) == 42
+        await hass.async_block_till_done()
+    finally:
+        unregister()
+    assert TraceRegistry.tracers == ()
+
+    assert events[0] == ("trigger_call", "file.hello.traced", "1")
+    assert ("service", "test.svc", None) in events
+    assert ("function", "double", 42) in events
+    assert ("state", "pyscript.done", 42) in events
+    assert events.index(("function", "double", 42)) < events.index(("state", "pyscript.done", 42))
+    assert events[-2:] == [("function", "traced", None), ("trigger", "file.hello.traced", None)]
+
+
 @pytest.mark.asyncio
 async def test_state_methods(hass, caplog):
     """Test state methods that call services."""
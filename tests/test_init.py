@@ -7,12 +7,15 @@ import pathlib
 from unittest.mock import mock_open, patch
 
 import pytest
+import voluptuous as vol
 
 from custom_components.pyscript import trigger
 from custom_components.pyscript.const import DOMAIN
 from custom_components.pyscript.event import Event
+from custom_components.pyscript.executor import Executor
 from custom_components.pyscript.function import Function
 from custom_components.pyscript.global_ctx import GlobalContextMgr
+from custom_components.pyscript.profiler import Profiler
 from custom_components.pyscript.state import State
 from homeassistant import loader
 from homeassistant.const import EVENT_STATE_CHANGED
@@ -512,3 +515,52 @@ async def test_misc_errors(hass, caplog):
     assert "State class is not meant to be instantiated" in caplog.text
     assert "Event class is not meant to be instantiated" in caplog.text
     assert "TrigTime class is not meant to be instantiated" in caplog.text
+
+
+async def test_profile_services(hass):
+    """Test the profiler services validate their arguments."""
+
+    await setup_script(hass, None, dt(2020, 7, 1, 11, 59, 59, 999999), "")
+
+    for interval_ms in (0, -5, "fast"):
+        with pytest.raises(vol.Invalid):
+            await hass.services.async_call(
+                DOMAIN, "profile_start", {"interval_ms": interval_ms}, blocking=True
+            )
+    assert not Profiler.is_running()
+
+    await hass.services.async_call(DOMAIN, "profile_start", {"interval_ms": "2"}, blocking=True)
+    assert Profiler.is_running()
+    assert Profiler.interval == 0.002
+    await hass.services.async_call(DOMAIN, "profile_start", {}, blocking=True)
+    assert Profiler.interval == 0.005
+
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN, "profile_stop", {"top": 0}, blocking=True, return_response=True
+        )
+    report = await hass.services.async_call(DOMAIN, "profile_stop", {}, blocking=True, return_response=True)
+    assert not Profiler.is_running()
+    assert "lines" in report
+
+
+async def test_unload_shuts_down_executor(hass):
+    """Test unloading the config entry shuts down the executor pools."""
+
+    await setup_script(hass, None, dt(2020, 7, 1, 11, 59, 59, 999999), "")
+
+    Executor.configure(None, 1)
+    pool = await hass.async_add_executor_job(Executor.get_process_pool)
+    processes = list(pool._processes.values())
+    manager_thread = pool._executor_manager_thread
+    assert await Executor.run(sum, [1, 2]) == 3
+    thread_pool = Executor.pool
+
+    entry = hass.config_entries.async_entries(DOMAIN)[0]
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert Executor.pool is None
+    assert Executor.process_pool is None
+    assert thread_pool._shutdown
+    assert not manager_thread.is_alive()
+    assert not any(process.is_alive() for process in processes)
+    Executor.configure(None, None)
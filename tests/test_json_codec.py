@@ -0,0 +1,125 @@
+"""Tests for the JSON codec layer."""
+
+import dataclasses
+import datetime
+import json
+import math
+import time
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.pyscript import json_codec
+from custom_components.pyscript.json_codec import JSON_LIBRARY, json_dumps, json_dumps_bytes, json_loads
+
+SAMPLE_MSG = {
+    "header": {
+        "date": "2025-01-01T12:00:00.000000",
+        "msg_id": "0123456789abcdef0123456789abcdef",
+        "username": "kernel",
+        "session": "fedcba9876543210fedcba9876543210",
+        "msg_type": "execute_result",
+        "version": "5.3",
+    },
+    "content": {
+        "execution_count": 12,
+        "data": {"text/plain": "[" + ", ".join(str(i) for i in range(100)) + "]"},
+        "metadata": {},
+    },
+    "readings": [{"temperature": 21.5 + i / 10, "humidity": 40 + i, "ok": True} for i in range(50)],
+}
+
+
+@dataclasses.dataclass
+class Reading:
+    """Dataclass that json.dumps can't encode."""
+
+    temperature: float
+
+
+def test_json_codec_uses_orjson():
+    """Use orjson, which ships with Home Assistant."""
+    assert JSON_LIBRARY == "orjson"
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        SAMPLE_MSG,
+        {"unicode": "café ☃", "nested": [[], {}, None, False, -1, 1.5]},
+        {"big": 2**70},
+        [],
+        "text",
+        None,
+    ],
+)
+def test_json_codec_round_trip(obj):
+    """Encoding then decoding matches the stdlib results."""
+    encoded = json_dumps_bytes(obj)
+    assert isinstance(encoded, bytes)
+    assert json_loads(encoded) == obj
+    assert json.loads(encoded) == obj
+    assert json_loads(json_dumps(obj)) == obj
+    assert json_loads(json.dumps(obj)) == obj
+
+
+def test_json_codec_matches_stdlib_edge_cases():
+    """Inputs that orjson rejects still behave like the stdlib."""
+    assert math.isnan(json_loads("NaN"))
+    assert json_loads("Infinity") == math.inf
+    assert json_loads(str(2**70)) == 2**70
+    assert json_loads(json_dumps_bytes({1: "a"})) == {"1": "a"}
+    # orjson always emits valid JSON, so NaN is encoded as null rather than the non-standard NaN
+    assert json_loads(json_dumps_bytes([math.nan])) in ([None], [pytest.approx(math.nan, nan_ok=True)])
+
+
+@pytest.mark.parametrize("data", ["on", "", "{bad", b"\xff"])
+def test_json_codec_invalid_raises_value_error(data):
+    """Invalid JSON raises ValueError, like json.loads."""
+    with pytest.raises(ValueError):
+        json_loads(data)
+
+
+@pytest.mark.parametrize(
+    "obj", [object(), datetime.datetime(2025, 1, 1), datetime.date(2025, 1, 1), Reading(21.5)]
+)
+def test_json_codec_unserializable_raises_type_error(obj):
+    """Unserializable objects raise TypeError, like json.dumps."""
+    with pytest.raises(TypeError):
+        json_dumps_bytes({"obj": obj})
+
+
+def test_json_codec_invalid_skips_stdlib():
+    """Invalid JSON without NaN, Infinity or long integers isn't decoded again by the stdlib."""
+    with patch.object(json_codec.json, "loads", side_effect=AssertionError) as stdlib_loads:
+        for data in ("ON", b"OFF", "{bad"):
+            with pytest.raises(ValueError):
+                json_loads(data)
+        assert not stdlib_loads.called
+
+
+def test_json_codec_stdlib_fallback():
+    """The stdlib fallback functions handle the same data."""
+    encoded = json_codec._stdlib_dumps_bytes(SAMPLE_MSG)  # pylint: disable=protected-access
+    assert json_codec._stdlib_loads(encoded) == SAMPLE_MSG  # pylint: disable=protected-access
+
+
+def run_benchmark(func, arg, num_loops=500, repeat=3):
+    """Return the best calls per second of func(arg) over repeat runs."""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(num_loops):
+            func(arg)
+        best = max(best, num_loops / (time.perf_counter() - start))
+    return best
+
+
+@pytest.mark.skipif(JSON_LIBRARY != "orjson", reason="orjson is not installed")
+def test_json_codec_benchmark():
+    """With orjson, the codec encodes and decodes faster than the stdlib."""
+    encoded = json.dumps(SAMPLE_MSG).encode("utf-8")
+    assert run_benchmark(json_dumps_bytes, SAMPLE_MSG) > run_benchmark(
+        lambda obj: json.dumps(obj).encode("utf-8"), SAMPLE_MSG
+    )
+    assert run_benchmark(json_loads, encoded) > run_benchmark(json.loads, encoded)
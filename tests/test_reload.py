@@ -1,13 +1,19 @@
 """Test the pyscript apps, modules and import features."""
 
+import ast
 import asyncio
+import os
 import re
+import threading
 from unittest.mock import patch
 
 from mock_open import MockOpen
 import pytest
 
-from custom_components.pyscript.const import DOMAIN, FOLDER
+from custom_components.pyscript import load_scripts, start_global_contexts
+from custom_components.pyscript.const import CONFIG_ENTRY, DOMAIN, FOLDER
+from custom_components.pyscript.function import Function
+from custom_components.pyscript.global_ctx import GlobalContextMgr
 from homeassistant.const import EVENT_STATE_CHANGED
 from homeassistant.setup import async_setup_component
 
@@ -285,3 +291,534 @@ def shutdown(trigger_time=None):
         # make sure files that shouldn't load were not loaded
         #
         assert "BOTCH shouldn't load" not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_reload_reads_changed_files(hass, caplog, tmp_path):
+    """Test reload only reads the source files whose stat data changed."""
+
+    hass.config.config_dir = str(tmp_path)
+    conf_dir = tmp_path / FOLDER
+    (conf_dir / "modules").mkdir(parents=True)
+    (conf_dir / "apps" / "world").mkdir(parents=True)
+    for path, source in [
+        ("hello.py", 'log.info(f"hello version 1")\n'),
+        ("modules/xyz.py", "xyz = 123\n"),
+        ("apps/world/__init__.py", 'log.info(f"world version 1")\n'),
+        ("apps/world.py", 'log.info(f"BOTCH shouldn\'t load {__name__}")\n'),
+    ]:
+        (conf_dir / path).write_text(source)
+
+    conf = {"apps": {"world": {}}}
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={"pyscript": conf}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: conf})
+        assert "hello version 1" in caplog.text
+        assert "world version 1" in caplog.text
+        assert sorted(hass.data[DOMAIN]["script_manifest"]) == [
+            str(conf_dir / "apps/world/__init__.py"),
+            str(conf_dir / "hello.py"),
+            str(conf_dir / "modules/xyz.py"),
+        ]
+
+        hello_path = conf_dir / "hello.py"
+        hello_path.write_text('log.info(f"hello version 2")\n')
+        with patch("custom_components.pyscript.open", side_effect=open) as mock_open:
+            await hass.services.async_call("pyscript", "reload", {}, blocking=True)
+        assert [call.args[0] for call in mock_open.call_args_list] == [str(hello_path)]
+        assert "hello version 2" in caplog.text
+        assert caplog.text.count("world version 1") == 1
+
+        with patch("custom_components.pyscript.open", side_effect=open) as mock_open:
+            await hass.services.async_call("pyscript", "reload", {}, blocking=True)
+        assert mock_open.call_count == 0
+        assert "BOTCH shouldn't load" not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_reload_changed_paths(hass, caplog, tmp_path):
+    """Test a watchdog reload of changed paths only rescans those files."""
+
+    hass.config.config_dir = str(tmp_path)
+    conf_dir = tmp_path / FOLDER
+    conf_dir.mkdir()
+    (conf_dir / "hello.py").write_text('log.info(f"hello version 1")\n')
+    (conf_dir / "other.py").write_text('log.info(f"other version 1")\n')
+
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: {}})
+        config_data = hass.data[DOMAIN][CONFIG_ENTRY].data
+
+        (conf_dir / "hello.py").write_text('log.info(f"hello version 2")\n')
+        (conf_dir / "new.py").write_text('log.info(f"new version 1")\n')
+        (conf_dir / "other.py").unlink()
+        changed_paths = {str(conf_dir / name) for name in ["hello.py", "new.py", "gone.py"]}
+        with patch("custom_components.pyscript.open", side_effect=open) as mock_open:
+            await load_scripts(hass, config_data, changed_paths=changed_paths)
+        assert sorted(call.args[0] for call in mock_open.call_args_list) == [
+            str(conf_dir / "hello.py"),
+            str(conf_dir / "new.py"),
+        ]
+        assert "hello version 2" in caplog.text
+        assert "new version 1" in caplog.text
+        #
+        # other.py wasn't in the changed paths, so it is still loaded
+        #
+        assert GlobalContextMgr.get("file.other") is not None
+
+        await load_scripts(hass, config_data, changed_paths={str(conf_dir / "other.py")})
+        assert GlobalContextMgr.get("file.other") is None
+        assert GlobalContextMgr.get("file.hello") is not None
+        assert caplog.text.count("other version 1") == 1
+
+
+@pytest.mark.asyncio
+async def test_reload_module_importers(hass, caplog, tmp_path):
+    """Test the reverse import index drives which contexts reload when a module changes."""
+
+    hass.config.config_dir = str(tmp_path)
+    conf_dir = tmp_path / FOLDER
+    (conf_dir / "modules").mkdir(parents=True)
+    (conf_dir / "modules" / "mod_a.py").write_text("value = 1\n")
+    (conf_dir / "modules" / "mod_b.py").write_text("from mod_a import value\n")
+    (conf_dir / "hello.py").write_text('from mod_b import value\nlog.info(f"hello value={value}")\n')
+    (conf_dir / "other.py").write_text('log.info(f"other loaded")\n')
+
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: {}})
+        assert "hello value=1" in caplog.text
+
+        report = await hass.services.async_call(
+            DOMAIN, "import_report", {}, blocking=True, return_response=True
+        )
+        assert report == {"importers": {"modules.mod_a": ["modules.mod_b"], "modules.mod_b": ["file.hello"]}}
+        report = await hass.services.async_call(
+            DOMAIN, "import_report", {"global_ctx": "modules.mod_b"}, blocking=True, return_response=True
+        )
+        assert report == {
+            "global_ctx": "modules.mod_b",
+            "imports": ["modules.mod_a"],
+            "importers": ["file.hello"],
+            "dependents": ["file.hello"],
+        }
+        assert GlobalContextMgr.get_importers(["modules.mod_a"]) == ["file.hello", "modules.mod_b"]
+
+        mod_a_path = conf_dir / "modules" / "mod_a.py"
+        mod_a_path.write_text("value = 2\n")
+        await load_scripts(hass, hass.data[DOMAIN][CONFIG_ENTRY].data, changed_paths={str(mod_a_path)})
+        assert "hello value=2" in caplog.text
+        assert caplog.text.count("other loaded") == 1
+        assert GlobalContextMgr.importers == {
+            "modules.mod_a": {"modules.mod_b"},
+            "modules.mod_b": {"file.hello"},
+        }
+
+        (conf_dir / "hello.py").unlink()
+        await load_scripts(
+            hass, hass.data[DOMAIN][CONFIG_ENTRY].data, changed_paths={str(conf_dir / "hello.py")}
+        )
+        assert GlobalContextMgr.importers == {"modules.mod_a": {"modules.mod_b"}}
+
+
+@pytest.mark.asyncio
+async def test_reload_unconfigured_app_package(hass, caplog, tmp_path):
+    """Test a change to an app package without config reloads the apps that import it."""
+
+    hass.config.config_dir = str(tmp_path)
+    conf_dir = tmp_path / FOLDER
+    (conf_dir / "apps" / "main").mkdir(parents=True)
+    (conf_dir / "apps" / "lib").mkdir(parents=True)
+    (conf_dir / "apps" / "main" / "__init__.py").write_text(
+        'import lib\nlog.info(f"main value={lib.value}")\n'
+    )
+    lib_path = conf_dir / "apps" / "lib" / "__init__.py"
+    lib_path.write_text("value = 1\n")
+
+    conf = {"apps": {"main": {}}}
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={DOMAIN: conf}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: conf})
+        assert "main value=1" in caplog.text
+        assert GlobalContextMgr.get_importers(["apps.lib"]) == ["apps.main"]
+
+        await load_scripts(hass, hass.data[DOMAIN][CONFIG_ENTRY].data)
+        assert GlobalContextMgr.get("apps.lib") is not None
+        assert "Unloaded" not in caplog.text
+
+        lib_path.write_text("value = 2\n")
+        await load_scripts(hass, hass.data[DOMAIN][CONFIG_ENTRY].data, changed_paths={str(lib_path)})
+        assert "main value=2" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_reload_hot_swap(hass, caplog, tmp_path):
+    """Test a reload keeps the running triggers of functions whose decorators are unchanged."""
+
+    hass.config.config_dir = str(tmp_path)
+    conf_dir = tmp_path / FOLDER
+    conf_dir.mkdir()
+    hello_path = conf_dir / "hello.py"
+    source = """
+@state_trigger("pyscript.var1 == '1'")
+def func1(value=None):
+    log.info(f"func1 version VERSION value={value}")
+
+@state_trigger("pyscript.TRIG_VAR")
+def func2():
+    pass
+
+@time_trigger("startup")
+def func3():
+    log.info(f"func3 version VERSION")
+"""
+    hello_path.write_text(source.replace("VERSION", "1").replace("TRIG_VAR", "var2"))
+
+    def get_dms():
+        return {dm.name.split(".")[-1]: dm for dm in GlobalContextMgr.get("file.hello").dms}
+
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: {}})
+        hass.bus.async_fire("homeassistant_started")
+        await hass.async_block_till_done()
+        assert "func3 version 1" in caplog.text
+        dms_v1 = get_dms()
+
+        hello_path.write_text(source.replace("VERSION", "2").replace("TRIG_VAR", "var3"))
+        await load_scripts(hass, hass.data[DOMAIN][CONFIG_ENTRY].data, changed_paths={str(hello_path)})
+        start_global_contexts()
+        await hass.async_block_till_done()
+        dms_v2 = get_dms()
+
+        #
+        # func1 keeps its manager, func2 has a new trigger and func3 runs at startup again
+        #
+        assert dms_v2["func1"] is dms_v1["func1"]
+        assert dms_v2["func2"] is not dms_v1["func2"]
+        assert dms_v1["func2"].status.value == "stopped"
+        assert dms_v2["func3"] is not dms_v1["func3"]
+        assert "func3 version 2" in caplog.text
+
+        hass.states.async_set("pyscript.var1", "1")
+        for _ in range(100):
+            if "func1 version" in caplog.text:
+                break
+            await asyncio.sleep(0.01)
+        assert "func1 version 2 value=1" in caplog.text
+        assert "func1 version 1" not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_load_report(hass, caplog, tmp_path):
+    """Test the load report times each phase, file and trigger, and logs its summary."""
+
+    hass.config.config_dir = str(tmp_path)
+    conf_dir = tmp_path / FOLDER
+    (conf_dir / "modules").mkdir(parents=True)
+    (conf_dir / "modules" / "mod_a.py").write_text("value = 1\n")
+    (conf_dir / "hello.py").write_text(
+        """
+from mod_a import value
+
+@state_trigger("pyscript.var1")
+def func1():
+    pass
+"""
+    )
+
+    conf = {"load_report_log": True, "startup_concurrency": 2}
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={DOMAIN: conf}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: conf})
+        hass.bus.async_fire("homeassistant_started")
+        await hass.async_block_till_done()
+        report = await hass.services.async_call(
+            DOMAIN, "load_report", {}, blocking=True, return_response=True
+        )
+        assert report["complete"]
+        assert set(report["phases"]) == {
+            "install_requirements",
+            "read_files",
+            "unload_files",
+            "load_files",
+            "service_params",
+            "start_triggers",
+        }
+        assert {entry["file"]: entry["global_ctx"] for entry in report["files"]} == {
+            str(conf_dir / "hello.py"): "file.hello",
+            str(conf_dir / "modules" / "mod_a.py"): "modules.mod_a",
+        }
+        assert set(report["files"][0]) == {
+            "file",
+            "global_ctx",
+            "total_ms",
+            "read_ms",
+            "parse_ms",
+            "eval_ms",
+        }
+        assert [entry["function"] for entry in report["triggers"]] == ["file.hello.func1"]
+        assert set(report["triggers"][0]) == {"function", "total_ms", "validate_ms", "start_ms"}
+        assert report["startup_ramp"]["concurrency"] == 2
+        assert report["startup_ramp"]["complete"]
+        assert "load report: install_requirements" in caplog.text
+        assert "slowest triggers: file.hello.func1" in caplog.text
+
+        report = await hass.services.async_call(
+            DOMAIN, "load_report", {"top": 1}, blocking=True, return_response=True
+        )
+        assert len(report["files"]) == 1
+
+
+async def wait_for_log(caplog, text, count=1):
+    """Wait until text appears count times in the log."""
+    for _ in range(200):
+        if caplog.text.count(text) >= count:
+            return
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_lazy_imports(hass, caplog, tmp_path):
+    """Test lazily imported modules load on first use, and modules with triggers load eagerly."""
+
+    hass.config.config_dir = str(tmp_path)
+    conf_dir = tmp_path / FOLDER
+    (conf_dir / "modules").mkdir(parents=True)
+    (conf_dir / "modules" / "lazy_mod.py").write_text('log.info("lazy_mod loaded")\nvalue = 5\n')
+    (conf_dir / "modules" / "bad_mod.py").write_text("value = 1 / 0\n")
+    (conf_dir / "modules" / "trig_mod.py").write_text(
+        """
+log.info("trig_mod loaded")
+
+@state_trigger("pyscript.trig_mod_var")
+def trig_mod_func():
+    pass
+"""
+    )
+    (conf_dir / "hello.py").write_text(
+        """
+import bad_mod
+import lazy_mod
+import trig_mod
+
+@state_trigger("pyscript.go")
+def func_go():
+    log.info(f"lazy_mod.value = {lazy_mod.value}")
+    try:
+        bad_mod.value
+    except ImportError as exc:
+        log.info(f"bad_mod: {exc}")
+"""
+    )
+
+    conf = {"lazy_imports": True}
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={DOMAIN: conf}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+        patch("ast.parse", wraps=ast.parse) as ast_parse,
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: conf})
+        hass.bus.async_fire("homeassistant_started")
+        await hass.async_block_till_done()
+        assert "trig_mod loaded" in caplog.text
+        assert "lazy_mod loaded" not in caplog.text
+        assert "ZeroDivisionError" not in caplog.text
+
+        hass.states.async_set("pyscript.go", 1)
+        await wait_for_log(caplog, "bad_mod: ")
+        assert caplog.text.count("lazy_mod loaded") == 1
+        assert "lazy_mod.value = 5" in caplog.text
+        assert "failed to load lazily imported module bad_mod" in caplog.text
+        assert "bad_mod: lazily imported module bad_mod failed to load" in caplog.text
+
+        hass.states.async_set("pyscript.go", 2)
+        await wait_for_log(caplog, "bad_mod: ", count=2)
+        assert caplog.text.count("lazy_mod loaded") == 1
+        assert caplog.text.count("lazy_mod.value = 5") == 2
+        lazy_mod_parses = [
+            call
+            for call in ast_parse.call_args_list
+            if call.kwargs.get("filename", "").endswith("lazy_mod.py")
+        ]
+        assert len(lazy_mod_parses) == 1
+
+
+@pytest.mark.asyncio
+async def test_task_drain(hass, caplog, tmp_path):
+    """Test reloading a context cancels its running tasks when task_drain_timeout is set."""
+
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / FOLDER).mkdir()
+    (tmp_path / FOLDER / "hello.py").write_text(
+        """
+@state_trigger("pyscript.go")
+def func_go():
+    log.info("func_go started")
+    task.sleep(1000)
+    log.info("func_go finished")
+"""
+    )
+
+    conf = {"task_drain_timeout": 0}
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={DOMAIN: conf}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: conf})
+        hass.bus.async_fire("homeassistant_started")
+        await hass.async_block_till_done()
+
+        hass.states.async_set("pyscript.go", 1)
+        await wait_for_log(caplog, "func_go started")
+        report = await hass.services.async_call(
+            DOMAIN, "task_report", {}, blocking=True, return_response=True
+        )
+        assert report["task_drain_timeout"] == 0
+        assert report["contexts"] == {"file.hello": 1}
+        task = next(iter(GlobalContextMgr.get("file.hello").tasks))
+
+        await hass.services.async_call(DOMAIN, "reload", {"global_ctx": "file.hello"}, blocking=True)
+        await hass.async_block_till_done()
+        assert task.cancelled()
+        assert "func_go finished" not in caplog.text
+        report = await hass.services.async_call(
+            DOMAIN, "task_report", {}, blocking=True, return_response=True
+        )
+        assert report["contexts"] == {}
+
+
+@pytest.mark.asyncio
+async def test_action_stats_triggers(hass, caplog, tmp_path):
+    """Test action_stats reports the counters of trigger queues and task limits."""
+
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / FOLDER).mkdir()
+    (tmp_path / FOLDER / "hello.py").write_text(
+        """
+@state_trigger("pyscript.go", queue_policy="coalesce")
+def func_go():
+    log.info("func_go started")
+
+@state_trigger("pyscript.other")
+def func_other():
+    pass
+
+@state_trigger("pyscript.slow")
+@task_limit(max_concurrent=1, queue=1)
+def func_slow():
+    log.info("func_slow started")
+    task.sleep(1000)
+"""
+    )
+
+    conf = {}
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={DOMAIN: conf}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: conf})
+        hass.bus.async_fire("homeassistant_started")
+        await hass.async_block_till_done()
+
+        for value in range(3):
+            hass.states.async_set("pyscript.go", value)
+            hass.states.async_set("pyscript.slow", value)
+        await wait_for_log(caplog, "func_go started")
+        await wait_for_log(caplog, "is full; rejecting new actions")
+        stats = await hass.services.async_call(
+            DOMAIN, "action_stats", {}, blocking=True, return_response=True
+        )
+        assert stats["triggers"] == {
+            "file.hello.func_go": {
+                "state_trigger": {
+                    "queue_policy": "coalesce",
+                    "queue_size": None,
+                    "queued": 0,
+                    "dropped": 0,
+                    "coalesced": 2,
+                }
+            },
+            "file.hello.func_slow": {
+                "task_limit": {
+                    "max_concurrent": 1,
+                    "running": 1,
+                    "waiting": 1,
+                    "queued": 1,
+                    "rejected": 1,
+                }
+            },
+        }
+
+
+@pytest.mark.asyncio
+async def test_parse_files(hass):
+    """Test files are parsed in executor threads and yielded in order."""
+    sources = [(f"x = {i}\n", f"/f{i}.py") for i in range(5)]
+    sources.insert(2, ("def bad(:\n", "/bad.py"))
+    with patch.object(Function, "hass", hass):
+        trees = [tree async for tree in GlobalContextMgr.parse_files(sources, 2)]
+    assert trees[2] is None
+    assert [tree.body[0].value.value for tree in trees if tree is not None] == list(range(5))
+
+
+@pytest.mark.asyncio
+async def test_load_parses_off_loop(hass, caplog, tmp_path):
+    """Test loading many script files parses them outside the event loop, and reports syntax errors."""
+
+    hass.config.config_dir = str(tmp_path)
+    conf_dir = tmp_path / FOLDER
+    conf_dir.mkdir()
+    for i in range(300):
+        (conf_dir / f"file{i:03d}.py").write_text(
+            f"""
+@state_trigger("pyscript.go")
+def func{i}():
+    pass
+"""
+        )
+    (conf_dir / "bad.py").write_text("def bad(:\n")
+
+    parse_threads = {}
+
+    def parse(source, filename="<unknown>", *args, **kwargs):
+        parse_threads.setdefault(os.path.basename(filename), set()).add(threading.current_thread())
+        return ast_parse(source, filename, *args, **kwargs)
+
+    ast_parse = ast.parse
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={DOMAIN: {}}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+        patch("ast.parse", side_effect=parse),
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: {}})
+        await hass.async_block_till_done()
+
+    assert GlobalContextMgr.get("file.file299") is not None
+    file_threads = [threads for name, threads in parse_threads.items() if name.startswith("file")]
+    assert len(file_threads) == 300
+    assert all(threading.main_thread() not in threads for threads in file_threads)
+    assert "SyntaxError" in caplog.text
@@ -5,11 +5,14 @@ from unittest.mock import patch
 
 import pytest
 
+from custom_components.pyscript.const import DOMAIN, FOLDER
 from custom_components.pyscript.function import Function
 from custom_components.pyscript.state import State, StateVal
-from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
-from homeassistant.core import Context, ServiceRegistry, StateMachine
+from homeassistant.const import EVENT_SERVICE_REGISTERED, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import Context, CoreState, ServiceRegistry, StateMachine
+from homeassistant.helpers.service import async_get_all_descriptions, async_set_service_schema
 from homeassistant.helpers.state import State as HassState
+from homeassistant.setup import async_setup_component
 
 
 @pytest.mark.asyncio
@@ -113,3 +116,82 @@ def test_state_val_conversions():
 
     standard_state = StateVal(HassState("test.standard", "ready"))
     assert standard_state.has_value() is True
+
+
+@pytest.mark.asyncio
+async def test_service_args_incremental(hass):
+    """Test service parameters are rebuilt per domain when its services change."""
+    State.init(hass)
+    await State.get_service_params()
+    unsub = hass.bus.async_listen(EVENT_SERVICE_REGISTERED, State.service_changed_event)
+
+    hass.services.async_register("test", "svc", lambda call: None)
+    async_set_service_schema(hass, "test", "svc", {"fields": {"entity_id": {}, "brightness": {}}})
+    hass.services.async_register("test", "no_entity", lambda call: None)
+    async_set_service_schema(hass, "test", "no_entity", {"fields": {"level": {}}})
+    await hass.async_block_till_done()
+    assert "test" in State.service_domains_changed
+
+    with patch("custom_components.pyscript.state.async_get_all_descriptions") as get_all:
+        assert State.service_args("test") == {"svc": {"brightness"}}
+        assert not get_all.called
+
+    hass.services.async_remove("test", "svc")
+    State.service_params_changed("test")
+    assert State.service_args("test") == {}
+
+    async def describe(hass):
+        async_set_service_schema(hass, "other", "svc", {"fields": {"entity_id": {}, "level": {}}})
+
+    hass.services.async_register("other", "svc", lambda call: None)
+    await hass.async_block_till_done()
+    with patch(
+        "custom_components.pyscript.state.async_get_all_descriptions", side_effect=describe
+    ) as get_all:
+        assert State.service_args("other") == {}
+        await hass.async_block_till_done()
+        assert get_all.call_count == 1
+        assert State.service_args("other") == {"svc": {"level"}}
+    unsub()
+
+
+@pytest.mark.asyncio
+async def test_service_params_startup(hass, tmp_path):
+    """Test starting many services fetches the service descriptions once."""
+    hass.set_state(CoreState.not_running)
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / FOLDER).mkdir()
+    (tmp_path / FOLDER / "hello.py").write_text(
+        "".join(f"@service\ndef func{i}(entity_id=None):\n    pass\n\n" for i in range(50))
+    )
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+        patch(
+            "custom_components.pyscript.state.async_get_all_descriptions", wraps=async_get_all_descriptions
+        ) as get_all,
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: {}})
+        hass.bus.async_fire("homeassistant_started")
+        await hass.async_block_till_done()
+        assert hass.services.has_service(DOMAIN, "func49")
+        assert get_all.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_service_params_setup_after_start(hass, tmp_path):
+    """Test setting up pyscript after Home Assistant has started builds the service parameters."""
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / FOLDER).mkdir()
+    hass.services.async_register("test", "svc", lambda call: None)
+    async_set_service_schema(hass, "test", "svc", {"fields": {"entity_id": {}, "brightness": {}}})
+    assert hass.is_running
+    with (
+        patch("homeassistant.config.load_yaml_config_file", return_value={}),
+        patch("custom_components.pyscript.watchdog_start", return_value=None),
+        patch("custom_components.pyscript.install_requirements", return_value=None),
+    ):
+        assert await async_setup_component(hass, "pyscript", {DOMAIN: {}})
+        await hass.async_block_till_done()
+        assert State.service_args("test") == {"svc": {"brightness"}}
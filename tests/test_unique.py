@@ -17,7 +17,7 @@ from homeassistant.setup import async_setup_component
 async def setup_script(hass, notify_q, now, source):
     """Initialize and load the given pyscript."""
     scripts = [
-        "/some/config/dir/pyscripts/hello.py",
+        "/hello.py",
     ]
 
     Function.hass = None
@@ -304,3 +304,97 @@ def func6():
     seq_num += 1
     await hass.services.async_call("pyscript", "service_cleanup", {})
     assert literal_eval(await wait_until_done(notify_q)) == [seq_num]
+
+
+@pytest.mark.asyncio
+async def test_task_unique_queue_latest(hass, caplog):
+    """Test @task_unique queue_latest keeps only the latest pending action."""
+    notify_q = asyncio.Queue(0)
+    await setup_script(
+        hass,
+        notify_q,
+        dt(2020, 7, 1, 11, 59, 59, 999999),
+        """
+
+calls = []
+
+@event_trigger("queue_evt")
+@task_unique("queue_latest_func", queue_latest=True)
+def queue_func(arg=None):
+    calls.append(arg)
+    pyscript.done = ["start", arg]
+    task.wait_until(event_trigger="queue_release")
+    pyscript.done = ["end", calls]
+""",
+    )
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+
+    hass.bus.async_fire("queue_evt", {"arg": 1})
+    assert literal_eval(await wait_until_done(notify_q)) == ["start", 1]
+    for arg in range(2, 6):
+        hass.bus.async_fire("queue_evt", {"arg": arg})
+    await hass.async_block_till_done()
+
+    hass.bus.async_fire("queue_release")
+    assert literal_eval(await wait_until_done(notify_q)) == ["end", [1]]
+    assert literal_eval(await wait_until_done(notify_q)) == ["start", 5]
+    await hass.async_block_till_done()
+
+    hass.bus.async_fire("queue_release")
+    assert literal_eval(await wait_until_done(notify_q)) == ["end", [1, 5]]
+    assert notify_q.empty()
+
+
+@pytest.mark.asyncio
+async def test_task_limit(hass, caplog):
+    """Test @task_limit admission control."""
+    notify_q = asyncio.Queue(0)
+    await setup_script(
+        hass,
+        notify_q,
+        dt(2020, 7, 1, 11, 59, 59, 999999),
+        """
+
+started = []
+
+@event_trigger("limit_evt")
+@task_limit(max_concurrent=2, queue=1)
+def limit_func(arg=None):
+    started.append(arg)
+    pyscript.done = ["start", arg]
+    task.wait_until(event_trigger="limit_release")
+    pyscript.done = ["end", arg]
+
+@event_trigger("limit_wait_evt")
+@task_limit(max_concurrent=1, overflow="wait")
+def limit_wait_func(arg=None):
+    pyscript.done = ["wait start", arg]
+    task.wait_until(event_trigger="limit_wait_release")
+""",
+    )
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+
+    for arg in range(1, 6):
+        hass.bus.async_fire("limit_evt", {"arg": arg})
+    results = {tuple(literal_eval(await wait_until_done(notify_q))) for _ in range(2)}
+    assert results == {("start", 1), ("start", 2)}
+    await hass.async_block_till_done()
+    assert "@task_limit(max_concurrent=2) is full" in caplog.text
+
+    # releasing the two running actions lets the single queued one run; 4 and 5 were rejected
+    hass.bus.async_fire("limit_release")
+    results = {tuple(literal_eval(await wait_until_done(notify_q))) for _ in range(3)}
+    assert results == {("end", 1), ("end", 2), ("start", 3)}
+    await hass.async_block_till_done()
+    hass.bus.async_fire("limit_release")
+    assert literal_eval(await wait_until_done(notify_q)) == ["end", 3]
+
+    for arg in range(1, 4):
+        hass.bus.async_fire("limit_wait_evt", {"arg": arg})
+    for arg in range(1, 4):
+        assert literal_eval(await wait_until_done(notify_q)) == ["wait start", arg]
+        await hass.async_block_till_done()
+        hass.bus.async_fire("limit_wait_release")
+    assert notify_q.empty()
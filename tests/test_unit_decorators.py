@@ -0,0 +1,718 @@
+"""Unit tests for trigger decorator implementations."""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+from collections.abc import Awaitable, Callable, Generator
+import itertools
+import json
+import logging
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from paho.mqtt.client import topic_matches_sub
+import pytest
+
+from custom_components.pyscript.const import CONFIG_ENTRY, DOMAIN
+from custom_components.pyscript.decorator import ActionScheduler, FunctionDecoratorManager
+from custom_components.pyscript.decorator_abc import DecoratorManager, DispatchData
+from custom_components.pyscript.decorators.event import EventDispatcher, EventTriggerDecorator
+import custom_components.pyscript.decorators.mqtt as mqtt_decorator_module
+from custom_components.pyscript.decorators.mqtt import (
+    MqttPayload,
+    MqttSubscriptionManager,
+    MQTTTriggerDecorator,
+)
+from custom_components.pyscript.decorators.state import StateTriggerDecorator
+from custom_components.pyscript.decorators.task import TaskLimitDecorator, TaskUniqueDecorator
+from custom_components.pyscript.function import Function
+from custom_components.pyscript.global_ctx import GlobalContext
+from custom_components.pyscript.json_codec import json_loads
+import custom_components.pyscript.mqtt as mqtt_module
+from custom_components.pyscript.mqtt import Mqtt
+from custom_components.pyscript.startup_ramp import StartupRamp
+from custom_components.pyscript.state import NotifyQueue, State
+from custom_components.pyscript.trigger import TrigInfo
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+
+class DummyAstCtx:
+    """Minimal AstEval stub for decorator unit tests."""
+
+    def __init__(self, name: str = "file.hello.func", global_ctx: GlobalContext | None = None) -> None:
+        """Initialize a dummy AST context."""
+        self.name = name
+        self.global_ctx = global_ctx or object()
+        self._logger = logging.getLogger(__name__)
+
+    def get_logger(self):
+        """Return test logger."""
+        return self._logger
+
+    def get_global_ctx_name(self) -> str:
+        """Return global context name."""
+        return "file.hello"
+
+    def log_exception(self, exc: Exception) -> None:
+        """Ignore logged exceptions."""
+
+
+class DummyManager(DecoratorManager):
+    """Manager that records dispatched payloads."""
+
+    def __init__(self, hass: HomeAssistant, name: str = "file.hello.func") -> None:
+        """Initialize the dummy manager."""
+        super().__init__(DummyAstCtx(name), name)
+        self.hass = hass
+        self.dispatched: list[DispatchData] = []
+
+    async def dispatch(self, data: DispatchData) -> None:
+        """Store dispatched payloads."""
+        self.dispatched.append(data)
+
+
+class DummyFuncVar:
+    """Minimal EvalFuncVar stub wrapping a parsed function definition."""
+
+    def __init__(self, source: str) -> None:
+        """Parse the function source."""
+        func_def = ast.parse(source).body[0]
+        self.func = SimpleNamespace(
+            func_def=func_def,
+            name=func_def.name,
+            global_ctx_name="file.hello",
+            logger=logging.getLogger(__name__),
+        )
+
+    def get_name(self) -> str:
+        """Return the function name."""
+        return self.func.name
+
+
+class RecordingFunctionManager(FunctionDecoratorManager):
+    """Function manager that records dispatched payloads instead of calling the function."""
+
+    def __init__(self, hass: HomeAssistant, source: str) -> None:
+        """Initialize the manager for the given function source."""
+        self.func_var = DummyFuncVar(source)
+        super().__init__(DummyAstCtx(global_ctx=GlobalContext("file.hello")), self.func_var)
+        self.hass = hass
+        self.dispatched: list[DispatchData] = []
+
+    async def dispatch(self, data: DispatchData) -> None:
+        """Store dispatched payloads."""
+        self.dispatched.append(data)
+
+
+async def make_started_event_trigger(hass: HomeAssistant, event_type: str) -> DummyManager:
+    """Create and start a manager with a single @event_trigger."""
+    manager = DummyManager(hass)
+    manager.add(EventTriggerDecorator([event_type], {}))
+    await manager.validate()
+    await manager.start()
+    return manager
+
+
+async def test_event_trigger_shares_bus_listener(hass: HomeAssistant) -> None:
+    """Event triggers on the same event type share one bus listener."""
+    managers = [await make_started_event_trigger(hass, "shared_event") for _ in range(5)]
+    assert hass.bus.async_listeners()["shared_event"] == 1
+    assert len(EventDispatcher.dispatchers["shared_event"].subscribers) == 5
+
+    hass.bus.async_fire("shared_event", {"arg1": 1})
+    await hass.async_block_till_done()
+
+    payloads = [manager.dispatched[0].func_args for manager in managers]
+    for payload in payloads:
+        assert payload["trigger_type"] == "event"
+        assert payload["event_type"] == "shared_event"
+        assert payload["arg1"] == 1
+    # each subscriber gets its own copy so changes by one are not seen by the others
+    assert len({id(payload) for payload in payloads}) == 5
+
+    for manager in managers[:4]:
+        await manager.stop()
+    assert hass.bus.async_listeners()["shared_event"] == 1
+
+    await managers[4].stop()
+    assert "shared_event" not in hass.bus.async_listeners()
+    assert "shared_event" not in EventDispatcher.dispatchers
+
+
+async def test_event_trigger_subscriber_error_is_isolated(hass: HomeAssistant) -> None:
+    """A failing subscriber does not stop delivery to the others."""
+    failing = await make_started_event_trigger(hass, "isolated_event")
+    healthy = await make_started_event_trigger(hass, "isolated_event")
+
+    async def fail_dispatch(data: DispatchData) -> None:
+        raise RuntimeError("dispatch failed")
+
+    failing.dispatch = fail_dispatch
+
+    hass.bus.async_fire("isolated_event", {})
+    await hass.async_block_till_done()
+
+    assert len(healthy.dispatched) == 1
+
+    await failing.stop()
+    await healthy.stop()
+    assert "isolated_event" not in hass.bus.async_listeners()
+
+
+class StandInBroker:
+    """Stand-in for the HA mqtt client that delivers published messages to matching subscriptions."""
+
+    def __init__(self) -> None:
+        """Initialize the broker with no subscriptions or retained messages."""
+        self.subscriptions: list[tuple[str, object]] = []
+        self.retained: dict[str, str] = {}
+
+    async def async_subscribe(self, hass, topic, msg_callback, encoding="utf-8", qos=0):
+        """Record a subscription, replay the retained messages it matches, and return its remove callback."""
+        entry = (topic, msg_callback)
+        self.subscriptions.append(entry)
+        for retained_topic, payload in self.retained.items():
+            if topic_matches_sub(topic, retained_topic):
+                await msg_callback(
+                    SimpleNamespace(topic=retained_topic, payload=payload, qos=0, retain=True)
+                )
+        return lambda: self.subscriptions.remove(entry)
+
+    async def publish(self, topic: str, payload: str, retain: bool = False) -> None:
+        """Deliver a message to every subscription whose filter matches the topic."""
+        if retain:
+            self.retained[topic] = payload
+        msg = SimpleNamespace(topic=topic, payload=payload, qos=0, retain=False)
+        for topic_filter, msg_callback in list(self.subscriptions):
+            if topic_matches_sub(topic_filter, topic):
+                await msg_callback(msg)
+
+
+@pytest.fixture
+def broker():
+    """Patch mqtt.async_subscribe with a stand-in broker."""
+    stand_in = StandInBroker()
+    with patch("homeassistant.components.mqtt.async_subscribe", stand_in.async_subscribe):
+        yield stand_in
+
+
+async def make_started_mqtt_trigger(hass: HomeAssistant, topic: str) -> DummyManager:
+    """Create and start a manager with a single @mqtt_trigger."""
+    manager = DummyManager(hass, f"file.hello.{topic}")
+    manager.add(MQTTTriggerDecorator([topic], {}))
+    await manager.validate()
+    await manager.start()
+    return manager
+
+
+async def test_mqtt_trigger_shares_broker_subscriptions(hass: HomeAssistant, broker: StandInBroker) -> None:
+    """Mqtt triggers share one broker subscription per filter and see each message once."""
+    filters = ["home/#", "home/+/temp", "home/kitchen/temp", "home/kitchen/temp", "$SYS/#"]
+    managers = [await make_started_mqtt_trigger(hass, topic_filter) for topic_filter in filters]
+    #
+    # the second home/kitchen/temp trigger also gets a subscription for its retained messages
+    #
+    assert sorted(topic for topic, _ in broker.subscriptions) == [
+        "$SYS/#",
+        "home/#",
+        "home/+/temp",
+        "home/kitchen/temp",
+        "home/kitchen/temp",
+    ]
+    assert len(MqttSubscriptionManager.filters) == 4
+
+    await broker.publish("home/kitchen/temp", '{"value": 21}')
+    assert [len(manager.dispatched) for manager in managers] == [1, 1, 1, 1, 0]
+    func_args = managers[2].dispatched[0].func_args
+    assert func_args["topic"] == "home/kitchen/temp"
+    assert func_args["payload_obj"] == {"value": 21}
+    assert func_args is not managers[3].dispatched[0].func_args
+
+    # each filter owns its subscription, so stopping the broad trigger drops its subscription
+    await managers[0].stop()
+    assert "home/#" not in [topic for topic, _ in broker.subscriptions]
+    await broker.publish("home/office/temp", "22")
+    assert [len(manager.dispatched) for manager in managers] == [1, 2, 1, 1, 0]
+    await broker.publish("home/office", "22")
+    assert [len(manager.dispatched) for manager in managers] == [1, 2, 1, 1, 0]
+
+    for manager in managers[1:]:
+        await manager.stop()
+    assert broker.subscriptions == []
+    assert MqttSubscriptionManager.filters == {}
+
+
+async def test_mqtt_trigger_retained_messages(hass: HomeAssistant, broker: StandInBroker) -> None:
+    """Every mqtt trigger gets the retained messages when it starts, once."""
+    await broker.publish("a/b", "on", retain=True)
+    first = await make_started_mqtt_trigger(hass, "a/#")
+    joined = await make_started_mqtt_trigger(hass, "a/#")
+    narrow = await make_started_mqtt_trigger(hass, "a/+")
+    managers = [first, joined, narrow]
+    assert [len(manager.dispatched) for manager in managers] == [1, 1, 1]
+    assert all(manager.dispatched[0].func_args["retain"] for manager in managers)
+
+    await broker.publish("a/c", "off")
+    assert [len(manager.dispatched) for manager in managers] == [2, 2, 2]
+
+    # a resubscribe replays the retained messages once to each trigger
+    for _, msg_callback in list(broker.subscriptions):
+        await msg_callback(SimpleNamespace(topic="a/b", payload="on", qos=0, retain=True))
+    assert [len(manager.dispatched) for manager in managers] == [3, 3, 3]
+
+    for manager in managers:
+        await manager.stop()
+    assert broker.subscriptions == []
+
+
+async def test_mqtt_trigger_narrow_before_broad(hass: HomeAssistant, broker: StandInBroker) -> None:
+    """A broad filter added after a narrow one does not cause duplicate delivery."""
+    narrow = await make_started_mqtt_trigger(hass, "a/b")
+    broad = await make_started_mqtt_trigger(hass, "a/#")
+    assert sorted(topic for topic, _ in broker.subscriptions) == ["a/#", "a/b"]
+
+    await broker.publish("a/b", "on")
+    await broker.publish("a/c", "on")
+    assert len(narrow.dispatched) == 1
+    assert len(broad.dispatched) == 2
+
+    await broad.stop()
+    await narrow.stop()
+    assert broker.subscriptions == []
+
+
+async def test_mqtt_subscribe_failure_fails_joined_triggers(hass: HomeAssistant) -> None:
+    """Triggers that join a broker subscription while it is made all fail if it fails."""
+    attempt = asyncio.Event()
+    failed = asyncio.Event()
+
+    async def failing_subscribe(hass, topic, msg_callback, encoding="utf-8", qos=0):
+        attempt.set()
+        await failed.wait()
+        raise HomeAssistantError("mqtt not connected")
+
+    decorators = [MQTTTriggerDecorator([topic_filter], {}) for topic_filter in ("a/#", "a/b", "a/#")]
+    with patch("homeassistant.components.mqtt.async_subscribe", failing_subscribe):
+        first = asyncio.create_task(MqttSubscriptionManager.subscribe(hass, "a/#", "utf-8", decorators[0]))
+        await attempt.wait()
+        joined = [
+            asyncio.create_task(MqttSubscriptionManager.subscribe(hass, dec.raw_args[0], "utf-8", dec))
+            for dec in decorators[1:]
+        ]
+        await asyncio.sleep(0)
+        assert not any(task.done() for task in joined)
+        failed.set()
+        results = await asyncio.gather(first, *joined, return_exceptions=True)
+    assert all(isinstance(result, HomeAssistantError) for result in results)
+    assert MqttSubscriptionManager.filters == {}
+
+
+@pytest.fixture
+def function_hass(hass: HomeAssistant) -> Generator[HomeAssistant]:
+    """Set up the Function.hass prerequisites needed to evaluate trigger expressions."""
+    hass.data[DOMAIN] = {CONFIG_ENTRY: SimpleNamespace(data={})}
+    with patch.object(Function, "hass", hass):
+        yield hass
+
+
+async def make_started_function_mqtt_trigger(
+    hass: HomeAssistant, source: str, args: list[str], kwargs: dict | None = None
+) -> RecordingFunctionManager:
+    """Create and start a function manager with a single @mqtt_trigger."""
+    manager = RecordingFunctionManager(hass, source)
+    manager.add(MQTTTriggerDecorator(args, kwargs or {}))
+    await manager.validate()
+    await manager.start()
+    return manager
+
+
+def test_mqtt_payload_decodes_once() -> None:
+    """MqttPayload decodes on first use and caches valid and invalid results."""
+    with patch.object(mqtt_decorator_module, "json_loads", wraps=json_loads) as loads:
+        payload = MqttPayload('{"a": 1}')
+        for _ in range(3):
+            func_args = {}
+            payload.add_payload_obj(func_args)
+            assert func_args == {"payload_obj": {"a": 1}}
+        invalid = MqttPayload("not json")
+        for _ in range(3):
+            func_args = {}
+            invalid.add_payload_obj(func_args)
+            assert func_args == {}
+    assert loads.call_count == 2
+
+
+async def test_mqtt_trigger_lazy_payload_obj(function_hass: HomeAssistant, broker: StandInBroker) -> None:
+    """Only triggers that use payload_obj cause the payload to be decoded, once per message."""
+    raw_func = await make_started_function_mqtt_trigger(
+        function_hass, "def f(payload): pass", ["t", "payload == '1'"]
+    )
+    raw_kwargs_func = await make_started_function_mqtt_trigger(
+        function_hass, "def f(**kwargs): pass", ["t"], {"decode": "raw"}
+    )
+    expr_user = await make_started_function_mqtt_trigger(
+        function_hass, "def f(): pass", ["t", "payload_obj == 1"]
+    )
+    arg_user = await make_started_function_mqtt_trigger(
+        function_hass, "def f(payload_obj=None): pass", ["t"]
+    )
+    kwargs_user = await make_started_function_mqtt_trigger(function_hass, "def f(**kwargs): pass", ["t"])
+
+    with patch.object(mqtt_decorator_module, "json_loads", wraps=json_loads) as loads:
+        await broker.publish("t", "1")
+    assert loads.call_count == 1
+
+    assert "payload_obj" not in raw_func.dispatched[0].func_args
+    assert "payload_obj" not in raw_kwargs_func.dispatched[0].func_args
+    for manager in (expr_user, arg_user, kwargs_user):
+        assert manager.dispatched[0].func_args["payload_obj"] == 1
+
+    for manager in (raw_func, raw_kwargs_func, expr_user, arg_user, kwargs_user):
+        await manager.stop()
+
+    with patch.object(mqtt_decorator_module, "json_loads", wraps=json_loads) as loads:
+        manager = await make_started_function_mqtt_trigger(function_hass, "def f(payload): pass", ["t"])
+        await broker.publish("t", "1")
+    assert loads.call_count == 0
+    await manager.stop()
+
+
+async def test_mqtt_trigger_decodes_once_per_message(
+    function_hass: HomeAssistant, broker: StandInBroker
+) -> None:
+    """Mqtt triggers sharing a filter decode each payload once, and only if a function uses payload_obj."""
+    payload = json.dumps({"temperature": 21.5, "humidity": 40, "readings": list(range(50))})
+    num_msgs = 50
+    for source, decodes in (("def f(payload): pass", 0), ("def f(payload_obj=None): pass", num_msgs)):
+        managers = [
+            await make_started_function_mqtt_trigger(function_hass, source, ["bench/+"]) for _ in range(5)
+        ]
+        with patch.object(mqtt_decorator_module, "json_loads", wraps=json_loads) as loads:
+            for _ in range(num_msgs):
+                await broker.publish("bench/sensor", payload)
+        assert loads.call_count == decodes
+        assert all(len(manager.dispatched) == num_msgs for manager in managers)
+        for manager in managers:
+            await manager.stop()
+
+
+async def test_mqtt_notify_decodes_only_when_needed(hass: HomeAssistant, broker: StandInBroker) -> None:
+    """The mqtt notifications of task.wait_until and TrigInfo decode payload_obj only if a listener needs it."""
+    Mqtt.init(hass)
+    raw_q = asyncio.Queue()
+    json_q = asyncio.Queue()
+    with patch.object(mqtt_module, "json_loads", wraps=json_loads) as loads:
+        await Mqtt.notify_add("t", raw_q, needs_payload_obj=False)
+        await broker.publish("t", '{"a": 1}')
+        assert loads.call_count == 0
+        assert "payload_obj" not in raw_q.get_nowait()[1]
+
+        await Mqtt.notify_add("t", json_q)
+        await broker.publish("t", '{"a": 1}')
+        assert loads.call_count == 1
+        assert json_q.get_nowait()[1]["payload_obj"] == {"a": 1}
+        assert raw_q.get_nowait()[1]["payload_obj"] == {"a": 1}
+
+    Mqtt.notify_del("t", raw_q)
+    Mqtt.notify_del("t", json_q)
+    assert broker.subscriptions == []
+
+
+def make_state_notify(var_name: str, value: str, old_value: str) -> list:
+    """Build a notification in the format queued by State.update."""
+    new_vars = {var_name: value, f"{var_name}.old": old_value}
+    func_args = {"trigger_type": "state", "var_name": var_name, "value": value, "old_value": old_value}
+    return ["state", [new_vars, func_args]]
+
+
+async def test_notify_queue_drop_oldest() -> None:
+    """The drop_oldest policy keeps the newest notifications."""
+    queue = NotifyQueue(2, "drop_oldest")
+    for idx in range(5):
+        await queue.put(make_state_notify("sensor.a", str(idx + 1), str(idx)))
+    assert queue.qsize() == 2
+    assert queue.dropped == 3
+    assert [queue.get_nowait()[1][1]["value"] for _ in range(2)] == ["4", "5"]
+
+
+async def test_notify_queue_coalesce() -> None:
+    """The coalesce policy keeps the latest value per entity and the earliest old value."""
+    queue = NotifyQueue(0, "coalesce")
+    await queue.put(make_state_notify("sensor.a", "1", "0"))
+    await queue.put(make_state_notify("sensor.b", "x", "w"))
+    await queue.put(make_state_notify("sensor.a", "2", "1"))
+    await queue.put(make_state_notify("sensor.a", "3", "2"))
+    assert queue.qsize() == 2
+    assert queue.coalesced == 2
+
+    new_vars, func_args = queue.get_nowait()[1]
+    assert func_args["value"] == "3"
+    assert func_args["old_value"] == "0"
+    assert new_vars == {"sensor.a": "3", "sensor.a.old": "0"}
+    assert queue.get_nowait()[1][1]["value"] == "x"
+
+    # once dequeued, a new change is queued rather than merged
+    await queue.put(make_state_notify("sensor.a", "4", "3"))
+    assert queue.coalesced == 2
+    assert queue.get_nowait()[1][1]["old_value"] == "3"
+
+
+async def test_notify_queue_coalesce_old_attributes() -> None:
+    """Coalescing also restores the old attribute values from before the first merged change."""
+    queue = NotifyQueue(0, "coalesce")
+    values = [SimpleNamespace(brightness=level) for level in (0, 10, 20)]
+    for old_value, value in itertools.pairwise(values):
+        new_vars = {
+            "light.x": value,
+            "light.x.old": old_value,
+            "light.x.brightness": value.brightness,
+            "light.x.old.brightness": old_value.brightness,
+        }
+        func_args = {"trigger_type": "state", "var_name": "light.x", "value": value, "old_value": old_value}
+        await queue.put(["state", [new_vars, func_args]])
+
+    new_vars, func_args = queue.get_nowait()[1]
+    assert func_args["old_value"] is values[0]
+    assert new_vars["light.x.old"] is values[0]
+    assert new_vars["light.x.old.brightness"] == 0
+    assert new_vars["light.x.brightness"] == 20
+    assert queue.get_stats() == {
+        "queue_policy": "coalesce",
+        "queue_size": None,
+        "queued": 0,
+        "dropped": 0,
+        "coalesced": 1,
+    }
+
+
+async def test_notify_queue_coalesce_bounded() -> None:
+    """The coalesce policy drops the oldest entity once the size limit is reached."""
+    queue = NotifyQueue(2, "coalesce")
+    for var_name in ("sensor.a", "sensor.b", "sensor.c"):
+        await queue.put(make_state_notify(var_name, "1", "0"))
+    await queue.put(make_state_notify("sensor.a", "2", "1"))
+    assert queue.dropped == 2
+    assert queue.coalesced == 0
+    assert [queue.get_nowait()[1][1]["var_name"] for _ in range(2)] == ["sensor.c", "sensor.a"]
+
+
+async def test_notify_queue_size_drops_oldest() -> None:
+    """A size limit without a policy drops the oldest notifications rather than waiting."""
+    queue = NotifyQueue(1)
+    queue.put_nowait(make_state_notify("sensor.a", "1", "0"))
+    await asyncio.wait_for(queue.put(make_state_notify("sensor.a", "2", "1")), 1)
+    assert queue.get_nowait()[1][1]["value"] == "2"
+    assert queue.get_stats() == {
+        "queue_policy": "drop_oldest",
+        "queue_size": 1,
+        "queued": 0,
+        "dropped": 1,
+        "coalesced": 0,
+    }
+
+
+async def test_state_update_bounds_legacy_trigger_queue() -> None:
+    """A legacy trigger's queue is bounded, and a full one doesn't hold up the other triggers."""
+    trig_info = TrigInfo(
+        "file.func",
+        {"state_trigger": {"args": ["sensor.a"], "kwargs": {"queue_size": 2, "queue_policy": "coalesce"}}},
+    )
+    other_q = asyncio.Queue()
+    await State.notify_add({"sensor.a"}, trig_info.notify_q)
+    await State.notify_add({"sensor.a"}, other_q)
+    try:
+        trig_info.notify_q.put_nowait(["event", {"trigger_type": "event"}])
+        for idx in range(5):
+            new_vars = {"sensor.a": str(idx + 1), "sensor.a.old": str(idx)}
+            func_args = {"trigger_type": "state", "var_name": "sensor.a", "value": str(idx + 1)}
+            await asyncio.wait_for(State.update(new_vars, func_args), 1)
+    finally:
+        State.notify_del({"sensor.a"}, trig_info.notify_q)
+        State.notify_del({"sensor.a"}, other_q)
+
+    assert other_q.qsize() == 5
+    assert trig_info.notify_q.coalesced == 4
+    assert [trig_info.notify_q.get_nowait()[0] for _ in range(2)] == ["event", "state"]
+
+
+async def test_state_trigger_drop_oldest_requires_queue_size(hass: HomeAssistant) -> None:
+    """The drop_oldest policy without a queue size is rejected."""
+    manager = DummyManager(hass)
+    manager.add(StateTriggerDecorator(["sensor.a"], {"queue_policy": "drop_oldest"}))
+    with pytest.raises(TypeError, match="queue_policy 'drop_oldest' requires queue_size"):
+        await manager.validate()
+
+    manager = DummyManager(hass)
+    manager.add(StateTriggerDecorator(["sensor.a"], {"queue_policy": "block"}))
+    with pytest.raises(TypeError, match="keyword 'queue_policy'"):
+        await manager.validate()
+
+
+async def test_task_unique_kill_me_excludes_queue_latest(hass: HomeAssistant) -> None:
+    """The kill_me and queue_latest options can't be combined."""
+    manager = DummyManager(hass)
+    manager.add(TaskUniqueDecorator(["name"], {"kill_me": True, "queue_latest": True}))
+    with pytest.raises(TypeError, match="kill_me and queue_latest can't both be set"):
+        await manager.validate()
+
+
+async def test_task_limit_queue_excludes_overflow(hass: HomeAssistant) -> None:
+    """The queue and overflow options of @task_limit can't be combined."""
+    manager = DummyManager(hass)
+    manager.add(TaskLimitDecorator([], {"max_concurrent": 1, "queue": 2, "overflow": "wait"}))
+    with pytest.raises(TypeError, match="queue and overflow can't both be set"):
+        await manager.validate()
+
+
+async def test_action_scheduler_priority() -> None:
+    """Waiting actions are admitted highest priority first, in arrival order within a priority."""
+    ActionScheduler.init(1)
+    try:
+        admitted = []
+
+        async def action(name: str, priority: int) -> None:
+            await ActionScheduler.acquire(priority)
+            admitted.append(name)
+
+        await ActionScheduler.acquire(0)
+        tasks = [
+            asyncio.create_task(action(name, priority))
+            for name, priority in [("low", 0), ("high1", 5), ("mid", 1), ("high2", 5)]
+        ]
+        cancelled = asyncio.create_task(action("cancelled", 9))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert admitted == []
+        assert ActionScheduler.get_stats()["waiting"] == 4
+
+        for _ in range(4):
+            ActionScheduler.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        assert admitted == ["high1", "high2", "mid", "low"]
+
+        stats = ActionScheduler.get_stats()
+        assert stats["limit"] == 1
+        assert stats["running"] == 1
+        assert stats["waiting"] == 0
+        assert stats["priorities"]["5"]["admitted"] == 2
+        assert stats["priorities"]["5"]["waited"] == 2
+        assert stats["priorities"]["0"]["admitted"] == 2
+        assert stats["priorities"]["0"]["max_wait"] >= stats["priorities"]["5"]["max_wait"]
+
+        ActionScheduler.release()
+        ActionScheduler.set_limit(None)
+        assert ActionScheduler.running == 0
+    finally:
+        ActionScheduler.init(None)
+
+
+async def test_startup_ramp_priority_and_cap() -> None:
+    """Initial checks are admitted highest priority first, and their actions hold a slot until done."""
+    StartupRamp.init(2, None)
+    try:
+        StartupRamp.begin()
+        started = []
+        action_done = asyncio.Event()
+
+        async def action() -> None:
+            await action_done.wait()
+
+        def check_factory(name: str) -> Callable[[], Awaitable[asyncio.Task]]:
+            async def check() -> asyncio.Task:
+                started.append(name)
+                return asyncio.create_task(action())
+
+            return check
+
+        checks = [
+            asyncio.create_task(StartupRamp.run(priority, check_factory(name)))
+            for name, priority in [("low", 0), ("high", 5), ("mid", 1), ("lowest", -1)]
+        ]
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert started == ["high", "mid"]
+        report = StartupRamp.get_report()
+        assert report["running"] == 2
+        assert report["waiting"] == 2
+        assert not report["complete"]
+
+        action_done.set()
+        await asyncio.gather(*checks)
+        while not StartupRamp.get_report()["complete"]:
+            await asyncio.sleep(0)
+        assert started == ["high", "mid", "low", "lowest"]
+        report = StartupRamp.get_report()
+        assert report["admitted"] == 4
+        assert report["max_running"] == 2
+        assert report["duration_s"] is not None
+    finally:
+        StartupRamp.init(None, None)
+
+
+async def test_startup_ramp_stagger() -> None:
+    """Staggered initial checks are admitted at least stagger_ms apart."""
+    StartupRamp.init(None, 20)
+    try:
+        StartupRamp.begin()
+        admit_times = []
+
+        async def check() -> None:
+            admit_times.append(time.monotonic())
+
+        await asyncio.gather(*[StartupRamp.run(0, check) for _ in range(3)])
+        assert len(admit_times) == 3
+        assert admit_times[1] - admit_times[0] >= 0.015
+        assert admit_times[2] - admit_times[1] >= 0.015
+        assert StartupRamp.get_report()["complete"]
+    finally:
+        StartupRamp.init(None, None)
+
+
+async def test_action_scheduler_set_limit_admits_waiters() -> None:
+    """Raising the limit admits waiting actions."""
+    ActionScheduler.init(1)
+    try:
+        await ActionScheduler.acquire(0)
+        waiter = asyncio.create_task(ActionScheduler.acquire(0))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        ActionScheduler.set_limit(2)
+        await waiter
+        assert ActionScheduler.running == 2
+    finally:
+        ActionScheduler.init(None)
+
+
+async def test_action_scheduler_skips_parked_actions(function_hass: HomeAssistant) -> None:
+    """An action parked by @task_limit doesn't hold a scheduler slot."""
+    ActionScheduler.init(1)
+    try:
+        manager = RecordingFunctionManager(function_hass, "def func():\n    pass\n")
+        manager.add(TaskLimitDecorator([], {"max_concurrent": 1, "overflow": "wait"}))
+        await manager.validate()
+        action_done = asyncio.Event()
+        ran = []
+
+        async def run_action(data: DispatchData, result_handlers: list) -> None:
+            ran.append(data)
+            await action_done.wait()
+
+        with patch.object(manager, "_run_action", run_action):
+            calls = [asyncio.create_task(manager._run_call(DispatchData({}))) for _ in range(2)]
+            for _ in range(3):
+                await asyncio.sleep(0)
+            assert len(ran) == 1
+            assert ActionScheduler.running == 1
+            assert ActionScheduler.get_stats()["waiting"] == 0
+
+            action_done.set()
+            await asyncio.gather(*calls)
+        assert len(ran) == 2
+        assert ActionScheduler.running == 0
+    finally:
+        ActionScheduler.init(None)
@@ -1,5 +1,6 @@
 """Unit tests for Python interpreter."""
 
+import asyncio
 from dataclasses import dataclass
 from types import ModuleType
 
@@ -9,8 +10,10 @@ from pytest_homeassistant_custom_component.common import MockConfigEntry
 from custom_components.pyscript import DecoratorRegistry
 from custom_components.pyscript.const import CONF_ALLOW_ALL_IMPORTS, CONFIG_ENTRY, DOMAIN
 from custom_components.pyscript.eval import AstEval, EvalExceptionFormatter
+from custom_components.pyscript.executor import Executor
 from custom_components.pyscript.function import Function
 from custom_components.pyscript.global_ctx import GlobalContext, GlobalContextMgr
+from custom_components.pyscript.profiler import Profiler
 from custom_components.pyscript.state import State
 from custom_components.pyscript.trigger import TrigTime
 
@@ -1676,12 +1679,14 @@ async def test_eval(hass):
     State.register_functions()
     TrigTime.init(hass)
     DecoratorRegistry.init(hass)
+    Executor.configure(None)
 
     for test_data in evalTests:
         await run_one_test(test_data)
     await Function.waiter_sync()
     await Function.waiter_stop()
     await Function.reaper_stop()
+    Executor.shutdown(wait=True)
 
 
 @dataclass
@@ -1943,6 +1948,27 @@ def func():
     ],
     [
         """
+@pyscript_executor(retries=2)
+def func():
+    pass
+""",
+        ED(
+            TypeError,
+            "@pyscript_executor() got an unexpected keyword argument 'retries'",
+            lineno=3,
+            end_col_offset=8,
+        ),
+    ],
+    [
+        """
+@pyscript_executor(timeout=0)
+def func():
+    pass
+""",
+        ED(TypeError, "@pyscript_executor() timeout must be a positive number", lineno=3, end_col_offset=8),
+    ],
+    [
+        """
 @pyscript_executor()
 @pyscript_compile()
 def func():
@@ -2185,3 +2211,119 @@ test_reraise()
     await Function.waiter_sync()
     await Function.waiter_stop()
     await Function.reaper_stop()
+
+
+async def test_eval_loop_budget(hass, caplog):
+    """Test long-running loops yield to other tasks when the loop budget is set."""
+    hass.data[DOMAIN] = {CONFIG_ENTRY: MockConfigEntry(domain=DOMAIN, data={CONF_ALLOW_ALL_IMPORTS: False})}
+    Function.init(hass)
+    State.init(hass)
+    State.register_functions()
+    TrigTime.init(hass)
+
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(1)
+            await asyncio.sleep(0)
+
+    global_ctx = GlobalContext("file.busy", global_sym_table={}, manager=GlobalContextMgr)
+    ast = AstEval("file.busy", global_ctx=global_ctx)
+    Function.install_ast_funcs(ast)
+    ast.parse("""
+def busy():
+    n = 0
+    while n < 2000:
+        n += 1
+    return sum([i for i in range(2000)]) + n
+
+busy()
+""")
+    for budget_ms, expect_ticks in [(None, False), (0.001, True)]:
+        AstEval.set_loop_budget(budget_ms)
+        ticks.clear()
+        ticker_task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        ticks.clear()
+        try:
+            assert await ast.eval() == sum(range(2000)) + 2000
+        finally:
+            ticker_task.cancel()
+            AstEval.set_loop_budget(None)
+        assert bool(ticks) == expect_ticks
+
+    assert caplog.text.count("file.busy: loop in busy at line 4 ran for more than 0.001 ms") == 1
+    assert caplog.text.count("file.busy: loop in busy at line 6 ran for more than 0.001 ms") == 1
+
+    #
+    # a loop that awaits on every pass never exceeds the budget, however long it sleeps
+    #
+    ast.parse("""
+def poll():
+    n = 0
+    while n < 3:
+        task.sleep(0.01)
+        n += 1
+    return [task.sleep(0.01) for i in range(3)] and n
+
+poll()
+""")
+    AstEval.set_loop_budget(1)
+    try:
+        assert await ast.eval() == 3
+    finally:
+        AstEval.set_loop_budget(None)
+    assert "loop in poll" not in caplog.text
+
+    await Function.waiter_sync()
+    await Function.waiter_stop()
+    await Function.reaper_stop()
+
+
+async def test_eval_profiler(hass):
+    """Test the profiler attributes samples to pyscript functions and lines."""
+    hass.data[DOMAIN] = {CONFIG_ENTRY: MockConfigEntry(domain=DOMAIN, data={CONF_ALLOW_ALL_IMPORTS: False})}
+    Function.init(hass)
+    State.init(hass)
+    State.register_functions()
+    TrigTime.init(hass)
+
+    global_ctx = GlobalContext("file.hot", global_sym_table={}, manager=GlobalContextMgr)
+    ast = AstEval("file.hot", global_ctx=global_ctx)
+    Function.install_ast_funcs(ast)
+    ast.parse("""
+def inner(n):
+    while n > 0:
+        n -= 1
+    return n
+
+def outer():
+    for _ in range(10):
+        inner(3000)
+
+outer()
+""")
+    Profiler.start(1)
+    try:
+        await ast.eval()
+    finally:
+        Profiler.stop()
+    assert Profiler.thread is None
+    report = Profiler.get_report()
+    assert report["samples"] > 0
+    assert report["pyscript_samples"] > 0
+
+    hot_line = report["lines"][0]
+    assert hot_line["global_ctx"] == "file.hot"
+    assert hot_line["function"] == "inner"
+    assert hot_line["line"] in {3, 4}
+
+    functions = {stats["function"]: stats for stats in report["functions"]}
+    assert functions["outer"]["self_samples"] <= functions["inner"]["self_samples"]
+    assert functions["outer"]["cumulative_samples"] >= functions["inner"]["cumulative_samples"]
+    assert "file.hot.outer:9;file.hot.inner:" in report["collapsed"]
+
+    await Function.waiter_sync()
+    await Function.waiter_stop()
+    await Function.reaper_stop()